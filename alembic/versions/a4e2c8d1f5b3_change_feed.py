@@ -0,0 +1,80 @@
+"""Change feed
+
+Adds updated_at (with an (updated_at, id) index) to vehicles, orders,
+payments and invoices, and the tombstones table deletes are recorded in.
+Existing rows start from their order/payment/invoice date; vehicles have
+no such date and start from the time of the migration. From then on the
+application stamps updated_at with the database clock.
+
+The backfill UPDATE rewrites every row of the four tables; on a large
+PostgreSQL database run it in a maintenance window.
+
+Revision ID: a4e2c8d1f5b3
+Revises: f3d1b7c0e4a2
+Create Date: 2026-10-17 23:14:05.381226
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e2c8d1f5b3'
+down_revision: Union[str, None] = 'f3d1b7c0e4a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# table -> column updated_at starts from (None: the migration time)
+TRACKED_TABLES = {
+    'vehicles': None,
+    'orders': 'order_date',
+    'payments': 'payment_date',
+    'invoices': 'invoice_date',
+}
+
+
+def upgrade() -> None:
+    now = datetime.utcnow()
+    for table, start in TRACKED_TABLES.items():
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        initial = f'COALESCE({start}, :now)' if start else ':now'
+        op.execute(sa.text(f'UPDATE {table} SET updated_at = {initial}').bindparams(now=now))
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+
+    # Built outside the transaction (CONCURRENTLY on PostgreSQL) so writes carry on meanwhile
+    with op.get_context().autocommit_block():
+        for table in TRACKED_TABLES:
+            op.create_index(
+                f'ix_{table}_updated_at_id', table, ['updated_at', 'id'],
+                unique=False, postgresql_concurrently=True, if_not_exists=True
+            )
+
+    op.create_table('tombstones',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('resource', sa.String(), nullable=False),
+    sa.Column('row_id', sa.UUID(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_tombstones_resource_deleted_at_row_id', 'tombstones', ['resource', 'deleted_at', 'row_id'], unique=False
+    )
+    op.create_index(op.f('ix_tombstones_deleted_at'), 'tombstones', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tombstones_deleted_at'), table_name='tombstones')
+    op.drop_index('ix_tombstones_resource_deleted_at_row_id', table_name='tombstones')
+    op.drop_table('tombstones')
+    with op.get_context().autocommit_block():
+        for table in TRACKED_TABLES:
+            op.drop_index(
+                f'ix_{table}_updated_at_id', table_name=table, postgresql_concurrently=True, if_exists=True
+            )
+    for table in TRACKED_TABLES:
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,45 @@
+"""Reporting rollups
+
+Revision ID: a8e6c2d5f9b7
+Revises: f7d5b1c4e8a6
+Create Date: 2026-10-17 16:21:44.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e6c2d5f9b7'
+down_revision: Union[str, None] = 'f7d5b1c4e8a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('payment_daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('payment_method', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('payment_count', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('day', 'payment_method', 'status')
+    )
+    with op.get_context().autocommit_block():
+        # Outstanding totals group invoices by status
+        op.create_index(
+            'ix_invoices_status', 'invoices', ['status'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_invoices_status', table_name='invoices',
+            postgresql_concurrently=True, if_exists=True
+        )
+    op.drop_table('payment_daily_rollups')
@@ -0,0 +1,46 @@
+"""Vehicle search trigram indexes
+
+Revision ID: b3f1c2d4e5a6
+Revises: a926626a1869
+Create Date: 2026-10-17 09:12:04.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f1c2d4e5a6'
+down_revision: Union[str, None] = 'a926626a1869'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must stay in sync with app.services.vehicle_search.normalized_column()
+SEARCH_COLUMNS = {
+    'ix_vehicles_regno_search_trgm': 'regNo',
+    'ix_vehicles_chassis_search_trgm': 'chassis',
+    'ix_vehicles_engine_search_trgm': 'engine',
+}
+
+
+def _normalized(column: str) -> str:
+    return f"upper(replace(replace(\"{column}\", ' ', ''), '-', ''))"
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Build concurrently so the registry stays writable during the migration
+    with op.get_context().autocommit_block():
+        for index_name, column in SEARCH_COLUMNS.items():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+                f"ON vehicles USING gin (({_normalized(column)}) gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name in SEARCH_COLUMNS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
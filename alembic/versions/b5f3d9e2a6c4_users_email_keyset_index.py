@@ -0,0 +1,35 @@
+"""Users email keyset index
+
+The users list can be sorted by email; keyset pages walk (email, id).
+
+Revision ID: b5f3d9e2a6c4
+Revises: a4e2c8d1f5b3
+Create Date: 2026-10-18 09:12:44.207318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5f3d9e2a6c4'
+down_revision: Union[str, None] = 'a4e2c8d1f5b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_email_id', 'users', ['email', 'id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_email_id', table_name='users',
+            postgresql_concurrently=True, if_exists=True
+        )
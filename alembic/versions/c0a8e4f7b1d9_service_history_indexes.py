@@ -0,0 +1,41 @@
+"""Service history indexes
+
+Revision ID: c0a8e4f7b1d9
+Revises: b9f7d3e6a0c8
+Create Date: 2026-10-17 18:02:41.913275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c0a8e4f7b1d9'
+down_revision: Union[str, None] = 'b9f7d3e6a0c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SERVICE_HISTORY_INDEXES = {
+    'ix_service_history_vin_status_on_id': ['vin', 'status_on', 'id'],
+    'ix_service_history_file_path': ['file_path'],
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, columns in SERVICE_HISTORY_INDEXES.items():
+            op.create_index(
+                index_name, 'service_history', columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name in SERVICE_HISTORY_INDEXES:
+            op.drop_index(
+                index_name, table_name='service_history',
+                postgresql_concurrently=True, if_exists=True
+            )
@@ -0,0 +1,43 @@
+"""Keyset pagination indexes
+
+Revision ID: c4a2e7f9b1d3
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-17 10:41:37.502913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a2e7f9b1d3'
+down_revision: Union[str, None] = 'b3f1c2d4e5a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+PAGINATION_INDEXES = {
+    'ix_users_created_at_id': ('users', ['created_at', 'id']),
+    'ix_orders_order_date_id': ('orders', ['order_date', 'id']),
+    'ix_payments_payment_date_id': ('payments', ['payment_date', 'id']),
+    'ix_invoices_invoice_date_id': ('invoices', ['invoice_date', 'id']),
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, (table, columns) in PAGINATION_INDEXES.items():
+            op.create_index(
+                index_name, table, columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, (table, _) in PAGINATION_INDEXES.items():
+            op.drop_index(
+                index_name, table_name=table,
+                postgresql_concurrently=True, if_exists=True
+            )
@@ -0,0 +1,82 @@
+"""Unique service history file path
+
+Revision ID: c6a0e3f8b2d7
+Revises: b5f3d9e2a6c4
+Create Date: 2026-10-18 10:27:03.518942
+
+The backfill inserts with ON CONFLICT (file_path) DO NOTHING, so concurrent
+runs cannot index a file twice; that needs file_path to be unique. Rows that
+already duplicate a path are left by overlapping backfills. The migration
+first checks that the copies of each path agree on vin, and stops, changing
+nothing, if any do not; those rows have to be sorted out by hand. Otherwise
+the copy with the earliest status_on (then the lowest id) is kept and the
+rest are deleted.
+
+As in d5b3f8a2c6e4, the unique index is built under a temporary name and
+then swapped in, so lookups by file_path keep an index throughout.
+
+"""
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6a0e3f8b2d7'
+down_revision: Union[str, None] = 'b5f3d9e2a6c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Conflicting paths shown in the error
+SHOWN_CONFLICTS = 10
+
+
+def conflicts() -> Optional[str]:
+    """Description of the duplicated paths whose rows disagree on vin (a NULL vin counts as different), if any"""
+    rows = op.get_bind().execute(sa.text(
+        'SELECT file_path, COUNT(*) FROM service_history GROUP BY file_path '
+        'HAVING COUNT(DISTINCT vin) > 1 OR (COUNT(vin) > 0 AND COUNT(vin) < COUNT(*)) '
+        'ORDER BY file_path'
+    )).all()
+    if not rows:
+        return None
+    shown = ', '.join(f'{path!r} ({count} rows)' for path, count in rows[:SHOWN_CONFLICTS])
+    return f'{len(rows)} service_history.file_path values are shared by rows with different vins, e.g. {shown}'
+
+
+def replace_index(unique: bool) -> None:
+    """Build the new file_path index under a temporary name, then drop the old one and rename the new one"""
+    name = 'ix_service_history_file_path'
+    if op.get_bind().dialect.name != 'postgresql':
+        # No concurrent builds (nor ALTER INDEX ... RENAME) to keep an index through elsewhere
+        op.drop_index(name, table_name='service_history')
+        op.create_index(name, 'service_history', ['file_path'], unique=unique)
+        return
+    temporary = f'{name}_new'
+    op.drop_index(temporary, table_name='service_history', postgresql_concurrently=True, if_exists=True)
+    op.create_index(temporary, 'service_history', ['file_path'], unique=unique, postgresql_concurrently=True)
+    op.drop_index(name, table_name='service_history', postgresql_concurrently=True)
+    op.execute(f'ALTER INDEX "{temporary}" RENAME TO "{name}"')
+
+
+def upgrade() -> None:
+    problem = conflicts()
+    if problem:
+        raise RuntimeError(f"{problem}. Fix or delete those rows, then run the migration again")
+    op.execute(
+        "DELETE FROM service_history WHERE id IN ("
+        " SELECT id FROM ("
+        "  SELECT id, ROW_NUMBER() OVER ("
+        "   PARTITION BY file_path ORDER BY status_on IS NULL, status_on, id"
+        "  ) AS position FROM service_history"
+        " ) ranked WHERE position > 1)"
+    )
+    with op.get_context().autocommit_block():
+        replace_index(unique=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        replace_index(unique=False)
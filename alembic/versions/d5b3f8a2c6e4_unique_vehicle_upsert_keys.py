@@ -0,0 +1,74 @@
+"""Unique vehicle upsert keys
+
+Revision ID: d5b3f8a2c6e4
+Revises: c4a2e7f9b1d3
+Create Date: 2026-10-17 12:03:55.271846
+
+The bulk vehicle endpoint upserts with ON CONFLICT on regNo or chassis, which
+needs a unique index on each. The migration first checks for duplicate
+regNo/chassis values and stops, changing nothing, if it finds any; those
+rows have to be merged by hand.
+
+The unique regNo index is built next to the existing one under a temporary
+name, then swapped in, so lookups by regNo keep an index throughout. A build
+that fails part way (a duplicate written meanwhile) leaves the old index in
+place; its INVALID leftover is dropped when the migration is run again.
+
+"""
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b3f8a2c6e4'
+down_revision: Union[str, None] = 'c4a2e7f9b1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Duplicate values shown in the error
+SHOWN_DUPLICATES = 10
+
+
+def duplicates(column: str) -> Optional[str]:
+    """Description of the repeated non-NULL ``column`` values, if any"""
+    rows = op.get_bind().execute(sa.text(
+        f'SELECT "{column}", COUNT(*) FROM vehicles WHERE "{column}" IS NOT NULL '
+        f'GROUP BY "{column}" HAVING COUNT(*) > 1 ORDER BY COUNT(*) DESC, "{column}"'
+    )).all()
+    if not rows:
+        return None
+    shown = ', '.join(f'{value!r} ({count} rows)' for value, count in rows[:SHOWN_DUPLICATES])
+    return f'{len(rows)} duplicated vehicles.{column} values, e.g. {shown}'
+
+
+def replace_index(name: str, columns: Sequence[str], unique: bool) -> None:
+    """Build the new index under a temporary name, then drop the old one and rename the new one"""
+    if op.get_bind().dialect.name != 'postgresql':
+        # No concurrent builds (nor ALTER INDEX ... RENAME) to keep an index through elsewhere
+        op.drop_index(name, table_name='vehicles')
+        op.create_index(name, 'vehicles', columns, unique=unique)
+        return
+    temporary = f'{name}_new'
+    op.drop_index(temporary, table_name='vehicles', postgresql_concurrently=True, if_exists=True)
+    op.create_index(temporary, 'vehicles', columns, unique=unique, postgresql_concurrently=True)
+    op.drop_index(name, table_name='vehicles', postgresql_concurrently=True)
+    op.execute(f'ALTER INDEX "{temporary}" RENAME TO "{name}"')
+
+
+def upgrade() -> None:
+    problems = [problem for problem in map(duplicates, ('regNo', 'chassis')) if problem]
+    if problems:
+        raise RuntimeError(f"{'; '.join(problems)}. Merge or delete those rows, then run the migration again")
+    with op.get_context().autocommit_block():
+        replace_index('ix_vehicles_regNo', ['regNo'], unique=True)
+        op.drop_index('ix_vehicles_chassis', table_name='vehicles', postgresql_concurrently=True, if_exists=True)
+        op.create_index('ix_vehicles_chassis', 'vehicles', ['chassis'], unique=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_vehicles_chassis', table_name='vehicles', postgresql_concurrently=True)
+        replace_index('ix_vehicles_regNo', ['regNo'], unique=False)
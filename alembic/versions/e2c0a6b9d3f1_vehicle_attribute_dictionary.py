@@ -0,0 +1,82 @@
+"""Vehicle attribute dictionary
+
+Moves the repeated low-cardinality vehicle strings into
+vehicle_attribute_values and replaces each column with an integer id
+("model" -> "model_id"). Existing values are backfilled with one INSERT of
+the distinct values and one pass over vehicles.
+
+This does not shrink vehicles on PostgreSQL by itself: the backfill UPDATE
+leaves a dead copy of every row and DROP COLUMN keeps the strings' bytes in
+the live ones. Rewrite the table after upgrading, with VACUUM FULL vehicles
+(takes an ACCESS EXCLUSIVE lock for the duration) or pg_repack -t vehicles
+(online), to get the space back.
+
+Revision ID: e2c0a6b9d3f1
+Revises: d1b9f5a8c2e0
+Create Date: 2026-10-17 20:41:17.208356
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c0a6b9d3f1'
+down_revision: Union[str, None] = 'd1b9f5a8c2e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DICTIONARY_COLUMNS = [
+    'vehicleManufacturerName', 'model', 'type', 'normsType', 'bodyType', 'regAuthority',
+    'vehicleInsuranceCompanyName', 'rcFinancer', 'vehicleCategory', 'class',
+]
+
+
+def upgrade() -> None:
+    op.create_table('vehicle_attribute_values',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('attribute', sa.String(), nullable=False),
+    sa.Column('value', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('attribute', 'value', name='uq_vehicle_attribute_values_attribute_value')
+    )
+    for name in DICTIONARY_COLUMNS:
+        op.add_column('vehicles', sa.Column(f'{name}_id', sa.Integer(), nullable=True))
+
+    op.execute(
+        'INSERT INTO vehicle_attribute_values (attribute, value) '
+        + ' UNION '.join(
+            f"SELECT '{name}', \"{name}\" FROM vehicles WHERE \"{name}\" IS NOT NULL"
+            for name in DICTIONARY_COLUMNS
+        )
+    )
+    # One rewrite of each row, not one per column
+    op.execute(
+        'UPDATE vehicles SET '
+        + ', '.join(
+            f'"{name}_id" = (SELECT id FROM vehicle_attribute_values '
+            f"WHERE attribute = '{name}' AND value = vehicles.\"{name}\")"
+            for name in DICTIONARY_COLUMNS
+        )
+    )
+
+    for name in DICTIONARY_COLUMNS:
+        op.drop_column('vehicles', name)
+
+
+def downgrade() -> None:
+    for name in DICTIONARY_COLUMNS:
+        op.add_column('vehicles', sa.Column(name, sa.String(), nullable=True))
+    op.execute(
+        'UPDATE vehicles SET '
+        + ', '.join(
+            f'"{name}" = (SELECT value FROM vehicle_attribute_values WHERE id = vehicles."{name}_id")'
+            for name in DICTIONARY_COLUMNS
+        )
+    )
+    for name in DICTIONARY_COLUMNS:
+        op.drop_column('vehicles', f'{name}_id')
+    op.drop_table('vehicle_attribute_values')
@@ -0,0 +1,43 @@
+"""Foreign key indexes
+
+Revision ID: e6c4a9b3d7f5
+Revises: d5b3f8a2c6e4
+Create Date: 2026-10-17 13:26:18.640372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6c4a9b3d7f5'
+down_revision: Union[str, None] = 'd5b3f8a2c6e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FOREIGN_KEY_INDEXES = {
+    'ix_orders_user_id': ('orders', ['user_id']),
+    'ix_orders_vehicle_id': ('orders', ['vehicle_id']),
+    'ix_payments_order_id': ('payments', ['order_id']),
+    'ix_invoices_order_id': ('invoices', ['order_id']),
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, (table, columns) in FOREIGN_KEY_INDEXES.items():
+            op.create_index(
+                index_name, table, columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, (table, _) in FOREIGN_KEY_INDEXES.items():
+            op.drop_index(
+                index_name, table_name=table,
+                postgresql_concurrently=True, if_exists=True
+            )
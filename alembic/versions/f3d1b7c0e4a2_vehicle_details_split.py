@@ -0,0 +1,78 @@
+"""Vehicle details split
+
+Moves the rarely read vehicle columns (addresses, blacklist details, permit
+and national permit fields except permitValidUpto, NOC details) into the 1:1
+vehicle_details table. Only vehicles with at least one of them set get a row.
+
+On PostgreSQL DROP COLUMN only hides the columns: existing rows keep their
+bytes until rewritten. Run VACUUM FULL (or pg_repack) on vehicles afterwards
+to shrink the table now rather than as rows are updated.
+
+Revision ID: f3d1b7c0e4a2
+Revises: e2c0a6b9d3f1
+Create Date: 2026-10-17 21:58:42.610277
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3d1b7c0e4a2'
+down_revision: Union[str, None] = 'e2c0a6b9d3f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+DETAIL_COLUMNS = [
+    ('presentAddress', sa.Text()),
+    ('permanentAddress', sa.Text()),
+    ('blacklistDetails', sa.JSON()),
+    ('permitIssueDate', sa.DateTime()),
+    ('permitNumber', sa.String()),
+    ('permitType', sa.String()),
+    ('permitValidFrom', sa.DateTime()),
+    ('nationalPermitNumber', sa.String()),
+    ('nationalPermitUpto', sa.String()),
+    ('nationalPermitIssuedBy', sa.String()),
+    ('nocDetails', sa.String()),
+]
+
+
+def upgrade() -> None:
+    op.create_table('vehicle_details',
+    sa.Column('vehicle_id', sa.UUID(), nullable=False),
+    *[sa.Column(name, type_, nullable=True) for name, type_ in DETAIL_COLUMNS],
+    sa.ForeignKeyConstraint(['vehicle_id'], ['vehicles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('vehicle_id')
+    )
+
+    names = ', '.join(f'"{name}"' for name, _ in DETAIL_COLUMNS)
+    # blacklistDetails was written as a JSON 'null' rather than SQL NULL when unset
+    has_value = [
+        f"CAST(\"{name}\" AS TEXT) <> 'null'" if isinstance(type_, sa.JSON) else f'"{name}" IS NOT NULL'
+        for name, type_ in DETAIL_COLUMNS
+    ]
+    op.execute(
+        f'INSERT INTO vehicle_details (vehicle_id, {names}) SELECT id, {names} FROM vehicles WHERE '
+        + ' OR '.join(has_value)
+    )
+
+    for name, _ in DETAIL_COLUMNS:
+        op.drop_column('vehicles', name)
+
+
+def downgrade() -> None:
+    for name, type_ in DETAIL_COLUMNS:
+        op.add_column('vehicles', sa.Column(name, type_, nullable=True))
+    op.execute(
+        'UPDATE vehicles SET '
+        + ', '.join(
+            f'"{name}" = (SELECT "{name}" FROM vehicle_details WHERE vehicle_id = vehicles.id)'
+            for name, _ in DETAIL_COLUMNS
+        )
+        + ' WHERE id IN (SELECT vehicle_id FROM vehicle_details)'
+    )
+    op.drop_table('vehicle_details')
@@ -0,0 +1,48 @@
+"""Vehicle expiry tracking
+
+Revision ID: f7d5b1c4e8a6
+Revises: e6c4a9b3d7f5
+Create Date: 2026-10-17 14:52:09.318774
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7d5b1c4e8a6'
+down_revision: Union[str, None] = 'e6c4a9b3d7f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+EXPIRY_COLUMNS = ['rcExpiryDate', 'vehicleInsuranceUpto', 'puccUpto', 'permitValidUpto']
+
+
+def upgrade() -> None:
+    op.create_table('vehicle_expiry_buckets',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('vehicle_count', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('day', 'kind')
+    )
+    with op.get_context().autocommit_block():
+        for column in EXPIRY_COLUMNS:
+            op.create_index(
+                f'ix_vehicles_{column}_expiry', 'vehicles', [column], unique=False,
+                postgresql_where=sa.text(f'"{column}" IS NOT NULL'),
+                postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in EXPIRY_COLUMNS:
+            op.drop_index(
+                f'ix_vehicles_{column}_expiry', table_name='vehicles',
+                postgresql_concurrently=True, if_exists=True
+            )
+    op.drop_table('vehicle_expiry_buckets')
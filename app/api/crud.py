@@ -0,0 +1,310 @@
+"""
+CRUD routes generated from a Repository
+
+``add_crud_routes`` registers a resource's standard endpoints on its router:
+create (with optional Idempotency-Key support), keyset-paginated list with
+equality filters, ``fields`` projection and the fast encoder, get, update,
+delete, an optional streaming export, and batch get/create/update/delete.
+Every resource gets the same query shapes, so an optimization made here or
+in the repository applies to all of them. Resource modules add their own
+endpoints beside these and ``exclude`` the ones they replace.
+
+Item routes match ``{<resource>_id:uuid}``, so fixed paths such as
+``/export`` are never shadowed, whatever order routes are registered in.
+Creates and updates that collide with an existing row on a unique key (or
+break another constraint) answer 409 Conflict.
+"""
+import functools
+import inspect
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Type
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from pydantic import BaseModel, create_model
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.export import ExportFormat, export_response
+from app.api.pagination import SortOrder, paginate, paginate_columns
+from app.api.responses import FastJSONResponse, parse_fields, row_to_dict, select_columns
+from app.db.repository import Repository, WriteConflict
+from app.db.session import get_db, get_db_read
+from app.schemas.batch import BatchDeleteResult, BatchIds, BatchItems, BatchResult
+from app.schemas.pagination import CursorPage
+from app.services import idempotency
+
+
+ROUTES = ("create", "list", "export", "get", "update", "delete", "batch")
+
+
+def _filter_dependency(filters: Dict[str, Any]) -> Callable[..., List[Any]]:
+    """Dependency turning optional query parameters into equality filters on ``filters``' columns"""
+    def dependency(**values) -> List[Any]:
+        return [filters[name] == value for name, value in values.items() if value is not None]
+
+    dependency.__signature__ = inspect.Signature([
+        inspect.Parameter(
+            name, inspect.Parameter.KEYWORD_ONLY, default=None, annotation=Optional[column.type.python_type]
+        )
+        for name, column in filters.items()
+    ])
+    return dependency
+
+
+@contextmanager
+def _conflict_as_409(name: str) -> Iterator[None]:
+    try:
+        yield
+    except WriteConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"{name} conflict: {e}")
+
+
+def _with_id_param(endpoint: Callable, id_name: str) -> Callable:
+    """Expose the endpoint's ``id`` argument as the ``id_name`` path parameter"""
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):
+        kwargs["id"] = kwargs.pop(id_name)
+        return await endpoint(**kwargs)
+
+    signature = inspect.signature(endpoint)
+    wrapper.__signature__ = signature.replace(parameters=[
+        parameter.replace(name=id_name) if parameter.name == "id" else parameter
+        for parameter in signature.parameters.values()
+    ])
+    return wrapper
+
+
+def add_crud_routes(
+    router: APIRouter,
+    repository: Repository,
+    *,
+    create_schema: Type[BaseModel],
+    update_schema: Type[BaseModel],
+    response_schema: Type[BaseModel],
+    sort_columns: Dict[str, Any],
+    default_sort: str,
+    filters: Optional[Dict[str, Any]] = None,
+    idempotency_scope: Optional[str] = None,
+    export_column: Any = None,
+    exclude: Sequence[str] = (),
+) -> None:
+    """
+    Register the standard endpoints for ``repository``'s model on ``router``.
+
+    ``filters`` maps list query parameters to the columns they match;
+    ``export_column`` is the date column behind ``/export?since=`` (no export
+    route without it); ``exclude`` names routes from ``ROUTES`` to leave out.
+    """
+    model = repository.model
+    name = model.__name__
+    singular = name.lower()
+    plural = router.prefix.strip("/").replace("-", "_")
+    id_name = f"{singular}_id"
+    item_path = f"/{{{id_name}:uuid}}"
+    filter_dependency = _filter_dependency(filters or {})
+    include = [route for route in ROUTES if route not in exclude]
+
+    def not_found(id: UUID) -> HTTPException:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{name} with id {id} not found")
+
+    if "create" in include:
+        if idempotency_scope:
+            async def create(
+                data: create_schema,
+                idempotency_key: Optional[str] = Header(
+                    None, alias=idempotency.IDEMPOTENCY_HEADER, min_length=1, max_length=255
+                ),
+                db: AsyncSession = Depends(get_db)
+            ):
+                with _conflict_as_409(name):
+                    if idempotency_key:
+                        return await idempotency.create_once(
+                            db, idempotency_scope, idempotency_key, data, repository, response_schema
+                        )
+                    instance = await repository.create(db, data.model_dump())
+                await db.commit()
+                await repository.after_commit("create", [instance])
+                return instance
+
+            create.__doc__ = (
+                f"Create a new {singular}.\n\n"
+                "Send an `Idempotency-Key` header to make retries safe: a repeat with the\n"
+                "same key and body returns the original response instead of creating\n"
+                f"another {singular}."
+            )
+        else:
+            async def create(data: create_schema, db: AsyncSession = Depends(get_db)):
+                with _conflict_as_409(name):
+                    instance = await repository.create(db, data.model_dump())
+                await db.commit()
+                await repository.after_commit("create", [instance])
+                return instance
+
+            create.__doc__ = f"Create a new {singular}"
+
+        router.add_api_route(
+            "/", create, methods=["POST"], response_model=response_schema,
+            status_code=status.HTTP_201_CREATED, name=f"create_{singular}"
+        )
+
+    if "list" in include:
+        async def get_page(
+            cursor: Optional[str] = None,
+            limit: int = Query(100, ge=1, le=1000),
+            sort: str = default_sort,
+            order: SortOrder = SortOrder.asc,
+            fast: bool = False,
+            fields: Optional[str] = None,
+            where: List[Any] = Depends(filter_dependency),
+            db: AsyncSession = Depends(get_db_read)
+        ):
+            field_names = parse_fields(response_schema, fields)
+            if fast or field_names:
+                items, next_cursor = await paginate_columns(
+                    db, model, response_schema, field_names, sort_columns, sort, order, cursor, limit,
+                    filters=where
+                )
+                return FastJSONResponse({"items": items, "next_cursor": next_cursor})
+
+            query = select(model).options(*repository.load_options).where(*where)
+            rows, next_cursor = await paginate(db, query, sort_columns, sort, order, cursor, limit)
+            return {"items": rows, "next_cursor": next_cursor}
+
+        filtered_by = " / ".join(f"`{param}`" for param in filters or {})
+        get_page.__doc__ = (
+            f"Get {plural} one keyset page at a time"
+            + (f", optionally filtered by {filtered_by}" if filtered_by else "; pass back next_cursor to continue")
+            + ".\n\n`fields=a,b,...` selects and returns only those columns; `fast=true`\n"
+            "encodes Core rows straight to JSON, skipping ORM hydration and\n"
+            "response-model validation. The payload is the same either way."
+        )
+        router.add_api_route(
+            "/", get_page, methods=["GET"], response_model=CursorPage[response_schema], name=f"get_{plural}"
+        )
+
+    if "export" in include and export_column is not None:
+        async def export(
+            format: ExportFormat = ExportFormat.ndjson,
+            fields: Optional[str] = None,
+            since: Optional[datetime] = None
+        ):
+            return export_response(model, export_column, format, fields=fields, since=since)
+
+        export.__doc__ = (
+            f"Stream all {plural} as NDJSON or CSV, optionally projected to `fields` "
+            f"and filtered to {export_column.key} >= `since`"
+        )
+        router.add_api_route("/export", export, methods=["GET"], name=f"export_{plural}")
+
+    if "get" in include:
+        async def get_item(id: UUID, fields: Optional[str] = None, db: AsyncSession = Depends(get_db_read)):
+            field_names = parse_fields(response_schema, fields)
+            if not field_names:
+                instance = await repository.get(db, id)
+                if not instance:
+                    raise not_found(id)
+                return instance
+
+            result = await db.execute(
+                select_columns(model, response_schema, field_names).where(repository.primary_key == id)
+            )
+            row = result.one_or_none()
+            if not row:
+                raise not_found(id)
+            return FastJSONResponse(row_to_dict(row))
+
+        get_item.__doc__ = f"Get a specific {singular} by ID"
+        router.add_api_route(
+            item_path, _with_id_param(get_item, id_name), methods=["GET"], response_model=response_schema,
+            name=f"get_{singular}"
+        )
+
+    if "update" in include:
+        async def update_item(id: UUID, data: update_schema, db: AsyncSession = Depends(get_db)):
+            # Update only provided fields
+            changes = data.model_dump(exclude_unset=True)
+            before = await repository.before_update(db, [(id, changes)])
+            with _conflict_as_409(name):
+                instance = await repository.update(db, id, changes)
+            if not instance:
+                raise not_found(id)
+            await db.commit()
+            await repository.after_commit("update", [instance], before)
+            return instance
+
+        update_item.__doc__ = f"Update {'an' if singular[0] in 'aeiou' else 'a'} {singular}"
+        router.add_api_route(
+            item_path, _with_id_param(update_item, id_name), methods=["PUT"], response_model=response_schema,
+            name=f"update_{singular}"
+        )
+
+    if "delete" in include:
+        async def delete_item(id: UUID, db: AsyncSession = Depends(get_db)):
+            deleted = await repository.delete(db, id)
+            if not deleted:
+                raise not_found(id)
+            await db.commit()
+            await repository.after_commit("delete", [deleted])
+            return None
+
+        delete_item.__doc__ = f"Delete {'an' if singular[0] in 'aeiou' else 'a'} {singular}"
+        router.add_api_route(
+            item_path, _with_id_param(delete_item, id_name), methods=["DELETE"],
+            status_code=status.HTTP_204_NO_CONTENT, name=f"delete_{singular}"
+        )
+
+    if "batch" in include:
+        update_item_schema = create_model(f"{update_schema.__name__}Item", __base__=update_schema, id=(UUID, ...))
+
+        async def batch_get(body: BatchIds, db: AsyncSession = Depends(get_db_read)):
+            items = await repository.get_many(db, body.ids)
+            found = {getattr(item, repository.id_key) for item in items}
+            return {"items": items, "missing": [id for id in dict.fromkeys(body.ids) if id not in found]}
+
+        async def batch_create(body: BatchItems[create_schema], db: AsyncSession = Depends(get_db)):
+            with _conflict_as_409(name):
+                items = await repository.create_many(db, [item.model_dump() for item in body.items])
+            await db.commit()
+            await repository.after_commit("create", items)
+            return items
+
+        async def batch_update(body: BatchItems[update_item_schema], db: AsyncSession = Depends(get_db)):
+            changes = [(item.id, item.model_dump(exclude_unset=True, exclude={"id"})) for item in body.items]
+            before = await repository.before_update(db, changes)
+            with _conflict_as_409(name):
+                items = await repository.update_many(db, changes)
+            await db.commit()
+            await repository.after_commit("update", items, before)
+            found = {getattr(item, repository.id_key) for item in items}
+            return {"items": items, "missing": [id for id, _ in changes if id not in found]}
+
+        async def batch_delete(body: BatchIds, db: AsyncSession = Depends(get_db)):
+            deleted = await repository.delete_many(db, body.ids)
+            await db.commit()
+            await repository.after_commit("delete", deleted)
+            found = [row[0] for row in deleted]
+            return {"deleted": found, "missing": [id for id in dict.fromkeys(body.ids) if id not in set(found)]}
+
+        batch_get.__doc__ = f"Get many {plural} by id in one query; unknown ids are listed in `missing`"
+        batch_create.__doc__ = f"Create many {plural} with one multi-row INSERT (all or nothing)"
+        batch_update.__doc__ = f"Update many {plural}; each item carries its `id` and the fields to change"
+        batch_delete.__doc__ = f"Delete many {plural} by id with one DELETE"
+
+        router.add_api_route(
+            "/batch/get", batch_get, methods=["POST"], response_model=BatchResult[response_schema],
+            name=f"batch_get_{plural}"
+        )
+        router.add_api_route(
+            "/batch/create", batch_create, methods=["POST"], response_model=List[response_schema],
+            status_code=status.HTTP_201_CREATED, name=f"batch_create_{plural}"
+        )
+        router.add_api_route(
+            "/batch/update", batch_update, methods=["POST"], response_model=BatchResult[response_schema],
+            name=f"batch_update_{plural}"
+        )
+        router.add_api_route(
+            "/batch/delete", batch_delete, methods=["POST"], response_model=BatchDeleteResult,
+            name=f"batch_delete_{plural}"
+        )
@@ -0,0 +1,118 @@
+"""
+File downloads with HTTP Range support
+
+``RangeFileResponse`` is a ``FileResponse`` that answers a single
+``bytes=`` range with 206 Partial Content (416 when unsatisfiable) and
+honours ``If-Range``. The body is handed to the server with the ASGI
+``http.response.zerocopy`` extension (sendfile) when the server offers it,
+otherwise it is read in chunks, so neither path loads the file into memory.
+"""
+import os
+from typing import Optional, Tuple
+
+import anyio
+from fastapi.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+
+ZEROCOPY_EXTENSION = "http.response.zerocopy"
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive ``(start, end)`` for a single byte range, or ``None`` to send the
+    whole file (no header, malformed header or several ranges).
+
+    Raises ``ValueError`` when the range is syntactically valid but starts
+    past the end of the file.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first.isdigit() or last.isdigit()):
+        return None
+    if first and last and not (first.isdigit() and last.isdigit()):
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size:
+        raise ValueError("range starts past the end of the file")
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+class RangeFileResponse(FileResponse):
+    """``FileResponse`` that serves single byte ranges; ``stat_result`` is required"""
+
+    def __init__(
+        self,
+        path: str,
+        stat_result: os.stat_result,
+        range_header: Optional[str] = None,
+        if_range: Optional[str] = None,
+        **kwargs,
+    ):
+        super().__init__(path, stat_result=stat_result, **kwargs)
+        self.headers["accept-ranges"] = "bytes"
+        size = stat_result.st_size
+        self.range: Optional[Tuple[int, int]] = None
+
+        # A stale If-Range validator means the client's partial copy is outdated
+        if if_range and if_range not in (self.headers.get("etag"), self.headers.get("last-modified")):
+            range_header = None
+        try:
+            self.range = parse_range(range_header, size)
+        except ValueError:
+            self.status_code = 416
+            self.headers["content-range"] = f"bytes */{size}"
+            self.headers["content-length"] = "0"
+            return
+        if self.range is not None:
+            start, end = self.range
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+            self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        start, end = self.range or (0, self.stat_result.st_size - 1)
+        count = end - start + 1
+        if scope["method"].upper() == "HEAD" or self.status_code == 416 or count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            with await anyio.to_thread.run_sync(open, self.path, "rb") as file:
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": file,
+                    "offset": start,
+                    "count": count,
+                    "more_body": False,
+                })
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(start)
+                remaining = count
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0:
+                    # File shrank underneath us; end the body rather than hang
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        if self.background is not None:
+            await self.background()
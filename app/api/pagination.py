@@ -0,0 +1,187 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints
+
+Pages are ordered by ``(sort_key, id)`` and the cursor is an opaque token
+carrying the last row's values, so every page costs one index range scan no
+matter how deep it is and rows inserted meanwhile never shift the pages.
+NULL sort keys are always ordered last, in their own phase: the non-NULL
+range is walked first (``sort IS NOT NULL AND (sort, id) > cursor``), then
+``sort IS NULL AND id > cursor`` by id, so both are plain ranges of the
+``(sort, id)`` index in either direction.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_, DateTime, Date, Numeric
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.responses import select_columns
+
+
+class SortOrder(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def _load_value(column, value: Any) -> Any:
+    if value is None:
+        return None
+    column_type = column.type
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Date):
+        return date.fromisoformat(value)
+    if isinstance(column_type, Numeric):
+        return Decimal(value)
+    if getattr(column_type, "python_type", None) is UUID or column.key == "id":
+        return UUID(value)
+    return value
+
+
+def encode_cursor(sort: str, order: SortOrder, key: Any, row_id: UUID) -> str:
+    """Build the opaque cursor pointing just after a row"""
+    payload = {"s": sort, "o": order.value, "k": _dump_value(key), "i": str(row_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: SortOrder, column) -> Tuple[Any, UUID]:
+    """Decode a cursor; it must have been issued for the same sort and order"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort or payload["o"] != order.value:
+            raise ValueError("cursor was issued for a different sort")
+        return _load_value(column, payload["k"]), UUID(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {e}"
+        )
+
+
+def _nullable(column) -> bool:
+    return getattr(getattr(column, "expression", column), "nullable", True)
+
+
+def _key_range(sort_column, id_column, key: Any, row_id: UUID, descending: bool):
+    """WHERE clause selecting the non-NULL-key rows that follow (key, row_id)"""
+    row = tuple_(sort_column, id_column)
+    return row < tuple_(key, row_id) if descending else row > tuple_(key, row_id)
+
+
+def _id_range(id_column, row_id: UUID, descending: bool):
+    return id_column < row_id if descending else id_column > row_id
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    sort_columns: Dict[str, Any],
+    sort: str,
+    order: SortOrder,
+    cursor: Optional[str],
+    limit: int,
+    scalars: bool = True,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Run ``query`` as one keyset page.
+
+    ``sort_columns`` maps the public sort names to model columns and must
+    contain ``"id"``, the tie-breaker. Returns the page rows and the cursor
+    for the next page (``None`` on the last page). Pass ``scalars=False`` for
+    Core column selects; their rows must expose the sort and id columns
+    under the same names.
+    """
+    if sort not in sort_columns:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot sort by {sort}; expected one of {', '.join(sort_columns)}"
+        )
+    sort_column = sort_columns[sort]
+    id_column = sort_columns["id"]
+    descending = order == SortOrder.desc
+
+    key = row_id = None
+    if cursor:
+        key, row_id = decode_cursor(cursor, sort, order, sort_column)
+    id_order = id_column.desc() if descending else id_column.asc()
+
+    async def fetch(phase: Select, ordering: List[Any], count: int) -> List[Any]:
+        result = await db.execute(phase.order_by(*ordering).limit(count))
+        return list(result.scalars().all() if scalars else result.all())
+
+    if sort_column is id_column:
+        phase = query.where(_id_range(id_column, row_id, descending)) if cursor else query
+        rows = await fetch(phase, [id_order], limit + 1)
+    else:
+        rows = []
+        # Non-NULL keys first; a cursor with a NULL key is already past them
+        if not cursor or key is not None:
+            phase = query.where(sort_column.is_not(None)) if _nullable(sort_column) else query
+            if cursor:
+                phase = phase.where(_key_range(sort_column, id_column, key, row_id, descending))
+            sort_order = sort_column.desc() if descending else sort_column.asc()
+            rows = await fetch(phase, [sort_order, id_order], limit + 1)
+        if len(rows) <= limit and _nullable(sort_column):
+            phase = query.where(sort_column.is_(None))
+            if cursor and key is None:
+                phase = phase.where(_id_range(id_column, row_id, descending))
+            rows += await fetch(phase, [id_order], limit + 1 - len(rows))
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            sort, order, getattr(last, sort_column.key), getattr(last, id_column.key)
+        )
+    return rows, next_cursor
+
+
+async def paginate_columns(
+    db: AsyncSession,
+    model,
+    schema,
+    fields: Optional[List[str]],
+    sort_columns: Dict[str, Any],
+    sort: str,
+    order: SortOrder,
+    cursor: Optional[str],
+    limit: int,
+    filters: Sequence[Any] = (),
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Keyset page selecting only ``fields`` (all schema fields when ``None``),
+    restricted by the optional WHERE ``filters``.
+
+    Rows come back as plain dicts ready for the fast JSON encoder. The sort
+    column is fetched for the cursor even when it was not requested.
+    """
+    names = list(fields) if fields is not None else list(schema.model_fields)
+    extra = [name for name in (sort, "id") if name in sort_columns and name not in names]
+    query = select_columns(model, schema, names + extra).where(*filters)
+    rows, next_cursor = await paginate(
+        db, query, sort_columns, sort, order, cursor, limit, scalars=False
+    )
+    items = []
+    for row in rows:
+        item = dict(row._mapping)
+        for name in extra:
+            item.pop(name, None)
+        items.append(item)
+    return items, next_cursor
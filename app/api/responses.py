@@ -0,0 +1,85 @@
+"""
+Fast JSON response path for wide rows
+
+Builds response bodies straight from SQLAlchemy Core result tuples with orjson,
+skipping ORM hydration and the validate-then-encode round trip FastAPI does for
+``response_model``. The output matches what the Pydantic response model would
+produce for the same row.
+"""
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type
+
+import orjson
+from fastapi import HTTPException, status
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from app.db.details import detail_attributes, join_details
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_default)
+
+
+def parse_fields(schema: Type[BaseModel], fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a sparse fieldset (``fields=regNo,model``) against a response schema.
+
+    Returns ``None`` when no projection was requested. ``id`` is always
+    included so partial rows stay addressable.
+    """
+    if not fields:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in schema.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    if "id" in schema.model_fields and "id" not in names:
+        names.insert(0, "id")
+    return names
+
+
+def model_columns(model, schema: Type[BaseModel], fields: Optional[Sequence[str]] = None) -> List[Any]:
+    """Table columns, details-table ones included, labelled with the schema's field names, in schema order"""
+    # Mapped attributes, not Table columns: the ORM runs type processors (such
+    # as DictionaryString's id -> string lookup) inside the async greenlet
+    attrs = {attr.key: attr.class_attribute for attr in model.__mapper__.column_attrs}
+    attrs.update(detail_attributes(model))
+    names = fields if fields is not None else list(schema.model_fields)
+    return [attrs[name].label(name) for name in names if name in attrs]
+
+
+def select_columns(model, schema: Type[BaseModel], fields: Optional[Sequence[str]] = None):
+    """Core SELECT returning rows shaped like ``schema``; joins a details table only when needed"""
+    names = fields if fields is not None else list(schema.model_fields)
+    return join_details(select(*model_columns(model, schema, fields)), model, names)
+
+
+def row_to_dict(row) -> Dict[str, Any]:
+    return dict(row._mapping)
+
+
+def rows_to_json(rows: Iterable[Any]) -> bytes:
+    """Encode Core rows as a JSON array"""
+    return dumps([row_to_dict(row) for row in rows])
+
+
+class FastJSONResponse(Response):
+    """JSON response for content that is already plain data or encoded bytes"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
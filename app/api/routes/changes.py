@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.api.responses import FastJSONResponse
+from app.core.metrics import InstrumentedRoute
+from app.db.session import get_db
+from app.schemas.change import ChangePage, ChangeResource
+from app.services import changes
+
+
+router = APIRouter(prefix="/changes", tags=["Changes"], route_class=InstrumentedRoute)
+
+
+@router.get("", response_model=ChangePage)
+async def read_changes(
+    resource: ChangeResource,
+    since: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Rows of `resource` written or deleted after the `since` token, oldest first.
+
+    Start without `since` to read the whole resource, then pass `next_token`
+    back as `since` to get only what changed; keep going while `has_more`.
+    Upserts carry the row as the resource's GET returns it. A 410 means the
+    token outlived the delete history: resync without `since`.
+    """
+    # Read from the primary: a lagging replica could skip rows behind a token it hands out
+    page = await changes.read_changes(db, resource, since, limit)
+    return FastJSONResponse(page)
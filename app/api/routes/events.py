@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import List
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.events import broker
+from app.core.metrics import InstrumentedRoute
+from app.services import status_events
+
+
+router = APIRouter(prefix="/events", tags=["Events"], route_class=InstrumentedRoute)
+
+
+@router.get("", response_class=StreamingResponse)
+async def stream_status_events(
+    orders: List[UUID] = Query([]),
+    payments: List[UUID] = Query([])
+):
+    """Server-sent events for order and payment changes, instead of polling.
+
+    Subscribe with repeated `orders=<id>` / `payments=<id>`. The stream opens
+    with a `snapshot` of each row, then sends `create`/`update`/`delete`
+    events (named `orders` or `payments`) carrying the row as its GET
+    returns it; an order's stream also gets its payments' events. Only the
+    latest event per row is kept for a slow reader. Streams close after a
+    few minutes and EventSource reconnects.
+    """
+    ids = {"orders": list(dict.fromkeys(orders)), "payments": list(dict.fromkeys(payments))}
+    count = len(ids["orders"]) + len(ids["payments"])
+    if not count or count > settings.EVENTS_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Subscribe to between 1 and {settings.EVENTS_MAX_IDS} order and payment ids"
+        )
+    if broker.full():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many open event streams; retry shortly",
+            headers={"Retry-After": "5"}
+        )
+    
+    return StreamingResponse(
+        status_events.stream(ids),
+        media_type="text/event-stream",
+        # No caching, and no proxy buffering that would hold events back
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
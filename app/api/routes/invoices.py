@@ -1,109 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
-from uuid import UUID
+from fastapi import APIRouter
 
-from app.db.session import get_db
+from app.api.crud import add_crud_routes
+from app.core.metrics import InstrumentedRoute
+from app.db.repository import Repository
 from app.models.invoice import Invoice
 from app.schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse
 
 
-router = APIRouter(prefix="/invoices", tags=["Invoices"])
-
-
-@router.post("/", response_model=InvoiceResponse, status_code=status.HTTP_201_CREATED)
-async def create_invoice(
-    invoice_data: InvoiceCreate,
-    db: AsyncSession = Depends(get_db)
-):
-    """Create a new invoice"""
-    invoice = Invoice(**invoice_data.model_dump())
-    db.add(invoice)
-    await db.commit()
-    await db.refresh(invoice)
-    return invoice
-
-
-@router.get("/", response_model=List[InvoiceResponse])
-async def get_invoices(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db)
-):
-    """Get all invoices with pagination"""
-    result = await db.execute(
-        select(Invoice).offset(skip).limit(limit)
-    )
-    invoices = result.scalars().all()
-    return invoices
-
-
-@router.get("/{invoice_id}", response_model=InvoiceResponse)
-async def get_invoice(
-    invoice_id: UUID,
-    db: AsyncSession = Depends(get_db)
-):
-    """Get a specific invoice by ID"""
-    result = await db.execute(
-        select(Invoice).where(Invoice.id == invoice_id)
-    )
-    invoice = result.scalar_one_or_none()
-    
-    if not invoice:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Invoice with id {invoice_id} not found"
-        )
-    
-    return invoice
-
-
-@router.put("/{invoice_id}", response_model=InvoiceResponse)
-async def update_invoice(
-    invoice_id: UUID,
-    invoice_data: InvoiceUpdate,
-    db: AsyncSession = Depends(get_db)
-):
-    """Update an invoice"""
-    result = await db.execute(
-        select(Invoice).where(Invoice.id == invoice_id)
-    )
-    invoice = result.scalar_one_or_none()
-    
-    if not invoice:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Invoice with id {invoice_id} not found"
-        )
-    
-    # Update only provided fields
-    update_data = invoice_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(invoice, field, value)
-    
-    await db.commit()
-    await db.refresh(invoice)
-    return invoice
-
-
-@router.delete("/{invoice_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_invoice(
-    invoice_id: UUID,
-    db: AsyncSession = Depends(get_db)
-):
-    """Delete an invoice"""
-    result = await db.execute(
-        select(Invoice).where(Invoice.id == invoice_id)
-    )
-    invoice = result.scalar_one_or_none()
-    
-    if not invoice:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Invoice with id {invoice_id} not found"
-        )
-    
-    await db.delete(invoice)
-    await db.commit()
-    return None
+router = APIRouter(prefix="/invoices", tags=["Invoices"], route_class=InstrumentedRoute)
+
+repository = Repository(Invoice)
+
+# Columns the list endpoint can be sorted by; "id" is the keyset tie-breaker
+SORT_COLUMNS = {
+    "invoice_date": Invoice.invoice_date,
+    "id": Invoice.id,
+}
+
+add_crud_routes(
+    router,
+    repository,
+    create_schema=InvoiceCreate,
+    update_schema=InvoiceUpdate,
+    response_schema=InvoiceResponse,
+    sort_columns=SORT_COLUMNS,
+    default_sort="invoice_date",
+    filters={"order_id": Invoice.order_id},
+    idempotency_scope="invoices.create",
+    export_column=Invoice.invoice_date,
+)
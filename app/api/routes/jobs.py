@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from app.core.metrics import InstrumentedRoute
+from app.db.session import get_db
+from app.schemas.job import JobResponse
+from app.services import jobs
+
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"], route_class=InstrumentedRoute)
+
+
+@router.get("/{job_id:uuid}", response_model=JobResponse)
+async def get_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Poll a background job: status, attempts, last error and, once done, its result"""
+    # Read from the primary: a replica may not have the job or its latest status yet
+    job = await jobs.repository.get(db, job_id)
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with id {job_id} not found"
+        )
+    
+    return job
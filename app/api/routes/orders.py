@@ -1,100 +1,66 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from sqlalchemy.orm import selectinload
+from typing import Any, List
 from uuid import UUID
 
-from app.db.session import get_db
+from app.api.crud import add_crud_routes
+from app.core.metrics import InstrumentedRoute
+from app.db.details import load_details
+from app.db.repository import Repository
+from app.db.session import get_db_read
 from app.models.order import Order
-from app.schemas.order import OrderCreate, OrderUpdate, OrderResponse
+from app.models.vehicle import Vehicle
+from app.schemas.order import OrderCreate, OrderUpdate, OrderResponse, OrderDetailResponse
+from app.services import status_events
 
 
-router = APIRouter(prefix="/orders", tags=["Orders"])
+router = APIRouter(prefix="/orders", tags=["Orders"], route_class=InstrumentedRoute)
 
+class OrderRepository(Repository[Order]):
+    """Pushes committed order writes to status event subscribers"""
 
-@router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
-async def create_order(
-    order_data: OrderCreate,
-    db: AsyncSession = Depends(get_db)
-):
-    """Create a new order"""
-    order = Order(**order_data.model_dump())
-    db.add(order)
-    await db.commit()
-    await db.refresh(order)
-    return order
+    async def after_commit(self, action: str, rows: List[Any], before: Any = None) -> None:
+        status_events.publish("orders", action, rows)
 
 
-@router.get("/", response_model=List[OrderResponse])
-async def get_orders(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db)
-):
-    """Get all orders with pagination"""
-    result = await db.execute(
-        select(Order).offset(skip).limit(limit)
-    )
-    orders = result.scalars().all()
-    return orders
+repository = OrderRepository(Order)
 
+# Columns the list endpoint can be sorted by; "id" is the keyset tie-breaker
+SORT_COLUMNS = {
+    "order_date": Order.order_date,
+    "id": Order.id,
+}
 
-@router.get("/{order_id}", response_model=OrderResponse)
-async def get_order(
-    order_id: UUID,
-    db: AsyncSession = Depends(get_db)
-):
-    """Get a specific order by ID"""
-    result = await db.execute(
-        select(Order).where(Order.id == order_id)
-    )
-    order = result.scalar_one_or_none()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Order with id {order_id} not found"
-        )
-    
-    return order
+add_crud_routes(
+    router,
+    repository,
+    create_schema=OrderCreate,
+    update_schema=OrderUpdate,
+    response_schema=OrderResponse,
+    sort_columns=SORT_COLUMNS,
+    default_sort="order_date",
+    filters={"user_id": Order.user_id, "vehicle_id": Order.vehicle_id},
+    idempotency_scope="orders.create",
+    export_column=Order.order_date,
+)
 
 
-@router.put("/{order_id}", response_model=OrderResponse)
-async def update_order(
+@router.get("/{order_id}/detail", response_model=OrderDetailResponse)
+async def get_order_detail(
     order_id: UUID,
-    order_data: OrderUpdate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db_read)
 ):
-    """Update an order"""
+    """Get an order with its payments, invoices and vehicle in one call"""
     result = await db.execute(
-        select(Order).where(Order.id == order_id)
-    )
-    order = result.scalar_one_or_none()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Order with id {order_id} not found"
+        select(Order)
+        .where(Order.id == order_id)
+        .options(
+            selectinload(Order.payments),
+            selectinload(Order.invoices),
+            selectinload(Order.vehicle).options(*load_details(Vehicle)),
         )
-    
-    # Update only provided fields
-    update_data = order_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(order, field, value)
-    
-    await db.commit()
-    await db.refresh(order)
-    return order
-
-
-@router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_order(
-    order_id: UUID,
-    db: AsyncSession = Depends(get_db)
-):
-    """Delete an order"""
-    result = await db.execute(
-        select(Order).where(Order.id == order_id)
     )
     order = result.scalar_one_or_none()
     
@@ -104,6 +70,4 @@ async def delete_order(
             detail=f"Order with id {order_id} not found"
         )
     
-    await db.delete(order)
-    await db.commit()
-    return None
+    return order
@@ -1,109 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
-from uuid import UUID
+from fastapi import APIRouter
+from typing import Any, List
 
-from app.db.session import get_db
+from app.api.crud import add_crud_routes
+from app.core.metrics import InstrumentedRoute
+from app.db.repository import Repository
 from app.models.payment import Payment
 from app.schemas.payment import PaymentCreate, PaymentUpdate, PaymentResponse
+from app.services import status_events
 
 
-router = APIRouter(prefix="/payments", tags=["Payments"])
+router = APIRouter(prefix="/payments", tags=["Payments"], route_class=InstrumentedRoute)
 
+class PaymentRepository(Repository[Payment]):
+    """Pushes committed payment writes to the payment's and its order's status event subscribers"""
 
-@router.post("/", response_model=PaymentResponse, status_code=status.HTTP_201_CREATED)
-async def create_payment(
-    payment_data: PaymentCreate,
-    db: AsyncSession = Depends(get_db)
-):
-    """Create a new payment"""
-    payment = Payment(**payment_data.model_dump())
-    db.add(payment)
-    await db.commit()
-    await db.refresh(payment)
-    return payment
+    # Deleted payments are published to their order's subscribers too
+    delete_returning = (Payment.order_id,)
 
+    async def after_commit(self, action: str, rows: List[Any], before: Any = None) -> None:
+        status_events.publish("payments", action, rows)
 
-@router.get("/", response_model=List[PaymentResponse])
-async def get_payments(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db)
-):
-    """Get all payments with pagination"""
-    result = await db.execute(
-        select(Payment).offset(skip).limit(limit)
-    )
-    payments = result.scalars().all()
-    return payments
 
+repository = PaymentRepository(Payment)
 
-@router.get("/{payment_id}", response_model=PaymentResponse)
-async def get_payment(
-    payment_id: UUID,
-    db: AsyncSession = Depends(get_db)
-):
-    """Get a specific payment by ID"""
-    result = await db.execute(
-        select(Payment).where(Payment.id == payment_id)
-    )
-    payment = result.scalar_one_or_none()
-    
-    if not payment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Payment with id {payment_id} not found"
-        )
-    
-    return payment
+# Columns the list endpoint can be sorted by; "id" is the keyset tie-breaker
+SORT_COLUMNS = {
+    "payment_date": Payment.payment_date,
+    "id": Payment.id,
+}
 
-
-@router.put("/{payment_id}", response_model=PaymentResponse)
-async def update_payment(
-    payment_id: UUID,
-    payment_data: PaymentUpdate,
-    db: AsyncSession = Depends(get_db)
-):
-    """Update a payment"""
-    result = await db.execute(
-        select(Payment).where(Payment.id == payment_id)
-    )
-    payment = result.scalar_one_or_none()
-    
-    if not payment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Payment with id {payment_id} not found"
-        )
-    
-    # Update only provided fields
-    update_data = payment_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(payment, field, value)
-    
-    await db.commit()
-    await db.refresh(payment)
-    return payment
-
-
-@router.delete("/{payment_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_payment(
-    payment_id: UUID,
-    db: AsyncSession = Depends(get_db)
-):
-    """Delete a payment"""
-    result = await db.execute(
-        select(Payment).where(Payment.id == payment_id)
-    )
-    payment = result.scalar_one_or_none()
-    
-    if not payment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Payment with id {payment_id} not found"
-        )
-    
-    await db.delete(payment)
-    await db.commit()
-    return None
+add_crud_routes(
+    router,
+    repository,
+    create_schema=PaymentCreate,
+    update_schema=PaymentUpdate,
+    response_schema=PaymentResponse,
+    sort_columns=SORT_COLUMNS,
+    default_sort="payment_date",
+    filters={"order_id": Payment.order_id},
+    idempotency_scope="payments.create",
+    export_column=Payment.payment_date,
+)
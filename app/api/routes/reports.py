@@ -0,0 +1,97 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import Literal, Optional
+
+from app.core.metrics import InstrumentedRoute
+from app.db.session import get_db_read
+from app.schemas.report import (
+    RevenueReport, OutstandingInvoicesReport, PaymentMethodReport, UserOrderTotalsReport,
+)
+from app.services import reports
+
+
+router = APIRouter(prefix="/reports", tags=["Reports"], route_class=InstrumentedRoute)
+
+
+def _check_range(start: date, end: date, max_days: int) -> None:
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must not be after end"
+        )
+    if (end - start).days >= max_days:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range is limited to {max_days} days"
+        )
+
+
+def _json(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/revenue", response_model=RevenueReport)
+async def get_revenue(
+    period: Literal["day", "month"] = "day",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    live: bool = False,
+    db: AsyncSession = Depends(get_db_read)
+):
+    """Revenue payment totals per day or month (inclusive `start`..`end`).
+
+    Payments count as revenue when their status is one of
+    `REPORT_REVENUE_STATUSES`.
+
+    Served from the daily rollups when they are enabled; `live=true` reads
+    the payments table instead.
+    """
+    start, end = reports.date_range(start, end, 30 if period == "day" else 365)
+    _check_range(start, end, 3660)
+    body = await reports.cached_report(
+        f"revenue:{period}:{start}:{end}:{live}",
+        lambda: reports.revenue_by_period(db, period, start, end, live)
+    )
+    return _json(body)
+
+
+@router.get("/payment-methods", response_model=PaymentMethodReport)
+async def get_payment_methods(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    live: bool = False,
+    db: AsyncSession = Depends(get_db_read)
+):
+    """Payment count and amount per payment method and status"""
+    start, end = reports.date_range(start, end, 30)
+    _check_range(start, end, 3660)
+    body = await reports.cached_report(
+        f"payment-methods:{start}:{end}:{live}",
+        lambda: reports.payment_method_breakdown(db, start, end, live)
+    )
+    return _json(body)
+
+
+@router.get("/invoices/outstanding", response_model=OutstandingInvoicesReport)
+async def get_outstanding_invoices(db: AsyncSession = Depends(get_db_read)):
+    """Invoice count and total per status, plus the amount still owed"""
+    body = await reports.cached_report("invoices:outstanding", lambda: reports.outstanding_invoices(db))
+    return _json(body)
+
+
+@router.get("/orders/by-user", response_model=UserOrderTotalsReport)
+async def get_order_totals_by_user(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db_read)
+):
+    """Users with the highest order totals in the range"""
+    start, end = reports.date_range(start, end, 30)
+    _check_range(start, end, 3660)
+    body = await reports.cached_report(
+        f"orders-by-user:{start}:{end}:{limit}",
+        lambda: reports.order_totals_by_user(db, start, end, limit)
+    )
+    return _json(body)
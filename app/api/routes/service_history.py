@@ -0,0 +1,171 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import Optional
+from datetime import datetime
+from uuid import UUID
+import os
+
+from app.api.pagination import SortOrder, paginate, paginate_columns
+from app.api.responses import FastJSONResponse, parse_fields
+from app.core.metrics import InstrumentedRoute
+from app.core.storage import LocalStorage, StoredFileNotFound, UploadTooLarge, storage
+from app.db.session import get_db, get_db_read
+from app.models.service_history import ServiceHistory
+from app.schemas.job import JobResponse
+from app.schemas.service_history import ServiceHistoryResponse
+from app.schemas.pagination import CursorPage
+from app.services import jobs, service_history, service_history_backfill
+
+
+router = APIRouter(prefix="/service-history", tags=["Service History"], route_class=InstrumentedRoute)
+
+# Columns the list endpoint can be sorted by; "id" is the keyset tie-breaker
+SORT_COLUMNS = {
+    "status_on": ServiceHistory.status_on,
+    "id": ServiceHistory.id,
+}
+
+UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}},
+    }
+}
+
+
+async def get_document(db: AsyncSession, document_id: UUID) -> ServiceHistory:
+    document = await db.scalar(select(ServiceHistory).where(ServiceHistory.id == document_id))
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Service history with id {document_id} not found"
+        )
+    return document
+
+
+@router.post("/", response_model=ServiceHistoryResponse, status_code=status.HTTP_201_CREATED,
+             openapi_extra=UPLOAD_BODY)
+async def upload_service_history(
+    request: Request,
+    vin: str = Query(..., min_length=1, max_length=64, pattern=service_history.VIN_PATTERN),
+    filename: Optional[str] = Query(None, max_length=255),
+    status_on: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Upload a service-history document as the raw request body.
+    
+    The body is streamed to storage in chunks, never buffered whole;
+    `filename` only supplies the stored file's extension.
+    """
+    max_bytes = service_history.max_upload_bytes()
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Upload exceeds {max_bytes} bytes"
+        )
+    
+    try:
+        return await service_history.store_document(db, vin, request.stream(), filename, status_on)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+
+
+@router.post("/backfill", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def backfill_service_history(
+    request: Request,
+    path: Optional[str] = Query(None, description="Directory under SERVICE_HISTORY_DIR (default: all of it)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Index documents already on disk as a background job; poll `GET /api/jobs/{id}` for the counts"""
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Backfill needs SERVICE_HISTORY_STORAGE=local"
+        )
+    
+    directory = None
+    if path is not None:
+        try:
+            directory = storage.path(path)
+        except StoredFileNotFound:
+            pass
+        if directory is None or not os.path.isdir(directory):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{path!r} is not a directory in service-history storage"
+            )
+    
+    job = await jobs.enqueue(db, service_history_backfill.BACKFILL_JOB, {"path": directory})
+    await db.commit()
+    jobs.notify(job.queue)
+    return jobs.accepted_response(job, str(request.url_for("get_job", job_id=job.id)))
+
+
+@router.get("/", response_model=CursorPage[ServiceHistoryResponse])
+async def get_service_history(
+    vin: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    sort: str = "status_on",
+    order: SortOrder = SortOrder.desc,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db_read)
+):
+    """Get service-history documents one keyset page at a time, optionally filtered by `vin` (newest first)"""
+    filters = []
+    if vin:
+        filters.append(ServiceHistory.vin == vin)
+    
+    field_names = parse_fields(ServiceHistoryResponse, fields)
+    if field_names:
+        items, next_cursor = await paginate_columns(
+            db, ServiceHistory, ServiceHistoryResponse, field_names, SORT_COLUMNS, sort, order, cursor, limit,
+            filters=filters
+        )
+        return FastJSONResponse({"items": items, "next_cursor": next_cursor})
+    
+    documents, next_cursor = await paginate(
+        db, select(ServiceHistory).where(*filters), SORT_COLUMNS, sort, order, cursor, limit
+    )
+    return {"items": documents, "next_cursor": next_cursor}
+
+
+@router.get("/{document_id}", response_model=ServiceHistoryResponse)
+async def get_service_history_document(
+    document_id: UUID,
+    db: AsyncSession = Depends(get_db_read)
+):
+    """Get a service-history record by ID"""
+    return await get_document(db, document_id)
+
+
+@router.api_route("/{document_id}/file", methods=["GET", "HEAD"])
+async def download_service_history(
+    document_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db_read)
+):
+    """Download the document; supports `Range` requests (206) and `If-Range`"""
+    document = await get_document(db, document_id)
+    try:
+        return await storage.download_response(
+            document.file_path or "", request, filename=service_history.download_filename(document)
+        )
+    except StoredFileNotFound:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"File for service history {document_id} not found"
+        )
+
+
+@router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_service_history(
+    document_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a service-history record and its file"""
+    document = await get_document(db, document_id)
+    await service_history.delete_document(db, document)
+    return None
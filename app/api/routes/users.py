@@ -1,54 +1,54 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
-from uuid import UUID
+from typing import Optional
 
-from app.db.session import get_db
+from app.api.crud import add_crud_routes
+from app.api.responses import FastJSONResponse, parse_fields, row_to_dict, select_columns
+from app.core.metrics import InstrumentedRoute
+from app.db.repository import Repository
+from app.db.session import get_db_read
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
 
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], route_class=InstrumentedRoute)
 
+repository = Repository(User)
 
-@router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(
-    user_data: UserCreate,
-    db: AsyncSession = Depends(get_db)
-):
-    """Create a new user"""
-    user = User(**user_data.model_dump())
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
-    return user
+# Columns the list endpoint can be sorted by; "id" is the keyset tie-breaker
+SORT_COLUMNS = {
+    "created_at": User.created_at,
+    "email": User.email,
+    "id": User.id,
+}
 
-
-@router.get("/", response_model=List[UserResponse])
-async def get_users(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db)
-):
-    """Get all users with pagination"""
-    result = await db.execute(
-        select(User).offset(skip).limit(limit)
-    )
-    users = result.scalars().all()
-    return users
+# Users are fetched by email (below) rather than by id
+add_crud_routes(
+    router,
+    repository,
+    create_schema=UserCreate,
+    update_schema=UserUpdate,
+    response_schema=UserResponse,
+    sort_columns=SORT_COLUMNS,
+    default_sort="created_at",
+    exclude=("get",),
+)
 
 
 @router.get("/{user_email}", response_model=UserResponse)
 async def get_user(
     user_email: str,
-    db: AsyncSession = Depends(get_db)
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db_read)
 ):
-    """Get a specific user by ID"""
+    """Get a specific user by email"""
+    field_names = parse_fields(UserResponse, fields)
+    query = select_columns(User, UserResponse, field_names) if field_names else select(User)
     result = await db.execute(
-        select(User).where(User.email == user_email)
+        query.where(User.email == user_email)
     )
-    user = result.scalar_one_or_none()
+    user = result.one_or_none() if field_names else result.scalar_one_or_none()
     
     if not user:
         raise HTTPException(
@@ -56,54 +56,6 @@ async def get_user(
             detail=f"User with email {user_email} not found"
         )
     
+    if field_names:
+        return FastJSONResponse(row_to_dict(user))
     return user
-
-
-@router.put("/{user_id}", response_model=UserResponse)
-async def update_user(
-    user_id: UUID,
-    user_data: UserUpdate,
-    db: AsyncSession = Depends(get_db)
-):
-    """Update a user"""
-    result = await db.execute(
-        select(User).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"User with id {user_id} not found"
-        )
-    
-    # Update only provided fields
-    update_data = user_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(user, field, value)
-    
-    await db.commit()
-    await db.refresh(user)
-    return user
-
-
-@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(
-    user_id: UUID,
-    db: AsyncSession = Depends(get_db)
-):
-    """Delete a user"""
-    result = await db.execute(
-        select(User).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"User with id {user_id} not found"
-        )
-    
-    await db.delete(user)
-    await db.commit()
-    return None
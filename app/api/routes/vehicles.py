@@ -1,42 +1,177 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_
-from typing import List
-from uuid import UUID
+from sqlalchemy import select
+import json
+import orjson
+from contextlib import nullcontext
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
-from app.db.session import get_db
+from app.api.crud import add_crud_routes
+from app.api.pagination import SortOrder, paginate
+from app.api.responses import FastJSONResponse, dumps, parse_fields, row_to_dict, select_columns
+from app.core.cache import cache, vehicle_cache_key
+from app.core.metrics import InstrumentedRoute
+from app.core.config import settings
+from app.core.storage import UploadTooLarge
+from app.db.dictionary import vehicle_values
+from app.db.repository import Repository
+from app.db.session import get_db, get_db_read, primary_for, read_session
 from app.models.vehicle import Vehicle
-from app.schemas.vehicle import VehicleCreate, VehicleUpdate, VehicleResponse
+from app.schemas.vehicle import (
+    VehicleCreate, VehicleUpdate, VehicleResponse, VehicleBulkResponse,
+    VehicleLookupRequest, VehicleLookupResponse, VehicleExpiryItem, VehicleExpirySummary,
+)
+from app.schemas.job import JobResponse
+from app.schemas.pagination import CursorPage
+from app.services import jobs, vehicle_bulk, vehicle_expiry, vehicle_lookup, vehicle_search
 
 
-router = APIRouter(prefix="/vehicles", tags=["Vehicles"])
+router = APIRouter(prefix="/vehicles", tags=["Vehicles"], route_class=InstrumentedRoute)
 
 
-@router.post("/", response_model=VehicleResponse, status_code=status.HTTP_201_CREATED)
-async def create_vehicle(
-    vehicle_data: VehicleCreate,
+class VehicleRepository(Repository[Vehicle]):
+    """Keeps the regNo cache and the search index in step with CRUD writes"""
+
+    delete_returning = (Vehicle.regNo,)
+
+    async def before_update(self, db: AsyncSession, changes: List[Tuple[Any, Dict[str, Any]]]) -> Dict[Any, str]:
+        # The old regNo's cache entry must go too; only look it up when it changes
+        ids = [id for id, data in changes if "regNo" in data]
+        if not ids:
+            return {}
+        result = await db.execute(select(Vehicle.id, Vehicle.regNo).where(Vehicle.id.in_(ids)))
+        return dict(result.all())
+
+    # Dictionary-encoded columns only bind values that already have an id: assign
+    # ids for new attribute strings first, in one round trip
+    async def create(self, db: AsyncSession, data: Dict[str, Any]) -> Vehicle:
+        await vehicle_values.ensure_rows(Vehicle, [data])
+        return await super().create(db, data)
+
+    async def create_many(self, db: AsyncSession, data: List[Dict[str, Any]]) -> List[Vehicle]:
+        await vehicle_values.ensure_rows(Vehicle, data)
+        return await super().create_many(db, data)
+
+    async def update(self, db: AsyncSession, id: Any, data: Dict[str, Any]) -> Optional[Vehicle]:
+        await vehicle_values.ensure_rows(Vehicle, [data])
+        return await super().update(db, id, data)
+
+    async def update_many(self, db: AsyncSession, changes: List[Tuple[Any, Dict[str, Any]]]) -> List[Vehicle]:
+        await vehicle_values.ensure_rows(Vehicle, [data for _, data in changes])
+        return await super().update_many(db, changes)
+
+    async def after_commit(self, action: str, rows: List[Any], before: Optional[Dict[Any, str]] = None) -> None:
+        before = before or {}
+        keys = [vehicle_cache_key(row.regNo) for row in rows]
+        keys += [vehicle_cache_key(regNo) for regNo in before.values()]
+        if action != "create":
+            await cache.delete(*keys)
+        for row in rows:
+            if action == "delete":
+                vehicle_search.unindex_vehicle(row.id)
+            else:
+                vehicle_search.index_vehicle(row)
+
+
+repository = VehicleRepository(Vehicle)
+
+# Larger lookups are streamed instead of buffered into one body
+LOOKUP_STREAM_THRESHOLD = 500
+
+# Columns the list endpoint can be sorted by; "id" is the keyset tie-breaker
+SORT_COLUMNS = {
+    "id": Vehicle.id,
+    "regNo": Vehicle.regNo,
+}
+
+# Vehicles are fetched by regNo (cached, below) rather than by id
+add_crud_routes(
+    router,
+    repository,
+    create_schema=VehicleCreate,
+    update_schema=VehicleUpdate,
+    response_schema=VehicleResponse,
+    sort_columns=SORT_COLUMNS,
+    default_sort="id",
+    exclude=("get",),
+)
+
+
+@router.post("/bulk", response_model=VehicleBulkResponse, responses={202: {"model": JobResponse}})
+async def bulk_upsert_vehicles(
+    request: Request,
+    key: Literal["regNo", "chassis"] = "regNo",
+    prefer: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
-    """Create a new vehicle"""
-    vehicle = Vehicle(**vehicle_data.model_dump())
-    db.add(vehicle)
-    await db.commit()
-    await db.refresh(vehicle)
-    return vehicle
-
-
-@router.get("/", response_model=List[VehicleResponse])
-async def get_vehicles(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    """Create or replace many vehicles from a JSON array or an NDJSON stream.
+
+    Rows are upserted on `key`; an existing vehicle is overwritten with the
+    submitted row. Every input row gets a result with its index; a line that
+    is not valid JSON is reported as that row's error.
+
+    With `Prefer: respond-async` the body is stored (up to
+    `VEHICLE_BULK_MAX_ASYNC_MB`) and imported by a background job; the
+    response is 202 with the job; poll `GET /api/jobs/{id}` for the result.
+    """
+    respond_async = prefer is not None and "respond-async" in prefer.lower()
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+    if respond_async:
+        max_bytes = vehicle_bulk.max_async_bytes()
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Upload exceeds {max_bytes} bytes"
+            )
+        try:
+            job = await vehicle_bulk.enqueue_bulk_upsert(db, request.stream(), ndjson, key)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+        jobs.notify(job.queue)
+        return jobs.accepted_response(job, str(request.url_for("get_job", job_id=job.id)))
+    
+    if ndjson:
+        rows = vehicle_bulk.iter_ndjson(request.stream())
+    else:
+        try:
+            payload = json.loads(await request.body())
+        except ValueError:
+            payload = None
+        if not isinstance(payload, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a JSON array of vehicles or an application/x-ndjson body"
+            )
+        rows = vehicle_bulk.aiter_list(payload)
+    
+    return await vehicle_bulk.bulk_upsert_vehicles(db, rows, key=key)
+
+
+@router.post("/lookup", response_model=VehicleLookupResponse)
+async def lookup_vehicles(
+    lookup: VehicleLookupRequest,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db_read)
 ):
-    """Get all vehicles with pagination"""
-    result = await db.execute(
-        select(Vehicle).offset(skip).limit(limit)
-    )
-    vehicles = result.scalars().all()
-    return vehicles
+    """Resolve many registration (or chassis) numbers in one call.
+
+    Returns the vehicles found and the keys that matched nothing. Cached
+    vehicles are served from the same cache as `GET /vehicles/{regNo}`.
+    """
+    field_names = parse_fields(VehicleResponse, fields)
+    if len(lookup.keys) <= LOOKUP_STREAM_THRESHOLD:
+        chunks = vehicle_lookup.lookup_vehicles(db, lookup.keys, lookup.by, field_names)
+        return Response(content=b"".join([chunk async for chunk in chunks]), media_type="application/json")
+    
+    async def stream():
+        # The request's session is closed before a streaming body is sent
+        async with read_session() as session:
+            async for chunk in vehicle_lookup.lookup_vehicles(session, lookup.keys, lookup.by, field_names):
+                yield chunk
+    
+    return StreamingResponse(stream(), media_type="application/json")
 
 
 @router.get("/search", response_model=List[VehicleResponse])
@@ -44,29 +179,23 @@ async def search_vehicles(
     regNo: str | None = None,
     chassis: str | None = None,
     engine: str | None = None,
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db_read)
 ):
-    """Search vehicles by registration number, chassis, and/or engine number"""
+    """Fuzzy search vehicles by registration number, chassis, and/or engine number.
+
+    Inputs are matched on normalized keys (uppercase, no spaces or dashes) and
+    results are ranked: exact match, then prefix, then substring/similarity.
+    """
     if not any([regNo, chassis, engine]):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="At least one search parameter (regNo, chassis, or engine) must be provided"
         )
     
-    # Build query conditions
-    conditions = []
-    if regNo:
-        conditions.append(Vehicle.regNo.ilike(f"%{regNo}%"))
-    if chassis:
-        conditions.append(Vehicle.chassis.ilike(f"%{chassis}%"))
-    if engine:
-        conditions.append(Vehicle.engine.ilike(f"%{engine}%"))
-    
-    # Use OR condition to match any of the provided parameters
-    query = select(Vehicle).where(or_(*conditions))
-    
-    result = await db.execute(query)
-    vehicles = result.scalars().all()
+    vehicles = await vehicle_search.search_vehicles(
+        db, regNo=regNo, chassis=chassis, engine=engine, limit=limit
+    )
     
     if not vehicles:
         raise HTTPException(
@@ -77,71 +206,88 @@ async def search_vehicles(
     return vehicles
 
 
-@router.get("/{regNo}", response_model=VehicleResponse)
-async def get_vehicle(
-    regNo: str,
-    db: AsyncSession = Depends(get_db)
+@router.get("/expiring", response_model=CursorPage[VehicleExpiryItem])
+async def get_expiring_vehicles(
+    kind: Literal["rc", "insurance", "pucc", "permit"],
+    within_days: int = Query(30, ge=0, le=3650),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db_read)
 ):
-    """Get a specific vehicle by registration number"""
-    result = await db.execute(
-        select(Vehicle).where(Vehicle.regNo == regNo)
+    """Vehicles whose `kind` document expires in the next `within_days` days, soonest first"""
+    column = vehicle_expiry.EXPIRY_COLUMNS[kind]
+    start, end = vehicle_expiry.expiry_window(within_days)
+    query = (
+        select(Vehicle.id, Vehicle.regNo, Vehicle.owner, Vehicle.model, Vehicle.mobileNumber, column)
+        .where(column >= start, column < end)
     )
-    vehicle = result.scalar_one_or_none()
-    
-    if not vehicle:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Vehicle with regNo {regNo} not found"
-        )
-    
-    return vehicle
+    rows, next_cursor = await paginate(
+        db, query, {column.key: column, "id": Vehicle.id}, column.key, SortOrder.asc, cursor, limit,
+        scalars=False
+    )
+    items = [
+        {
+            "id": row.id,
+            "regNo": row.regNo,
+            "owner": row.owner,
+            "model": row.model,
+            "mobileNumber": row.mobileNumber,
+            "kind": kind,
+            "expires_on": getattr(row, column.key),
+        }
+        for row in rows
+    ]
+    return {"items": items, "next_cursor": next_cursor}
 
 
-@router.put("/{vehicle_id}", response_model=VehicleResponse)
-async def update_vehicle(
-    vehicle_id: UUID,
-    vehicle_data: VehicleUpdate,
-    db: AsyncSession = Depends(get_db)
+@router.get("/expiring/summary", response_model=VehicleExpirySummary)
+async def get_expiry_summary(
+    # The buckets only reach EXPIRY_BUCKET_HORIZON_DAYS ahead; a longer window would undercount
+    within_days: int = Query(30, ge=0, le=settings.EXPIRY_BUCKET_HORIZON_DAYS),
+    db: AsyncSession = Depends(get_db_read)
 ):
-    """Update a vehicle"""
-    result = await db.execute(
-        select(Vehicle).where(Vehicle.id == vehicle_id)
-    )
-    vehicle = result.scalar_one_or_none()
-    
-    if not vehicle:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Vehicle with id {vehicle_id} not found"
-        )
-    
-    # Update only provided fields
-    update_data = vehicle_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(vehicle, field, value)
-    
-    await db.commit()
-    await db.refresh(vehicle)
-    return vehicle
+    """Per-day expiry counts from the precomputed buckets (refreshed in the background).
 
+    `within_days` is limited to the bucket horizon (`EXPIRY_BUCKET_HORIZON_DAYS`);
+    use `/expiring` for longer windows.
+    """
+    return await vehicle_expiry.expiry_summary(db, within_days)
 
-@router.delete("/{vehicle_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_vehicle(
-    vehicle_id: UUID,
-    db: AsyncSession = Depends(get_db)
+
+@router.get("/{regNo}", response_model=VehicleResponse)
+async def get_vehicle(
+    regNo: str,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db_read)
 ):
-    """Delete a vehicle"""
-    result = await db.execute(
-        select(Vehicle).where(Vehicle.id == vehicle_id)
-    )
-    vehicle = result.scalar_one_or_none()
+    """Get a specific vehicle by registration number (read-through cached).
+
+    With `fields`, a cached full payload is projected in memory; on a miss
+    only the requested columns are read (from a replica) and nothing is cached.
+    """
+    field_names = parse_fields(VehicleResponse, fields)
+    cache_key = vehicle_cache_key(regNo)
+    body = await cache.get(cache_key)
+    if body is not None:
+        if field_names:
+            full = orjson.loads(body)
+            return FastJSONResponse({name: full.get(name) for name in field_names})
+        return Response(content=body, media_type="application/json")
     
-    if not vehicle:
+    # A full row fills the shared cache, so it is read from the primary
+    async with (primary_for(db) if not field_names else nullcontext(db)) as source:
+        result = await source.execute(
+            select_columns(Vehicle, VehicleResponse, field_names).where(Vehicle.regNo == regNo)
+        )
+        row = result.one_or_none()
+    
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Vehicle with id {vehicle_id} not found"
+            detail=f"Vehicle with regNo {regNo} not found"
         )
     
-    await db.delete(vehicle)
-    await db.commit()
-    return None
+    body = dumps(row_to_dict(row))
+    if not field_names:
+        await cache.set(cache_key, body, settings.VEHICLE_CACHE_TTL)
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,217 @@
+"""
+Pluggable byte cache
+
+Values are pre-serialized response bodies (bytes). Two backends are provided:
+an in-process LRU with per-entry TTL, and a Redis backend that works with any
+client exposing the ``redis.asyncio`` ``get``/``set``/``delete``/``mget``
+coroutines and ``pipeline``.
+
+The in-process cache is only used with a single worker: an invalidation
+reaches the process that handled the write, so other workers would keep
+serving the old body until its TTL. With ``WORKERS`` > 1 it is replaced by
+no cache at all; use Redis there.
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class Cache:
+    """Base cache with hit/miss accounting; backend failures degrade to misses"""
+
+    backend = "none"
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    async def _get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def _set(self, key: str, value: bytes, ttl: int) -> None:
+        return None
+
+    async def _delete(self, *keys: str) -> None:
+        return None
+
+    async def _get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [await self._get(key) for key in keys]
+
+    async def _set_many(self, items: Dict[str, bytes], ttl: int) -> None:
+        for key, value in items.items():
+            await self._set(key, value, ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = await self._get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache get failed for {key}: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.sets += 1
+        try:
+            await self._set(key, value, ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache set failed for {key}: {e}")
+
+    async def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        """Look up many keys in one backend round trip; returns only the hits"""
+        if not keys:
+            return {}
+        try:
+            values = await self._get_many(keys)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache get_many failed for {len(keys)} keys: {e}")
+            values = [None] * len(keys)
+        found = {key: value for key, value in zip(keys, values) if value is not None}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def set_many(self, items: Dict[str, bytes], ttl: int) -> None:
+        if not items:
+            return
+        self.sets += len(items)
+        try:
+            await self._set_many(items, ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache set_many failed for {len(items)} keys: {e}")
+
+    async def delete(self, *keys: str) -> None:
+        keys = tuple(key for key in keys if key)
+        if not keys:
+            return
+        self.invalidations += len(keys)
+        try:
+            await self._delete(*keys)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache invalidation failed for {', '.join(keys)}: {e}")
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "sets": self.sets,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+
+
+class NullCache(Cache):
+    """Caching disabled; every lookup is a miss"""
+
+
+class MemoryCache(Cache):
+    """Process-local LRU cache with a TTL per entry"""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 10000):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def _get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def _set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, object]:
+        stats = super().stats()
+        stats["entries"] = len(self._entries)
+        return stats
+
+
+class RedisCache(Cache):
+    """Shared cache on Redis (or anything speaking the redis.asyncio API)"""
+
+    backend = "redis"
+
+    def __init__(self, client, prefix: str = "checkr:"):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+
+    async def _get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def _set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+    async def _delete(self, *keys: str) -> None:
+        await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def _get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self.client.mget([self.prefix + key for key in keys])
+
+    async def _set_many(self, items: Dict[str, bytes], ttl: int) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(self.prefix + key, value, ex=ttl)
+            await pipe.execute()
+
+
+def build_cache() -> Cache:
+    """Create the cache configured by CACHE_BACKEND"""
+    backend = settings.CACHE_BACKEND.lower()
+    if backend == "memory":
+        if settings.WORKERS > 1:
+            logger.warning(
+                f"CACHE_BACKEND=memory cannot be invalidated across {settings.WORKERS} workers; "
+                "caching is disabled (use CACHE_BACKEND=redis)"
+            )
+            return NullCache()
+        return MemoryCache(max_entries=settings.CACHE_MAX_ENTRIES)
+    if backend == "redis":
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from e
+        return RedisCache(redis_asyncio.from_url(settings.CACHE_URL))
+    return NullCache()
+
+
+cache = build_cache()
+
+
+def vehicle_cache_key(reg_no: Optional[str]) -> Optional[str]:
+    return f"vehicle:regNo:{reg_no}" if reg_no else None
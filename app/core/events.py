@@ -0,0 +1,205 @@
+"""
+In-process event broker with PostgreSQL LISTEN/NOTIFY fan-out
+
+Subscribers register interest in topics (e.g. ``"orders:<id>"``) and are
+handed the events published to any of them. A subscription keeps at most one
+pending event per key, the latest, so a slow reader costs bounded memory and
+catches up to the current state instead of working through a backlog; there
+is no per-client queue to overflow. Each process caps its open subscriptions
+at ``EVENTS_MAX_CONNECTIONS``.
+
+With PostgreSQL, ``publish`` hands events to a relay task that sends them
+with ``NOTIFY`` on its own connection, which also ``LISTEN``s: every worker
+process, the publisher included, delivers what it hears to its local
+subscribers. Events wait in a bounded outbox while the relay reconnects;
+once that is full they are delivered in this process only. Whenever the
+relay (re)connects, subscribers are told to resync, since NOTIFYs sent
+while it was away were missed. Without PostgreSQL events stay in-process.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import orjson
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads must stay under 8000 bytes
+MAX_NOTIFY_BYTES = 7900
+
+# Most payloads sent per NOTIFY round trip
+NOTIFY_BATCH_SIZE = 100
+
+# Seconds between liveness checks of an idle relay connection
+RELAY_HEALTH_INTERVAL = 10
+
+
+class Subscription:
+    """One reader's topics and its pending events, at most one per key"""
+
+    def __init__(self, topics: Iterable[str]):
+        self.topics = frozenset(topics)
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.resync = False
+        self._ready = asyncio.Event()
+
+    def offer(self, key: str, event: Dict[str, Any]) -> None:
+        # Replaces an undelivered older event for the same key
+        self.pending[key] = event
+        self._ready.set()
+
+    def request_resync(self) -> None:
+        self.resync = True
+        self._ready.set()
+
+    async def next(self, timeout: float) -> List[Dict[str, Any]]:
+        """Wait up to ``timeout`` seconds and take the pending events ([] on timeout or resync)"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        events = list(self.pending.values())
+        self.pending.clear()
+        return events
+
+    def take_resync(self) -> bool:
+        resync, self.resync = self.resync, False
+        return resync
+
+
+class EventBroker:
+    """Topic -> subscriptions map for this process, optionally relayed through NOTIFY"""
+
+    def __init__(self, channel: str, max_subscriptions: int):
+        self.channel = channel
+        self.max_subscriptions = max_subscriptions
+        self.subscriptions: Set[Subscription] = set()
+        self.by_topic: Dict[str, Set[Subscription]] = {}
+        # Set while the relay runs; None delivers in-process only
+        self.outbox: Optional[asyncio.Queue] = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def full(self) -> bool:
+        return len(self.subscriptions) >= self.max_subscriptions
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        subscription = Subscription(topics)
+        self.subscriptions.add(subscription)
+        for topic in subscription.topics:
+            self.by_topic.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+        for topic in subscription.topics:
+            subscribers = self.by_topic.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.by_topic[topic]
+
+    def deliver(self, topics: Iterable[str], key: str, event: Dict[str, Any]) -> None:
+        """Hand ``event`` to this process's subscribers of any of ``topics``"""
+        subscribers = set().union(*(self.by_topic.get(topic, ()) for topic in topics))
+        for subscription in subscribers:
+            subscription.offer(key, event)
+        self.delivered += len(subscribers)
+
+    def publish(self, topics: List[str], key: str, event: Dict[str, Any]) -> None:
+        """Send ``event`` (plain JSON types) to the subscribers of ``topics`` in every process"""
+        self.published += 1
+        if self.outbox is None:
+            self.deliver(topics, key, event)
+            return
+        payload = orjson.dumps({"t": topics, "k": key, "e": event}).decode()
+        if len(payload) > MAX_NOTIFY_BYTES:
+            logger.warning(f"Event {key} is too large to NOTIFY; delivered in this process only")
+            self.deliver(topics, key, event)
+            return
+        try:
+            self.outbox.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self.deliver(topics, key, event)
+
+    def resync_all(self) -> None:
+        for subscription in self.subscriptions:
+            subscription.request_resync()
+
+    def on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = orjson.loads(payload)
+            self.deliver(message["t"], message["k"], message["e"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed event on {channel}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscriptions": len(self.subscriptions),
+            "topics": len(self.by_topic),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "outbox": self.outbox.qsize() if self.outbox is not None else 0,
+            "relay": self.outbox is not None,
+        }
+
+
+broker = EventBroker(settings.EVENTS_CHANNEL, settings.EVENTS_MAX_CONNECTIONS)
+
+
+async def run_relay(url: str) -> None:
+    """LISTEN for events and NOTIFY the outbox's until cancelled, reconnecting with backoff"""
+    engine = create_async_engine(url, poolclass=NullPool)
+    broker.outbox = asyncio.Queue(maxsize=settings.EVENTS_OUTBOX_SIZE)
+    unsent: List[str] = []
+    delay = 1
+    try:
+        while True:
+            try:
+                async with engine.connect() as conn:
+                    # The driver's own connection: no implicit transaction, so NOTIFYs go out at once
+                    raw = (await conn.get_raw_connection()).driver_connection
+                    await raw.add_listener(broker.channel, broker.on_notify)
+                    logger.info(f"Listening for events on {broker.channel!r}")
+                    broker.resync_all()
+                    delay = 1
+                    while True:
+                        if not unsent:
+                            try:
+                                unsent = [await asyncio.wait_for(broker.outbox.get(), RELAY_HEALTH_INTERVAL)]
+                            except asyncio.TimeoutError:
+                                await raw.execute("SELECT 1")
+                                continue
+                            while len(unsent) < NOTIFY_BATCH_SIZE and not broker.outbox.empty():
+                                unsent.append(broker.outbox.get_nowait())
+                        await raw.executemany(
+                            "SELECT pg_notify($1, $2)", [(broker.channel, payload) for payload in unsent]
+                        )
+                        unsent = []
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event relay connection failed, retrying in {delay}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+    finally:
+        broker.outbox = None
+        await engine.dispose()
+
+
+def start_event_relay():
+    """Start the LISTEN/NOTIFY relay on PostgreSQL; returns the task (or None)"""
+    url = settings.EVENTS_LISTEN_URL or settings.DATABASE_URL
+    if not settings.EVENTS_RELAY_ENABLED or make_url(url).get_backend_name() != "postgresql":
+        return None
+    return asyncio.create_task(run_relay(url))
@@ -0,0 +1,290 @@
+"""
+Request instrumentation and Prometheus-style metrics
+
+- ``MetricsMiddleware`` (pure ASGI) times every request per route template
+  and adds a ``Server-Timing`` header with the DB time spent so far.
+- SQLAlchemy cursor events count queries and DB time per request and log
+  statements slower than ``SLOW_QUERY_THRESHOLD_MS``.
+- ``InstrumentedRoute`` splits handler time into endpoint time and response
+  validation/serialization time.
+- Pool checkout wait is recorded by the pool class in ``app.db.pool``.
+
+Metrics live in process memory, so each gunicorn worker exposes its own
+``/metrics``.
+"""
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+
+class RequestStats:
+    """Per-request accumulators, reachable from SQLAlchemy events via a ContextVar"""
+
+    __slots__ = ("route", "db_queries", "db_time", "endpoint_time", "pool_wait")
+
+    def __init__(self):
+        self.route: Optional[str] = None
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.endpoint_time: Optional[float] = None
+        self.pool_wait = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[label_values] = series
+            counts, total = series
+            counts[bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _format_labels(self.labels, label_values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += counts[-1]
+            le = _format_labels(self.labels, label_values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {total[0]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {cumulative}")
+        return lines
+
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "End-to-end request latency", ("method", "route")
+)
+SERIALIZATION_DURATION = Histogram(
+    "http_response_serialization_seconds",
+    "Time spent validating and encoding the endpoint's return value",
+    ("method", "route"),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Total database cursor time per request", ("method", "route")
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "Database statements executed per request", ("method", "route"), COUNT_BUCKETS
+)
+DB_QUERY_DURATION = Histogram("db_query_duration_seconds", "Duration of individual database statements")
+SLOW_QUERIES = Counter("db_slow_queries_total", "Statements slower than SLOW_QUERY_THRESHOLD_MS")
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection"
+)
+JOB_RUNS = Counter(
+    "jobs_total", "Background job runs by outcome ('succeeded', 'retried', 'failed')", ("queue", "kind", "outcome")
+)
+JOB_DURATION = Histogram("job_duration_seconds", "Background job run time", ("queue", "kind"), JOB_BUCKETS)
+
+_METRICS = (
+    REQUESTS, REQUEST_DURATION, SERIALIZATION_DURATION, DB_TIME_PER_REQUEST,
+    DB_QUERIES_PER_REQUEST, DB_QUERY_DURATION, SLOW_QUERIES, POOL_CHECKOUT_WAIT,
+    JOB_RUNS, JOB_DURATION,
+)
+
+# Extra gauge providers (e.g. cache and pool stats) called at scrape time
+_gauge_providers: List[Callable[[], Dict[str, float]]] = []
+
+
+def register_gauges(provider: Callable[[], Dict[str, float]]) -> None:
+    """Register a callable returning {metric_name: value} to expose as gauges"""
+    _gauge_providers.append(provider)
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for provider in _gauge_providers:
+        for name, value in provider().items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def record_pool_wait(seconds: float) -> None:
+    POOL_CHECKOUT_WAIT.observe(seconds)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.pool_wait += seconds
+
+
+def instrument_engine(engine) -> None:
+    """Attach query counting/timing and slow-query logging to an (async) engine"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        DB_QUERY_DURATION.observe(elapsed)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_time += elapsed
+
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold > 0 and elapsed * 1000 >= threshold:
+            SLOW_QUERIES.inc()
+            route = stats.route if stats is not None else None
+            logger.warning(
+                f"Slow query ({elapsed * 1000:.1f}ms, route={route}): {' '.join(statement.split())[:1000]}"
+            )
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute that records how long the endpoint itself took"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        call = self.dependant.call
+        if call is None or not asyncio.iscoroutinefunction(call):
+            return
+
+        @wraps(call)
+        async def timed_call(*call_args, **call_kwargs):
+            started = time.perf_counter()
+            try:
+                return await call(*call_args, **call_kwargs)
+            finally:
+                stats = _request_stats.get()
+                if stats is not None:
+                    stats.endpoint_time = time.perf_counter() - started
+
+        self.dependant.call = timed_call
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            started = time.perf_counter()
+            response = await handler(request)
+            stats = _request_stats.get()
+            if stats is not None and stats.endpoint_time is not None:
+                # What the handler spent beyond the endpoint: validating and
+                # encoding the return value (plus negligible dependency setup)
+                serialize = max(0.0, time.perf_counter() - started - stats.endpoint_time)
+                SERIALIZATION_DURATION.observe(serialize, request.method, self.path_format)
+            return response
+
+        return timed_handler
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing each HTTP request by route template"""
+
+    def __init__(self, app, exclude_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        stats.route = scope["path"]  # replaced by the route template once routing has run
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timing = (
+                    f"db;dur={stats.db_time * 1000:.2f};desc=\"{stats.db_queries} queries\", "
+                    f"app;dur={(time.perf_counter() - started) * 1000:.2f}"
+                )
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            route_path = getattr(route, "path_format", None) or "unmatched"
+            stats.route = route_path
+            method = scope["method"]
+            REQUESTS.inc(method, route_path, str(status_code))
+            REQUEST_DURATION.observe(elapsed, method, route_path)
+            DB_TIME_PER_REQUEST.observe(stats.db_time, method, route_path)
+            DB_QUERIES_PER_REQUEST.observe(stats.db_queries, method, route_path)
+            _request_stats.reset(token)
@@ -0,0 +1,33 @@
+"""
+Periodic maintenance loops
+
+Purges, rollup refreshes and health checks run inside every app process as
+``run_periodic`` loops started from the lifespan. A run that raises is
+logged and the loop carries on at the next interval, so one bad run (e.g.
+the database restarting) never stops the task for the life of the process.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodic(name: str, interval: float, func: Callable[[], Awaitable[Any]]) -> None:
+    """Await ``func()`` every ``interval`` seconds until cancelled"""
+    while True:
+        try:
+            await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"{name} failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def start_periodic(name: str, interval: float, func: Callable[[], Awaitable[Any]]) -> Optional[asyncio.Task]:
+    """Start ``run_periodic`` unless ``interval`` is 0 (disabled); returns the task (or None)"""
+    if interval <= 0:
+        return None
+    return asyncio.create_task(run_periodic(name, interval, func))
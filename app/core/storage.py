@@ -0,0 +1,156 @@
+"""
+Document storage for uploaded files
+
+Uploads are written from the request stream in chunks, so a file is never
+held in memory whole, and are published atomically: data goes to a
+``.part`` file that is renamed into place once complete. Downloads are
+returned as ready-made responses so each backend can serve them the cheapest
+way it has (sendfile for local disk, a redirect to a signed URL for an
+object store).
+"""
+import functools
+import os
+import stat
+import uuid
+from typing import AsyncIterable, AsyncIterator, Optional
+
+import anyio
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.api.files import RangeFileResponse
+from app.core.config import settings
+
+
+# Uploads in progress; never indexed or served
+PARTIAL_SUFFIX = ".part"
+
+# Incoming chunks are coalesced up to this size before each (threaded) write
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class StoredFileNotFound(Exception):
+    pass
+
+
+class Storage:
+    """Backend interface; keys are relative '/'-separated paths"""
+
+    backend = "none"
+
+    async def save(self, key: str, chunks: AsyncIterable[bytes], max_bytes: Optional[int] = None) -> int:
+        """Store the streamed ``chunks`` under ``key``; returns the size in bytes"""
+        raise NotImplementedError
+
+    def read(self, key: str) -> AsyncIterator[bytes]:
+        """Stream ``key``'s contents in chunks; raises ``StoredFileNotFound``"""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def download_response(self, key: str, request: Request, filename: Optional[str] = None) -> Response:
+        """Response serving ``key``; raises ``StoredFileNotFound``"""
+        raise NotImplementedError
+
+
+def _unlink_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class LocalStorage(Storage):
+    """Files under a root directory on local (or network-mounted) disk"""
+
+    backend = "local"
+
+    def __init__(self, root: str):
+        self.root = os.path.realpath(root)
+
+    def path(self, key: str) -> str:
+        """Absolute path for ``key``; refuses keys that resolve outside the root"""
+        path = os.path.realpath(os.path.join(self.root, key))
+        if os.path.commonpath([path, self.root]) != self.root:
+            raise StoredFileNotFound(f"{key!r} is outside the storage root")
+        return path
+
+    def key(self, path: str) -> str:
+        """Inverse of ``path``"""
+        return os.path.relpath(os.path.realpath(path), self.root).replace(os.sep, "/")
+
+    async def save(self, key: str, chunks: AsyncIterable[bytes], max_bytes: Optional[int] = None) -> int:
+        target = self.path(key)
+        await anyio.to_thread.run_sync(functools.partial(os.makedirs, os.path.dirname(target), exist_ok=True))
+        partial = f"{target}.{uuid.uuid4().hex}{PARTIAL_SUFFIX}"
+        size = 0
+        buffer = bytearray()
+        try:
+            async with await anyio.open_file(partial, "wb") as file:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if max_bytes is not None and size > max_bytes:
+                        raise UploadTooLarge(max_bytes)
+                    buffer += chunk
+                    if len(buffer) >= WRITE_BUFFER_SIZE:
+                        await file.write(buffer)
+                        del buffer[:]
+                if buffer:
+                    await file.write(buffer)
+            await anyio.to_thread.run_sync(os.replace, partial, target)
+        except BaseException:
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(_unlink_quietly, partial)
+            raise
+        return size
+
+    async def read(self, key: str) -> AsyncIterator[bytes]:
+        try:
+            file = await anyio.open_file(self.path(key), "rb")
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            raise StoredFileNotFound(key)
+        async with file:
+            while chunk := await file.read(WRITE_BUFFER_SIZE):
+                yield chunk
+
+    async def delete(self, key: str) -> None:
+        await anyio.to_thread.run_sync(_unlink_quietly, self.path(key))
+
+    async def download_response(self, key: str, request: Request, filename: Optional[str] = None) -> Response:
+        path = self.path(key)
+        try:
+            stat_result = await anyio.to_thread.run_sync(os.stat, path)
+        except (FileNotFoundError, NotADirectoryError):
+            raise StoredFileNotFound(key)
+        if not stat.S_ISREG(stat_result.st_mode):
+            raise StoredFileNotFound(key)
+        return RangeFileResponse(
+            path,
+            stat_result=stat_result,
+            range_header=request.headers.get("range"),
+            if_range=request.headers.get("if-range"),
+            filename=filename,
+            method=request.method,
+        )
+
+
+def build_storage() -> Storage:
+    """Create the storage configured by SERVICE_HISTORY_STORAGE"""
+    backend = settings.SERVICE_HISTORY_STORAGE.lower()
+    if backend == "local":
+        return LocalStorage(settings.SERVICE_HISTORY_DIR)
+    raise RuntimeError(f"Unknown SERVICE_HISTORY_STORAGE backend: {settings.SERVICE_HISTORY_STORAGE}")
+
+
+storage = build_storage()
+
+# Request bodies handed to background jobs (e.g. async bulk imports); kept
+# apart from the documents so the service-history backfill never sees them
+spool = LocalStorage(settings.JOB_SPOOL_DIR)
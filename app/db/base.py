@@ -1,3 +1,31 @@
+from sqlalchemy import DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.sql.expression import FunctionElement
 
 Base = declarative_base()
+
+
+class db_utcnow(FunctionElement):
+    """The database's clock as a naive UTC timestamp, so every app host stamps rows alike"""
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(db_utcnow, "postgresql")
+def _compile_db_utcnow_postgresql(element, compiler, **kw):
+    # Statement time rather than now()'s transaction start: closer to when the write commits
+    return "timezone('utc', clock_timestamp())"
+
+
+@compiles(db_utcnow, "sqlite")
+def _compile_db_utcnow_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    """Let the PostgreSQL UUID columns create on SQLite (local benchmarks/tests)"""
+    return "CHAR(32)"
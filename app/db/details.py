@@ -0,0 +1,77 @@
+"""
+Vertically split tables
+
+A wide model can keep its rarely read columns in a 1:1 details table keyed
+on the parent's id (``vehicles`` -> ``vehicle_details``), so scans and index
+lookups over the hot columns touch fewer, denser pages. The parent declares
+the link with ``details_relationship`` and proxies each detail column, so
+instances and payloads keep their original shape.
+
+Nothing reads the details table implicitly: the relationship is
+``lazy="raise"``. ORM queries that serialize whole rows add
+``load_details(model)`` (one LEFT OUTER JOIN), column projections outer join
+it only when a detail column is selected (``join_details``), and
+``Repository`` splits writes between the two tables. A missing details row
+reads as all-NULL detail fields.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import RelationshipProperty, joinedload, relationship
+
+
+def details_relationship(target: str, back_populates: str) -> RelationshipProperty:
+    """The parent's side of a 1:1 details table whose columns read as the parent's own"""
+    return relationship(
+        target,
+        back_populates=back_populates,
+        uselist=False,
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        info={"details": True},
+    )
+
+
+def details_of(model) -> Optional[RelationshipProperty]:
+    for rel in inspect(model).relationships:
+        if rel.info.get("details"):
+            return rel
+    return None
+
+
+def detail_attributes(model) -> Dict[str, Any]:
+    """Attribute name -> details-table column attribute, for the detail fields of ``model``"""
+    rel = details_of(model)
+    if rel is None:
+        return {}
+    foreign_keys = {remote for _, remote in rel.local_remote_pairs}
+    return {
+        attr.key: attr.class_attribute
+        for attr in rel.mapper.column_attrs
+        if not foreign_keys.intersection(attr.columns)
+    }
+
+
+def split_details(model, data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Split a row's values into (parent table, details table) fields"""
+    names = detail_attributes(model)
+    if not names:
+        return data, {}
+    hot = {name: value for name, value in data.items() if name not in names}
+    cold = {name: value for name, value in data.items() if name in names}
+    return hot, cold
+
+
+def load_details(model) -> List[Any]:
+    """Loader options for ORM queries whose rows are serialized with their detail fields"""
+    rel = details_of(model)
+    return [joinedload(rel.class_attribute)] if rel is not None else []
+
+
+def join_details(query, model, names: Sequence[str]):
+    """Outer join the details table to a column ``query`` if any of ``names`` lives there"""
+    rel = details_of(model)
+    if rel is None or not set(names) & set(detail_attributes(model)):
+        return query
+    return query.select_from(model).outerjoin(rel.class_attribute)
@@ -0,0 +1,169 @@
+"""
+Dictionary-encoded string columns
+
+Low-cardinality vehicle strings (manufacturer, model, RTO, insurer, ...) are
+stored once in ``vehicle_attribute_values`` and referenced from each row by
+integer id. A ``DictionaryString`` column still reads and writes plain
+strings: ids are translated through ``vehicle_values``, an in-process map of
+the dictionary whose strings are interned, so every loaded row, cached
+object and response shares one copy of each value and no query joins the
+dictionary.
+
+The map is loaded at startup. Writers call ``ensure_rows`` (or ``ensure``)
+before the statement that binds the values: new strings are added to the
+table in one short transaction of their own (dictionary rows are never
+deleted, so one that outlives a rolled-back write is harmless). Binding a
+string that has no id yet raises instead of inserting it from inside the
+statement, which would need a second connection while the writer holds one
+and could wait forever on an exhausted pool. An id the map has not seen,
+added by another process, is fetched when a result is processed; the async
+ORM runs result processors in the executing statement's greenlet, so select
+the mapped attributes (as ``select_columns`` does) rather than raw ``Table``
+columns on an ``AsyncConnection``.
+
+Only equality comparisons are meaningful on these columns; ordering follows
+the ids, not the strings.
+"""
+import logging
+import sys
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import Integer, String, TypeDecorator, column, inspect, or_, select, table, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.util import await_only
+
+from app.db.session import engine
+
+
+logger = logging.getLogger(__name__)
+
+
+class ValueDictionary:
+    """In-process, interned (attribute, value) <-> id map over a dictionary table"""
+
+    def __init__(self, table_name: str, engine: AsyncEngine):
+        # Lightweight table: models import this module for DictionaryString
+        self.table = table(
+            table_name, column("id", Integer), column("attribute", String), column("value", String)
+        )
+        # Always the primary: replicas may lag behind a value just added
+        self.engine = engine
+        self._ids: Dict[Tuple[str, str], int] = {}
+        self._values: Dict[int, str] = {}
+        self._loaded_through = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _remember(self, rows: Iterable[Any]) -> None:
+        for id, attribute, value in rows:
+            value = sys.intern(value)
+            self._ids[(sys.intern(attribute), value)] = id
+            self._values[id] = value
+
+    async def load(self, ids: Sequence[int] = ()) -> int:
+        """Fetch entries added since the last load (plus ``ids``); returns how many were read"""
+        table = self.table
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                select(table.c.id, table.c.attribute, table.c.value)
+                .where(or_(table.c.id > self._loaded_through, table.c.id.in_(list(ids))))
+            )
+            rows = result.all()
+        self._remember(rows)
+        self._loaded_through = max([self._loaded_through, *(row.id for row in rows)])
+        return len(rows)
+
+    async def warm(self) -> None:
+        """Load the dictionary at startup; a failure only means loading on first use"""
+        try:
+            count = await self.load()
+            logger.info(f"Loaded {count} vehicle attribute values")
+        except Exception as e:
+            logger.warning(f"Vehicle attribute dictionary preload failed: {e}")
+
+    async def ensure(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """Give every (attribute, value) an id, inserting the new ones in one statement"""
+        missing = list({pair for pair in pairs if pair not in self._ids})
+        if not missing:
+            return
+        table = self.table
+        async with self.engine.begin() as conn:
+            insert = pg_insert if conn.dialect.name == "postgresql" else sqlite_insert
+            await conn.execute(
+                insert(table)
+                .values([{"attribute": attribute, "value": value} for attribute, value in missing])
+                .on_conflict_do_nothing(index_elements=["attribute", "value"])
+            )
+            # Rows another writer inserted first are not returned by the insert
+            result = await conn.execute(
+                select(table.c.id, table.c.attribute, table.c.value)
+                .where(tuple_(table.c.attribute, table.c.value).in_(missing))
+            )
+            self._remember(result.all())
+
+    async def ensure_rows(self, model, rows: Iterable[Mapping[str, Any]]) -> None:
+        """``ensure`` every dictionary value in ``rows`` of ``model``, keyed by attribute or column name"""
+        columns = [
+            (attr.key, column.name, column.type.attribute)
+            for attr in inspect(model).column_attrs
+            for column in attr.columns
+            if isinstance(column.type, DictionaryString)
+        ]
+        if not columns:
+            return
+        pairs = []
+        for row in rows:
+            for key, name, attribute in columns:
+                value = row.get(key, row.get(name))
+                if value is not None:
+                    pairs.append((attribute, value))
+        await self.ensure(pairs)
+
+    def id_for(self, attribute: str, value: str) -> int:
+        id = self._ids.get((attribute, value))
+        if id is None:
+            raise LookupError(
+                f"{attribute} value {value!r} has no dictionary id; call vehicle_values.ensure_rows before writing"
+            )
+        return id
+
+    def value_for(self, id: int) -> str:
+        value = self._values.get(id)
+        if value is None:
+            await_only(self.load([id]))
+            value = self._values.get(id)
+            if value is None:
+                raise LookupError(f"No vehicle attribute value with id {id}")
+        return value
+
+
+# Backed by app.models.vehicle_attribute_value.VehicleAttributeValue
+vehicle_values = ValueDictionary("vehicle_attribute_values", engine)
+
+
+class DictionaryString(TypeDecorator):
+    """A string column stored as an id into ``vehicle_values`` under ``attribute``"""
+
+    impl = Integer
+    cache_ok = True
+
+    def __init__(self, attribute: str):
+        super().__init__()
+        self.attribute = attribute
+
+    @property
+    def python_type(self):
+        return str
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[int]:
+        if value is None:
+            return None
+        return vehicle_values.id_for(self.attribute, value)
+
+    def process_result_value(self, value: Optional[int], dialect) -> Optional[str]:
+        if value is None:
+            return None
+        return vehicle_values.value_for(value)
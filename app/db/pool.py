@@ -0,0 +1,141 @@
+"""
+Connection pool sizing and statistics
+
+Every gunicorn worker builds its own engine, so the per-process pool is
+derived from the connection budget for the whole deployment
+(``DB_MAX_CONNECTIONS``) divided by ``WORKERS`` unless it is set
+explicitly. In PgBouncer mode the app keeps no pool of its own and turns off
+asyncpg's prepared statement caches, which transaction pooling breaks.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Dict, Tuple
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+from app.core.config import settings
+from app.core.metrics import record_pool_wait
+
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long each checkout waited"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            record_pool_wait(waited)
+
+    def recreate(self):
+        # Called by engine.dispose(); carry the counters over to the new pool
+        pool = super().recreate()
+        pool.checkouts, pool.wait_total = self.checkouts, self.wait_total
+        pool.wait_max, pool.timeouts = self.wait_max, self.timeouts
+        return pool
+
+
+def pool_sizing(workers: int, max_connections: int) -> Tuple[int, int]:
+    """
+    Split a deployment-wide connection budget across worker processes.
+
+    Two thirds of each worker's share stay open as the steady pool and the
+    rest is burst overflow, so a full burst on every worker still fits.
+    """
+    per_worker = max(2, max_connections // max(1, workers))
+    pool_size = max(1, per_worker * 2 // 3)
+    return pool_size, per_worker - pool_size
+
+
+def engine_options(database_url: str) -> Dict[str, Any]:
+    """Pool and driver keyword arguments for ``create_async_engine``"""
+    if not database_url.startswith("postgresql+asyncpg"):
+        # Other drivers (aiosqlite for local benchmarks) keep SQLAlchemy's default pool
+        return {}
+
+    server_settings = {"application_name": "fastapi_app"}
+    if settings.DB_PGBOUNCER:
+        return {
+            "poolclass": NullPool,
+            "connect_args": {
+                "server_settings": server_settings,
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                # Unique names so a server connection shared by PgBouncer never sees a clash
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            },
+        }
+
+    auto_size, auto_overflow = pool_sizing(settings.WORKERS, settings.DB_MAX_CONNECTIONS)
+    return {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": settings.DB_POOL_SIZE or auto_size,
+        "max_overflow": settings.DB_MAX_OVERFLOW if settings.DB_MAX_OVERFLOW >= 0 else auto_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {"server_settings": server_settings},
+    }
+
+
+def pool_stats(engine) -> Dict[str, Any]:
+    """Live statistics for the engine's pool in this worker"""
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            # QueuePool.overflow() starts at -size; only report connections beyond the pool
+            overflow=max(0, pool.overflow()),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        stats.update(
+            checkouts=pool.checkouts,
+            checkout_timeouts=pool.timeouts,
+            wait_avg_ms=round(pool.wait_total / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            wait_max_ms=round(pool.wait_max * 1000, 3),
+        )
+    return stats
+
+
+async def warm_pool(engine, connections: int, timeout: float = 5.0) -> int:
+    """Open up to ``connections`` pooled connections concurrently; returns how many opened"""
+    if connections <= 0 or not isinstance(engine.pool, AsyncAdaptedQueuePool):
+        return 0
+    connections = min(connections, engine.pool.size())
+    results = await asyncio.gather(
+        *(asyncio.wait_for(engine.connect(), timeout) for _ in range(connections)),
+        return_exceptions=True
+    )
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    for conn in opened:
+        # Closing returns the connection to the pool, where it stays open
+        await conn.close()
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        logger.warning(f"Pool warm-up: {len(errors)} of {connections} connections failed: {errors[0]!r}")
+    return len(opened)
@@ -0,0 +1,197 @@
+"""
+Read-replica routing
+
+GET routes take their session from ``get_db_read``, which picks a healthy
+replica round-robin and falls back to the primary when none is configured or
+healthy. Replicas are ejected when a health check (``SELECT 1`` plus, on
+PostgreSQL, replay lag) or a request hits a connection failure, and are
+re-admitted by the next passing health check.
+
+Read-your-writes: after a successful write (a non-GET request that used the
+primary's ``get_db`` session) the client gets a short-lived cookie, and its
+reads go to the primary until the cookie expires.
+
+Reads that fill the shared vehicle cache use ``primary_for``: a replica's
+copy could still be the old row after the write's invalidation, and caching
+it would serve it to everyone until the TTL.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.core.periodic import start_periodic
+from app.db.pool import engine_options
+
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = "read_primary_until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Connection-level failures that mean the replica itself is unusable
+REPLICA_ERRORS = (OperationalError, InterfaceError, OSError)
+
+_prefer_primary: ContextVar[bool] = ContextVar("prefer_primary", default=False)
+_primary_used: ContextVar[Optional[list]] = ContextVar("primary_used", default=None)
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = url
+        self.engine: AsyncEngine = create_async_engine(url, echo=settings.DEBUG, future=True, **engine_options(url))
+        instrument_engine(self.engine)
+        self.sessionmaker = async_sessionmaker(
+            self.engine, class_=AsyncSession, expire_on_commit=False, autocommit=False, autoflush=False
+        )
+        self.healthy = True
+        self.last_error: Optional[str] = None
+        self.lag_seconds: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    def eject(self, reason: str) -> None:
+        if self.healthy:
+            logger.warning(f"Ejecting read replica {self.name}: {reason}")
+        self.healthy = False
+        self.last_error = reason
+
+    async def check(self) -> None:
+        """Ping the replica and measure replay lag; updates ``healthy``"""
+        try:
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                if self.engine.dialect.name == "postgresql":
+                    # The last replayed commit ages while the primary is idle; caught up means no lag
+                    self.lag_seconds = await conn.scalar(text(
+                        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                    ))
+        except Exception as e:
+            self.eject(str(e) or type(e).__name__)
+            return
+
+        max_lag = settings.REPLICA_MAX_LAG_SECONDS
+        if max_lag > 0 and self.lag_seconds is not None and self.lag_seconds > max_lag:
+            self.eject(f"replication lag {self.lag_seconds:.1f}s exceeds {max_lag}s")
+            return
+        if not self.healthy:
+            logger.info(f"Read replica {self.name} is healthy again")
+        self.healthy = True
+        self.last_error = None
+
+
+class ReplicaSet:
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(url) for url in urls]
+        self._cycle = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self) -> Optional[Replica]:
+        """Next healthy replica round-robin, or None to use the primary"""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._cycle)]
+            if replica.healthy:
+                return replica
+        return None
+
+    async def check_all(self) -> None:
+        timeout = settings.REPLICA_HEALTH_TIMEOUT
+        for replica in self.replicas:
+            try:
+                await asyncio.wait_for(replica.check(), timeout)
+            except asyncio.TimeoutError:
+                replica.eject(f"health check timed out after {timeout}s")
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> List[dict]:
+        return [
+            {"replica": r.name, "healthy": r.healthy, "lag_seconds": r.lag_seconds, "last_error": r.last_error}
+            for r in self.replicas
+        ]
+
+
+def _replica_urls() -> List[str]:
+    return [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+
+replicas = ReplicaSet(_replica_urls())
+
+
+def prefer_primary() -> bool:
+    return _prefer_primary.get()
+
+
+def note_primary_session() -> None:
+    """Record that the current request opened a session on the primary"""
+    used = _primary_used.get()
+    if used is not None:
+        used.append(True)
+
+
+def start_health_checks():
+    """Start the replica health loop if replicas are configured; returns the task (or None)"""
+    if not replicas.enabled:
+        return None
+    return start_periodic("Replica health check", settings.REPLICA_HEALTH_INTERVAL, replicas.check_all)
+
+
+class ReadYourWritesMiddleware:
+    """Pin a client's reads to the primary for a few seconds after it writes"""
+
+    def __init__(self, app, sticky_seconds: Optional[float] = None):
+        self.app = app
+        self.sticky_seconds = settings.REPLICA_STICKY_SECONDS if sticky_seconds is None else sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _prefer_primary.set(self._pinned(scope))
+        used = []
+        used_token = _primary_used.set(used)
+        is_write = scope["method"] not in SAFE_METHODS
+
+        async def send_wrapper(message):
+            if is_write and used and message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.sticky_seconds
+                cookie = f"{STICKY_COOKIE}={until:.3f}; Max-Age={int(self.sticky_seconds) + 1}; Path=/; HttpOnly"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _prefer_primary.reset(token)
+            _primary_used.reset(used_token)
+
+    @staticmethod
+    def _pinned(scope) -> bool:
+        for name, value in scope.get("headers", []):
+            if name != b"cookie":
+                continue
+            for part in value.decode("latin-1").split(";"):
+                key, _, until = part.strip().partition("=")
+                if key == STICKY_COOKIE:
+                    try:
+                        return float(until) > time.time()
+                    except ValueError:
+                        return False
+        return False
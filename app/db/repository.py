@@ -0,0 +1,360 @@
+"""
+Repository: reads and single-statement writes for one model
+
+Creates, updates and deletes run as one ``INSERT/UPDATE/DELETE ... RETURNING``
+statement instead of SELECT, mutate, flush, COMMIT and a refresh SELECT, so a
+write costs one round trip plus its COMMIT. Update and delete return
+``None`` when no row matched, which the routes turn into a 404.
+
+The ``*_many`` variants do the same for a batch in a fixed number of
+statements: one multi-row INSERT, one executemany UPDATE per distinct set of
+changed fields followed by one SELECT, and one DELETE. Ids are passed as a
+single array parameter on PostgreSQL.
+
+Deletes also remove the rows the ORM relationships would cascade to
+(``cascade="all, delete-orphan"``) with set-based DELETEs instead of loading
+every child object; on PostgreSQL they ride along as CTEs of the one DELETE.
+Deleted rows of tables marked ``info={"tombstones": True}`` are recorded in
+``tombstones`` by the same statements, for the change feed.
+
+A model split into a hot table and a 1:1 details table (see
+app.db.details) is read with the details joined in, and its writes go to
+both: detail rows are inserted only when a detail field is set, updated with
+an upsert, and read back with one primary-key SELECT after a single update.
+
+A create or update that breaks a constraint rolls the transaction back and
+raises ``WriteConflict``, naming the unique key it collided on when there is
+one (found with one SELECT per unique key after the failure).
+
+Subclasses override ``before_update``/``after_commit`` to keep caches and
+indexes in step with writes made through the CRUD routes.
+"""
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from sqlalchemy import Row, String, any_, bindparam, delete, insert, inspect, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import RelationshipDirection
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db.base import db_utcnow
+from app.db.details import details_of, load_details, split_details
+from app.models.tombstone import Tombstone
+
+
+ModelT = TypeVar("ModelT")
+
+
+class WriteConflict(Exception):
+    """A write broke a constraint; ``key``/``value`` name the unique key it collided on, if it was one"""
+
+    def __init__(self, message: str, key: Optional[str] = None, value: Any = None):
+        super().__init__(message)
+        self.key = key
+        self.value = value
+
+
+def _unique_keys(model) -> List[str]:
+    """Attributes of ``model`` with a single-column unique constraint or index, primary key aside"""
+    table = inspect(model).local_table
+    unique = {column for column in table.columns if column.unique and not column.primary_key}
+    unique.update(
+        next(iter(index.columns)) for index in table.indexes if index.unique and len(index.columns) == 1
+    )
+    return [attr.key for attr in inspect(model).column_attrs if attr.columns[0] in unique]
+
+
+def _tombstones(model, ids) -> List[Any]:
+    """INSERT ... SELECT recording ``ids`` as deleted, if ``model``'s table keeps tombstones"""
+    table = inspect(model).local_table
+    if not table.info.get("tombstones"):
+        return []
+    primary_key = inspect(model).primary_key[0]
+    rows = (
+        select(literal(table.name, String), primary_key, db_utcnow())
+        .where(primary_key.in_(ids))
+    )
+    return [insert(Tombstone).from_select(["resource", "row_id", "deleted_at"], rows)]
+
+
+def _cascade_deletes(model, ids) -> List[Any]:
+    """
+    DELETE statements for the rows the ORM would cascade-delete along with
+    ``ids``, deepest first, each preceded by its tombstone INSERT if any
+    """
+    statements = []
+    for relationship in inspect(model).relationships:
+        if not relationship.cascade.delete or relationship.direction is not RelationshipDirection.ONETOMANY:
+            continue
+        child = relationship.mapper
+        foreign_keys = [remote for _, remote in relationship.local_remote_pairs]
+        if len(foreign_keys) != 1:
+            raise NotImplementedError(f"Composite cascade from {model.__name__} to {child.class_.__name__}")
+        foreign_key = foreign_keys[0]
+        child_ids = select(child.primary_key[0]).where(foreign_key.in_(ids))
+        statements += _cascade_deletes(child.class_, child_ids)
+        statements += _tombstones(child.class_, child_ids)
+        statements.append(delete(child.local_table).where(foreign_key.in_(ids)))
+    return statements
+
+
+class Repository(Generic[ModelT]):
+    """Reads and writes for one model, keyed on its single-column primary key"""
+
+    # Extra columns deletes return by default (for ``after_commit``)
+    delete_returning: Sequence[Any] = ()
+
+    def __init__(self, model: Type[ModelT]):
+        self.model = model
+        self.primary_key = inspect(model).primary_key[0]
+        self.id_key = inspect(model).get_property_by_column(self.primary_key).key
+        self.attributes = inspect(model).column_attrs
+        self.details = details_of(model)
+        self.load_options = load_details(model)
+        self.unique_keys = _unique_keys(model)
+
+    def _values(self, data: Dict[str, Any]) -> Dict[Any, Any]:
+        # Attribute names can differ from column names (Vehicle.class_ is "class")
+        return {self.attributes[name].class_attribute: value for name, value in data.items()}
+
+    def _ids_filter(self, db: AsyncSession, ids: Sequence[Any]):
+        if db.bind.dialect.name == "postgresql":
+            # One array parameter however many ids; IN (...) would bind one each
+            return self.primary_key == any_(bindparam("batch_ids", list(ids), type_=ARRAY(self.primary_key.type)))
+        return self.primary_key.in_(list(ids))
+
+    # Details table
+
+    def _details_key(self):
+        return next(remote for _, remote in self.details.local_remote_pairs).key
+
+    async def _insert_details(self, db: AsyncSession, instances: List[ModelT], data: List[Dict[str, Any]]) -> None:
+        """One multi-row INSERT of the detail rows that have a value; attach them to ``instances``"""
+        key = self._details_key()
+        detail_model = self.details.mapper.class_
+        values = []
+        for instance, row in zip(instances, data):
+            _, cold = split_details(self.model, row)
+            if any(value is not None for value in cold.values()):
+                values.append({key: getattr(instance, self.id_key), **cold})
+        details = {}
+        if values:
+            result = await db.scalars(insert(detail_model).returning(detail_model), values)
+            details = {getattr(row, key): row for row in result}
+        for instance in instances:
+            set_committed_value(instance, self.details.key, details.get(getattr(instance, self.id_key)))
+
+    async def _upsert_details(self, db: AsyncSession, changes: List[Tuple[Any, Dict[str, Any]]]) -> None:
+        """Insert or update detail rows: one executemany upsert per distinct set of fields"""
+        key = self._details_key()
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for id, cold in changes:
+            if cold:
+                groups.setdefault(tuple(sorted(cold)), []).append({key: id, **cold})
+
+        dialect_insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+        mapper = self.details.mapper
+        for names, params in groups.items():
+            statement = dialect_insert(mapper.class_)
+            columns = [mapper.attrs[name].columns[0] for name in names]
+            statement = statement.on_conflict_do_update(
+                index_elements=[key],
+                set_={column: statement.excluded[column.key] for column in columns},
+            )
+            await db.execute(statement, params)
+
+    async def _load_details(self, db: AsyncSession, instances: List[ModelT]) -> None:
+        """Read and attach the detail rows of ``instances`` with one SELECT"""
+        key = self._details_key()
+        detail_model = self.details.mapper.class_
+        ids = [getattr(instance, self.id_key) for instance in instances]
+        rows = await db.scalars(
+            select(detail_model)
+            .where(getattr(detail_model, key).in_(ids))
+            .execution_options(populate_existing=True)
+        )
+        details = {getattr(row, key): row for row in rows}
+        for instance in instances:
+            set_committed_value(instance, self.details.key, details.get(getattr(instance, self.id_key)))
+
+    # Constraint failures
+
+    @asynccontextmanager
+    async def _conflicts(self, db: AsyncSession, writes: List[Tuple[Any, Dict[str, Any]]]) -> AsyncIterator[None]:
+        """Turn an IntegrityError from writing ``writes`` ((id or None, fields) pairs) into ``WriteConflict``"""
+        try:
+            yield
+        except IntegrityError as e:
+            await db.rollback()
+            raise await self._conflict(db, writes) from e
+
+    async def _conflict(self, db: AsyncSession, writes: List[Tuple[Any, Dict[str, Any]]]) -> WriteConflict:
+        for key in self.unique_keys:
+            # value -> id of the row written with it (None for inserts)
+            writers: Dict[Any, Any] = {}
+            for id, data in writes:
+                value = data.get(key)
+                if value is None:
+                    continue
+                if value in writers and (id is None or writers[value] != id):
+                    return WriteConflict(f"{key} {value!r} is given to more than one row", key, value)
+                writers[value] = id
+            if not writers:
+                continue
+            column = self.attributes[key].class_attribute
+            existing = await db.execute(select(column, self.primary_key).where(column.in_(list(writers))))
+            for value, id in existing:
+                if writers[value] != id:
+                    return WriteConflict(f"{key} {value!r} already exists", key, value)
+        return WriteConflict("the write violates a database constraint")
+
+    # Hooks
+
+    async def before_update(self, db: AsyncSession, changes: List[Tuple[Any, Dict[str, Any]]]) -> Any:
+        """Read what ``after_commit`` needs from rows about to change; runs in the write's transaction"""
+        return None
+
+    async def after_commit(self, action: str, rows: List[Any], before: Any = None) -> None:
+        """
+        Called by the CRUD routes once a write has committed. ``action`` is
+        'create', 'update' or 'delete'; ``rows`` are the written instances, or
+        the RETURNING rows of a delete.
+        """
+        return None
+
+    # Reads
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelT]:
+        return await db.scalar(select(self.model).options(*self.load_options).where(self.primary_key == id))
+
+    async def get_many(self, db: AsyncSession, ids: Sequence[Any]) -> List[ModelT]:
+        """Rows for ``ids`` in the order asked for; missing ids are left out"""
+        if not ids:
+            return []
+        rows = await db.scalars(select(self.model).options(*self.load_options).where(self._ids_filter(db, ids)))
+        by_id = {getattr(row, self.id_key): row for row in rows}
+        return [by_id[id] for id in dict.fromkeys(ids) if id in by_id]
+
+    # Writes
+
+    async def create(self, db: AsyncSession, data: Dict[str, Any]) -> ModelT:
+        """INSERT ... RETURNING the new row, column defaults included"""
+        hot, _ = split_details(self.model, data)
+        async with self._conflicts(db, [(None, data)]):
+            instance = await db.scalar(insert(self.model).values(self._values(hot)).returning(self.model))
+        if self.details is not None:
+            await self._insert_details(db, [instance], [data])
+        return instance
+
+    async def create_many(self, db: AsyncSession, data: List[Dict[str, Any]]) -> List[ModelT]:
+        """One multi-row INSERT ... RETURNING; rows come back in input order"""
+        if not data:
+            return []
+        async with self._conflicts(db, [(None, row) for row in data]):
+            result = await db.scalars(
+                insert(self.model).returning(self.model, sort_by_parameter_order=True),
+                [dict(split_details(self.model, row)[0]) for row in data],
+            )
+            instances = list(result)
+        if self.details is not None:
+            await self._insert_details(db, instances, data)
+        return instances
+
+    async def update(self, db: AsyncSession, id: Any, data: Dict[str, Any]) -> Optional[ModelT]:
+        """UPDATE ... WHERE id = :id RETURNING the row; None when no row has that id"""
+        if not data:
+            return await self.get(db, id)
+        hot, cold = split_details(self.model, data)
+        # Runs even for a details-only change, to bump onupdate columns (updated_at)
+        async with self._conflicts(db, [(id, data)]):
+            instance = await db.scalar(
+                update(self.model)
+                .where(self.primary_key == id)
+                .values(self._values(hot))
+                .returning(self.model)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+        if instance is None or self.details is None:
+            return instance
+        if cold:
+            await self._upsert_details(db, [(id, cold)])
+        await self._load_details(db, [instance])
+        return instance
+
+    async def update_many(self, db: AsyncSession, changes: List[Tuple[Any, Dict[str, Any]]]) -> List[ModelT]:
+        """
+        Apply ``(id, fields)`` pairs: one executemany UPDATE per distinct set of
+        fields, then one SELECT of the updated rows. Unknown ids are skipped.
+        """
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        detail_changes = []
+        for id, data in changes:
+            hot, cold = split_details(self.model, data)
+            # Details-only changes still UPDATE the parent row, for its onupdate columns
+            if hot or cold:
+                params = {f"v_{name}": value for name, value in hot.items()}
+                params["b_id"] = id
+                groups.setdefault(tuple(sorted(hot)), []).append(params)
+            if cold:
+                detail_changes.append((id, cold))
+
+        table = self.primary_key.table
+        async with self._conflicts(db, changes):
+            for names, params in groups.items():
+                columns = {self.attributes[name].columns[0].key: bindparam(f"v_{name}") for name in names}
+                await db.execute(
+                    update(table).where(self.primary_key == bindparam("b_id")).values(columns),
+                    params,
+                )
+        if detail_changes:
+            # A detail row for an unknown id would violate its foreign key
+            known = set(await db.scalars(
+                select(self.primary_key).where(self._ids_filter(db, [id for id, _ in detail_changes]))
+            ))
+            await self._upsert_details(db, [(id, cold) for id, cold in detail_changes if id in known])
+        rows = await db.scalars(
+            select(self.model)
+            .options(*self.load_options)
+            .where(self._ids_filter(db, [id for id, _ in changes]))
+            .execution_options(populate_existing=True)
+        )
+        by_id = {getattr(row, self.id_key): row for row in rows}
+        return [by_id[id] for id in dict.fromkeys(id for id, _ in changes) if id in by_id]
+
+    async def _delete_where(self, db: AsyncSession, condition, returning: Optional[Sequence[Any]]) -> List[Row]:
+        statement = (
+            delete(self.model)
+            .where(condition)
+            .returning(self.primary_key, *(self.delete_returning if returning is None else returning))
+            .execution_options(synchronize_session=False)
+        )
+        ids = select(self.primary_key).where(condition)
+        cascades = _tombstones(self.model, ids) + _cascade_deletes(self.model, ids)
+        if db.bind.dialect.name == "postgresql":
+            # One round trip: data-modifying CTEs share the statement's snapshot
+            # and NO ACTION foreign keys are only checked when it ends
+            for n, cascade in enumerate(cascades):
+                statement = statement.add_cte(cascade.cte(f"cascade_{n}"))
+        else:
+            for cascade in cascades:
+                await db.execute(cascade)
+        return list(await db.execute(statement))
+
+    async def delete(self, db: AsyncSession, id: Any, returning: Optional[Sequence[Any]] = None) -> Optional[Row]:
+        """
+        DELETE ... WHERE id = :id RETURNING id (plus the ``returning`` columns,
+        ``delete_returning`` by default); None when no row has that id.
+        """
+        rows = await self._delete_where(db, self.primary_key == id, returning)
+        return rows[0] if rows else None
+
+    async def delete_many(
+        self, db: AsyncSession, ids: Sequence[Any], returning: Optional[Sequence[Any]] = None
+    ) -> List[Row]:
+        """One DELETE for all ``ids``; returns a row per id that existed"""
+        if not ids:
+            return []
+        return await self._delete_where(db, self._ids_filter(db, ids), returning)
@@ -1,21 +1,20 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from app.core.config import settings
+from app.core.metrics import instrument_engine
+from app.db.pool import engine_options
+from app.db.replicas import REPLICA_ERRORS, note_primary_session, prefer_primary, replicas
 
 # Create async engine with proper connection pooling
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
     future=True,
-    pool_size=5,
-    max_overflow=10,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    connect_args={
-        "server_settings": {
-            "application_name": "fastapi_app",
-        }
-    }
+    **engine_options(settings.DATABASE_URL)
 )
+instrument_engine(engine)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -29,8 +28,42 @@ AsyncSessionLocal = async_sessionmaker(
 
 async def get_db() -> AsyncSession:
     """Dependency for getting async database session"""
+    note_primary_session()
     async with AsyncSessionLocal() as session:
         try:
             yield session
         finally:
             await session.close()
+
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """
+    Session on a healthy replica, or the primary if none is usable or the
+    client just wrote. A connection failure on the replica ejects it.
+    """
+    replica = None if prefer_primary() else replicas.pick()
+    async with (replica.sessionmaker if replica else AsyncSessionLocal)() as session:
+        session.info["replica"] = replica
+        try:
+            yield session
+        except REPLICA_ERRORS as e:
+            if replica is not None:
+                replica.eject(str(e) or type(e).__name__)
+            raise
+
+
+@asynccontextmanager
+async def primary_for(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """``db`` itself when it is on the primary, otherwise a new primary session"""
+    if db.info.get("replica") is None:
+        yield db
+        return
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def get_db_read() -> AsyncSession:
+    """Dependency for read-only routes; routes to a read replica when configured"""
+    async with read_session() as session:
+        yield session
@@ -1,8 +1,18 @@
 from app.models.user import User
+from app.models.vehicle_attribute_value import VehicleAttributeValue
 from app.models.vehicle import Vehicle
+from app.models.vehicle_details import VehicleDetails
 from app.models.service_history import ServiceHistory
 from app.models.order import Order
 from app.models.payment import Payment
 from app.models.invoice import Invoice
+from app.models.vehicle_expiry_bucket import VehicleExpiryBucket
+from app.models.payment_daily_rollup import PaymentDailyRollup
+from app.models.idempotency_key import IdempotencyKey
+from app.models.job import Job
+from app.models.tombstone import Tombstone
 
-__all__ = ["User", "Vehicle", "ServiceHistory", "Order", "Payment", "Invoice"]
+__all__ = [
+    "User", "VehicleAttributeValue", "Vehicle", "VehicleDetails", "ServiceHistory", "Order", "Payment", "Invoice",
+    "VehicleExpiryBucket", "PaymentDailyRollup", "IdempotencyKey", "Job", "Tombstone",
+]
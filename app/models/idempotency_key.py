@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary
+from datetime import datetime
+from app.db.base import Base
+
+
+class IdempotencyKey(Base):
+    """Stored response for a client-supplied Idempotency-Key, unique per endpoint scope"""
+    __tablename__ = "idempotency_keys"
+    
+    scope = Column(String, primary_key=True)  # e.g. 'payments.create'
+    key = Column(String, primary_key=True)
+    request_hash = Column(String, nullable=False)
+    response_code = Column(Integer, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<IdempotencyKey(scope={self.scope}, key={self.key}, response_code={self.response_code})>"
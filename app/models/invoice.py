@@ -1,19 +1,27 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Numeric, ForeignKey
+from sqlalchemy import Column, Index, String, DateTime, Numeric, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
-from app.db.base import Base
+from app.db.base import Base, db_utcnow
 
 
 class Invoice(Base):
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Keyset pagination walks (invoice_date, id)
+        Index("ix_invoices_invoice_date_id", "invoice_date", "id"),
+        # The change feed walks (updated_at, id); deletes leave tombstones
+        Index("ix_invoices_updated_at_id", "updated_at", "id"),
+        {"info": {"tombstones": True}},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id"), nullable=False)
+    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id"), nullable=False, index=True)
     invoice_date = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=db_utcnow(), onupdate=db_utcnow())
     total_amount = Column(Numeric)
-    status = Column(String)
+    status = Column(String, index=True)
     due_date = Column(DateTime, nullable=True)
     
     # Relationships
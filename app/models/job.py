@@ -0,0 +1,32 @@
+import uuid
+from sqlalchemy import Column, Index, String, Integer, DateTime, Text, JSON
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+from app.db.base import Base
+
+
+class Job(Base):
+    """A unit of background work, claimed by workers with SELECT ... FOR UPDATE SKIP LOCKED"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers claim the oldest due job per queue: (queue, status, run_at)
+        Index("ix_jobs_queue_status_run_at", "queue", "status", "run_at"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    queue = Column(String, nullable=False)
+    kind = Column(String, nullable=False)  # registered handler name, e.g. 'vehicles.bulk_upsert'
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String, nullable=False, default="queued")  # 'queued', 'running', 'succeeded', 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # not claimed before this
+    locked_at = Column(DateTime, nullable=True)
+    locked_by = Column(String, nullable=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True, index=True)
+    
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind={self.kind}, status={self.status})>"
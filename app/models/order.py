@@ -1,18 +1,26 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Numeric, ForeignKey
+from sqlalchemy import Column, Index, String, DateTime, Numeric, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
-from app.db.base import Base
+from app.db.base import Base, db_utcnow
 
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Keyset pagination walks (order_date, id)
+        Index("ix_orders_order_date_id", "order_date", "id"),
+        # The change feed walks (updated_at, id); deletes leave tombstones
+        Index("ix_orders_updated_at_id", "updated_at", "id"),
+        {"info": {"tombstones": True}},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    vehicle_id = Column(UUID(as_uuid=True), ForeignKey("vehicles.id"), nullable=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    vehicle_id = Column(UUID(as_uuid=True), ForeignKey("vehicles.id"), nullable=True, index=True)
     order_date = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=db_utcnow(), onupdate=db_utcnow())
     order_type = Column(String)
     status = Column(String)
     total_amount = Column(Numeric)
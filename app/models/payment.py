@@ -1,17 +1,25 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Numeric, ForeignKey
+from sqlalchemy import Column, Index, String, DateTime, Numeric, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
-from app.db.base import Base
+from app.db.base import Base, db_utcnow
 
 
 class Payment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Keyset pagination walks (payment_date, id)
+        Index("ix_payments_payment_date_id", "payment_date", "id"),
+        # The change feed walks (updated_at, id); deletes leave tombstones
+        Index("ix_payments_updated_at_id", "updated_at", "id"),
+        {"info": {"tombstones": True}},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id"), nullable=False)
+    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id"), nullable=False, index=True)
     payment_date = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=db_utcnow(), onupdate=db_utcnow())
     amount = Column(Numeric)
     payment_method = Column(String)
     status = Column(String)
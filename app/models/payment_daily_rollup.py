@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Integer, Date, DateTime, Numeric
+from datetime import datetime
+from app.db.base import Base
+
+
+class PaymentDailyRollup(Base):
+    """Per-day payment count and amount for each payment method and status"""
+    __tablename__ = "payment_daily_rollups"
+    
+    day = Column(Date, primary_key=True)
+    payment_method = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    payment_count = Column(Integer, nullable=False)
+    amount = Column(Numeric, nullable=False)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<PaymentDailyRollup(day={self.day}, payment_method={self.payment_method}, amount={self.amount})>"
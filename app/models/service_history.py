@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, Index, String, DateTime
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 from app.db.base import Base
@@ -7,10 +7,14 @@ from app.db.base import Base
 
 class ServiceHistory(Base):
     __tablename__ = "service_history"
+    __table_args__ = (
+        # Per-VIN listing walks (vin, status_on, id)
+        Index("ix_service_history_vin_status_on_id", "vin", "status_on", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     vin = Column(String, index=True)
-    file_path = Column(String)
+    file_path = Column(String, index=True, unique=True)
     status_on = Column(DateTime)
     
     def __repr__(self):
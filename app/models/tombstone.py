@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, Index, Integer, String, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base, db_utcnow
+
+
+class Tombstone(Base):
+    """A deleted row of a change-feed table, kept so incremental sync consumers see the delete"""
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        # The change feed walks (deleted_at, row_id) per resource
+        Index("ix_tombstones_resource_deleted_at_row_id", "resource", "deleted_at", "row_id"),
+    )
+    
+    # Database-generated: the tombstones for a delete are written by one INSERT ... SELECT
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    resource = Column(String, nullable=False)  # table name, e.g. 'orders'
+    row_id = Column(UUID(as_uuid=True), nullable=False)
+    deleted_at = Column(DateTime, nullable=False, default=db_utcnow(), index=True)
+    
+    def __repr__(self):
+        return f"<Tombstone(resource={self.resource}, row_id={self.row_id}, deleted_at={self.deleted_at})>"
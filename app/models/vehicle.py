@@ -1,45 +1,78 @@
 import uuid
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, Numeric, JSON
+from sqlalchemy import Column, Index, String, Integer, Boolean, DateTime, Numeric, text
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import relationship
-from datetime import datetime
-from app.db.base import Base
+from app.db.base import Base, db_utcnow
+from app.db.details import details_relationship
+from app.db.dictionary import DictionaryString
+from app.models.vehicle_details import VehicleDetails
+
+
+def _detail(name: str):
+    """``vehicle.<name>``, stored on the vehicle's VehicleDetails row"""
+    return association_proxy("details", name, creator=lambda value: VehicleDetails(**{name: value}))
 
 
 class Vehicle(Base):
+    """
+    A registered vehicle. Repeated low-cardinality strings (manufacturer,
+    model, RTO, insurer, ...) are DictionaryString columns: stored as ids,
+    read and written as strings.
+
+    The rarely read fields (addresses, permits, blacklist and NOC details)
+    live in ``vehicle_details`` and are proxied through ``details``, which
+    is never loaded implicitly; see app.db.details.
+    """
     __tablename__ = "vehicles"
+    __table_args__ = (
+        *(
+            # Partial indexes backing the "expires in the next N days" queries
+            Index(
+                f"ix_vehicles_{column}_expiry", column,
+                postgresql_where=text(f'"{column}" IS NOT NULL'),
+                sqlite_where=text(f'"{column}" IS NOT NULL'),
+            )
+            for column in ("rcExpiryDate", "vehicleInsuranceUpto", "puccUpto", "permitValidUpto")
+        ),
+        # The change feed walks (updated_at, id); deletes leave tombstones
+        Index("ix_vehicles_updated_at_id", "updated_at", "id"),
+        {"info": {"tombstones": True}},
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    regNo = Column(String, index=True)
-    chassis = Column(String)
+    regNo = Column(String, index=True, unique=True)
+    chassis = Column(String, index=True, unique=True)
     engine = Column(String)
-    vehicleManufacturerName = Column(String)
-    model = Column(String)
+    vehicleManufacturerName = Column("vehicleManufacturerName_id", DictionaryString("vehicleManufacturerName"))
+    model = Column("model_id", DictionaryString("model"))
     vehicleColour = Column(String)
-    type = Column(String)
-    normsType = Column(String)
-    bodyType = Column(String)
+    type = Column("type_id", DictionaryString("type"))
+    normsType = Column("normsType_id", DictionaryString("normsType"))
+    bodyType = Column("bodyType_id", DictionaryString("bodyType"))
     ownerCount = Column(Integer)
     owner = Column(String)
     ownerFatherName = Column(String)
     mobileNumber = Column(String)
     status = Column(String)
     statusAsOn = Column(DateTime)
-    regAuthority = Column(String)
+    regAuthority = Column("regAuthority_id", DictionaryString("regAuthority"))
     regDate = Column(DateTime)
     vehicleManufacturingMonthYear = Column(String)
     rcExpiryDate = Column(DateTime)
     vehicleTaxUpto = Column(String)
-    vehicleInsuranceCompanyName = Column(String)
+    vehicleInsuranceCompanyName = Column(
+        "vehicleInsuranceCompanyName_id", DictionaryString("vehicleInsuranceCompanyName")
+    )
     vehicleInsuranceUpto = Column(DateTime)
     vehicleInsurancePolicyNumber = Column(String)
-    rcFinancer = Column(String)
-    presentAddress = Column(Text)
-    permanentAddress = Column(Text)
+    rcFinancer = Column("rcFinancer_id", DictionaryString("rcFinancer"))
+    presentAddress = _detail("presentAddress")
+    permanentAddress = _detail("permanentAddress")
     vehicleCubicCapacity = Column(Numeric)
     grossVehicleWeight = Column(Integer)
     unladenWeight = Column(Integer)
-    vehicleCategory = Column(String)
+    vehicleCategory = Column("vehicleCategory_id", DictionaryString("vehicleCategory"))
     rcStandardCap = Column(String)
     vehicleCylindersNo = Column(Integer)
     vehicleSeatCapacity = Column(Integer)
@@ -50,25 +83,28 @@ class Vehicle(Base):
     puccNumber = Column(String)
     puccUpto = Column(DateTime)
     blacklistStatus = Column(Boolean, default=False)
-    blacklistDetails = Column(JSON)
-    permitIssueDate = Column(DateTime)
-    permitNumber = Column(String)
-    permitType = Column(String)
-    permitValidFrom = Column(DateTime)
+    blacklistDetails = _detail("blacklistDetails")
+    permitIssueDate = _detail("permitIssueDate")
+    permitNumber = _detail("permitNumber")
+    permitType = _detail("permitType")
+    permitValidFrom = _detail("permitValidFrom")
+    # Hot unlike the other permit fields: expiry tracking scans it
     permitValidUpto = Column(DateTime)
     nonUseStatus = Column(String)
     nonUseFrom = Column(String)
     nonUseTo = Column(String)
-    nationalPermitNumber = Column(String)
-    nationalPermitUpto = Column(String)
-    nationalPermitIssuedBy = Column(String)
+    nationalPermitNumber = _detail("nationalPermitNumber")
+    nationalPermitUpto = _detail("nationalPermitUpto")
+    nationalPermitIssuedBy = _detail("nationalPermitIssuedBy")
     isCommercial = Column(Boolean, default=False)
-    nocDetails = Column(String)
+    nocDetails = _detail("nocDetails")
     financed = Column(Boolean, default=False)
-    class_ = Column("class", String)
+    class_ = Column("class_id", DictionaryString("class"))
+    updated_at = Column(DateTime, nullable=False, default=db_utcnow(), onupdate=db_utcnow())
     
     # Relationships
     orders = relationship("Order", back_populates="vehicle", cascade="all, delete-orphan")
+    details = details_relationship("VehicleDetails", back_populates="vehicle")
     
     def __repr__(self):
         return f"<Vehicle(id={self.id}, regNo={self.regNo}, model={self.model})>"
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+from app.db.base import Base
+
+
+class VehicleAttributeValue(Base):
+    """One distinct value of a low-cardinality vehicle column; vehicles store its id"""
+    __tablename__ = "vehicle_attribute_values"
+    __table_args__ = (
+        UniqueConstraint("attribute", "value", name="uq_vehicle_attribute_values_attribute_value"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    attribute = Column(String, nullable=False)  # vehicle column, e.g. 'model', 'regAuthority'
+    value = Column(String, nullable=False)
+    
+    def __repr__(self):
+        return f"<VehicleAttributeValue(id={self.id}, attribute={self.attribute}, value={self.value})>"
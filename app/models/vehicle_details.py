@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, DateTime, Text, JSON, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class VehicleDetails(Base):
+    """
+    The rarely read vehicle columns, split from ``vehicles`` 1:1 so the hot
+    table stays narrow. Only vehicles with a non-null detail field have a row.
+    """
+    __tablename__ = "vehicle_details"
+    
+    vehicle_id = Column(UUID(as_uuid=True), ForeignKey("vehicles.id", ondelete="CASCADE"), primary_key=True)
+    presentAddress = Column(Text)
+    permanentAddress = Column(Text)
+    blacklistDetails = Column(JSON(none_as_null=True))
+    permitIssueDate = Column(DateTime)
+    permitNumber = Column(String)
+    permitType = Column(String)
+    permitValidFrom = Column(DateTime)
+    nationalPermitNumber = Column(String)
+    nationalPermitUpto = Column(String)
+    nationalPermitIssuedBy = Column(String)
+    nocDetails = Column(String)
+    
+    # Relationships
+    vehicle = relationship("Vehicle", back_populates="details")
+    
+    def __repr__(self):
+        return f"<VehicleDetails(vehicle_id={self.vehicle_id})>"
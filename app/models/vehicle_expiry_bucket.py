@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer, Date, DateTime
+from datetime import datetime
+from app.db.base import Base
+
+
+class VehicleExpiryBucket(Base):
+    """Daily count of vehicles whose compliance document of `kind` expires on `day`"""
+    __tablename__ = "vehicle_expiry_buckets"
+    
+    day = Column(Date, primary_key=True)
+    kind = Column(String, primary_key=True)  # 'rc', 'insurance', 'pucc', 'permit'
+    vehicle_count = Column(Integer, nullable=False)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<VehicleExpiryBucket(day={self.day}, kind={self.kind}, vehicle_count={self.vehicle_count})>"
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from uuid import UUID
+from typing import Generic, List, TypeVar
+
+
+T = TypeVar("T")
+
+# Upper bound on ids/items per batch request
+BATCH_MAX_ITEMS = 1000
+
+
+class BatchIds(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+class BatchItems(BaseModel, Generic[T]):
+    items: List[T] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+class BatchResult(BaseModel, Generic[T]):
+    items: List[T]
+    missing: List[UUID] = []
+
+
+class BatchDeleteResult(BaseModel):
+    deleted: List[UUID]
+    missing: List[UUID] = []
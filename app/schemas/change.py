@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Literal, Optional
+
+
+class ChangeResource(str, Enum):
+    vehicles = "vehicles"
+    orders = "orders"
+    payments = "payments"
+    invoices = "invoices"
+
+
+class Change(BaseModel):
+    op: Literal["upsert", "delete"]
+    id: UUID
+    changed_at: datetime
+    data: Optional[Dict[str, Any]] = None  # the row as the resource's GET returns it; None for deletes
+
+
+class ChangePage(BaseModel):
+    resource: ChangeResource
+    changes: List[Change]
+    next_token: Optional[str] = None  # pass back as ?since=
+    has_more: bool
@@ -25,6 +25,7 @@ class InvoiceUpdate(BaseModel):
 class InvoiceResponse(InvoiceBase):
     id: UUID
     invoice_date: datetime
+    updated_at: datetime
     
     class Config:
         from_attributes = True
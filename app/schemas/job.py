@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+from typing import Any, Optional
+
+
+class JobResponse(BaseModel):
+    id: UUID
+    queue: str
+    kind: str
+    status: str  # 'queued', 'running', 'succeeded', 'failed'
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    result: Optional[Any] = None
+    
+    class Config:
+        from_attributes = True
@@ -1,9 +1,13 @@
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from decimal import Decimal
 
+from app.schemas.payment import PaymentResponse
+from app.schemas.invoice import InvoiceResponse
+from app.schemas.vehicle import VehicleResponse
+
 
 class OrderBase(BaseModel):
     user_id: UUID
@@ -26,6 +30,13 @@ class OrderUpdate(BaseModel):
 class OrderResponse(OrderBase):
     id: UUID
     order_date: datetime
+    updated_at: datetime
     
     class Config:
         from_attributes = True
+
+
+class OrderDetailResponse(OrderResponse):
+    payments: List[PaymentResponse] = []
+    invoices: List[InvoiceResponse] = []
+    vehicle: Optional[VehicleResponse] = None
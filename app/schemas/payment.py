@@ -25,6 +25,7 @@ class PaymentUpdate(BaseModel):
 class PaymentResponse(PaymentBase):
     id: UUID
     payment_date: datetime
+    updated_at: datetime
     
     class Config:
         from_attributes = True
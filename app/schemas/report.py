@@ -0,0 +1,61 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import date, datetime
+from typing import List, Optional
+from decimal import Decimal
+
+
+class RevenuePoint(BaseModel):
+    period: date
+    payment_count: int
+    amount: Decimal
+
+
+class RevenueReport(BaseModel):
+    period: str  # 'day' or 'month'
+    start: date
+    end: date
+    source: str  # 'rollup' or 'live'
+    refreshed_at: Optional[datetime] = None
+    total: Decimal
+    points: List[RevenuePoint]
+
+
+class InvoiceStatusTotal(BaseModel):
+    status: Optional[str] = None
+    invoice_count: int
+    total_amount: Decimal
+
+
+class OutstandingInvoicesReport(BaseModel):
+    outstanding_count: int
+    outstanding_amount: Decimal
+    statuses: List[InvoiceStatusTotal]
+
+
+class PaymentMethodTotal(BaseModel):
+    payment_method: Optional[str] = None
+    status: Optional[str] = None
+    payment_count: int
+    amount: Decimal
+
+
+class PaymentMethodReport(BaseModel):
+    start: date
+    end: date
+    source: str
+    refreshed_at: Optional[datetime] = None
+    methods: List[PaymentMethodTotal]
+
+
+class UserOrderTotal(BaseModel):
+    user_id: UUID
+    email: Optional[str] = None
+    order_count: int
+    total_amount: Decimal
+
+
+class UserOrderTotalsReport(BaseModel):
+    start: date
+    end: date
+    users: List[UserOrderTotal]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from uuid import UUID
+from datetime import datetime
+from typing import Optional
+
+
+class ServiceHistoryBase(BaseModel):
+    vin: Optional[str] = None
+    status_on: Optional[datetime] = None
+
+
+class ServiceHistoryResponse(ServiceHistoryBase):
+    id: UUID
+    file_path: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
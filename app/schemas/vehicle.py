@@ -1,7 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from uuid import UUID
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Dict, List, Literal, Optional
 from decimal import Decimal
 
 
@@ -74,6 +74,56 @@ class VehicleUpdate(VehicleBase):
 
 class VehicleResponse(VehicleBase):
     id: UUID
+    updated_at: datetime
     
     class Config:
         from_attributes = True
+
+
+class VehicleBulkResult(BaseModel):
+    index: int
+    status: str  # 'inserted', 'updated', 'skipped', 'error'
+    id: Optional[UUID] = None
+    regNo: Optional[str] = None
+    error: Optional[str] = None
+
+
+class VehicleBulkResponse(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    results: List[VehicleBulkResult] = []
+
+
+class VehicleLookupRequest(BaseModel):
+    keys: List[str] = Field(..., min_length=1, max_length=10000)
+    by: Literal["regNo", "chassis"] = "regNo"
+
+
+class VehicleLookupResponse(BaseModel):
+    found: List[VehicleResponse]
+    missing: List[str]
+
+
+class VehicleExpiryItem(BaseModel):
+    id: UUID
+    regNo: Optional[str] = None
+    owner: Optional[str] = None
+    model: Optional[str] = None
+    mobileNumber: Optional[str] = None
+    kind: str
+    expires_on: datetime
+
+
+class VehicleExpiryDay(BaseModel):
+    day: date
+    kind: str
+    vehicle_count: int
+
+
+class VehicleExpirySummary(BaseModel):
+    within_days: int
+    refreshed_at: Optional[datetime] = None
+    totals: Dict[str, int]
+    days: List[VehicleExpiryDay]
@@ -0,0 +1,127 @@
+"""
+Change feed for incremental sync consumers
+
+Vehicles, orders, payments and invoices carry an ``updated_at`` that every
+write sets, indexed together with ``id``, and deletes through ``Repository``
+leave a row in ``tombstones``. A consumer reads ``GET /api/changes`` per
+resource and passes the returned token back as ``since``: each page is one
+index range scan over ``(updated_at, id)`` plus one over the tombstones,
+merged in (changed_at, id) order, so the token only ever moves forward.
+A row appears once, as of its latest write; one written again after the
+consumer passed it appears again further on.
+
+``updated_at`` is stamped by the database clock when the write's statement
+runs, but the row only becomes visible when its transaction commits. The
+feed therefore stops ``CHANGES_SETTLE_SECONDS`` short of now, so a slow
+transaction cannot commit behind a token already handed out; that window
+must cover the longest write transaction. A page with no changes moves the
+token up to that point, so a quiet feed's token never ages out.
+
+Tombstones older than ``CHANGES_TOMBSTONE_RETENTION_DAYS`` are purged; a
+token older than that gets 410 Gone and the consumer resyncs from scratch.
+"""
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import SortOrder, decode_cursor, encode_cursor
+from app.api.responses import select_columns
+from app.core.config import settings
+from app.core.periodic import start_periodic
+from app.db.base import db_utcnow
+from app.db.session import AsyncSessionLocal
+from app.models import Invoice, Order, Payment, Tombstone, Vehicle
+from app.schemas.change import ChangeResource
+from app.schemas.invoice import InvoiceResponse
+from app.schemas.order import OrderResponse
+from app.schemas.payment import PaymentResponse
+from app.schemas.vehicle import VehicleResponse
+
+
+logger = logging.getLogger(__name__)
+
+# Resource -> (model, schema its rows are shaped like); the resource name is the table name
+FEEDS = {
+    ChangeResource.vehicles: (Vehicle, VehicleResponse),
+    ChangeResource.orders: (Order, OrderResponse),
+    ChangeResource.payments: (Payment, PaymentResponse),
+    ChangeResource.invoices: (Invoice, InvoiceResponse),
+}
+
+
+async def read_changes(
+    db: AsyncSession, resource: ChangeResource, since: Optional[str], limit: int
+) -> Dict[str, Any]:
+    """Up to ``limit`` upserts and deletes of ``resource`` after the ``since`` token, oldest first"""
+    model, schema = FEEDS[resource]
+    # The database's clock, the one updated_at and deleted_at are stamped with
+    now = (await db.execute(select(db_utcnow()))).scalar_one()
+    horizon = now - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS)
+    upserts = select_columns(model, schema).where(model.updated_at <= horizon)
+    deletes = select(Tombstone.row_id, Tombstone.deleted_at).where(
+        Tombstone.resource == resource.value, Tombstone.deleted_at <= horizon
+    )
+
+    if since:
+        changed_at, row_id = decode_cursor(since, resource.value, SortOrder.asc, model.updated_at)
+        retention = settings.CHANGES_TOMBSTONE_RETENTION_DAYS
+        if retention > 0 and changed_at < now - timedelta(days=retention):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail=f"Token is older than the {retention}-day tombstone retention; resync without since"
+            )
+        upserts = upserts.where(tuple_(model.updated_at, model.id) > tuple_(changed_at, row_id))
+        deletes = deletes.where(tuple_(Tombstone.deleted_at, Tombstone.row_id) > tuple_(changed_at, row_id))
+
+    rows = (await db.execute(upserts.order_by(model.updated_at, model.id).limit(limit + 1))).all()
+    tombstones = (
+        await db.execute(deletes.order_by(Tombstone.deleted_at, Tombstone.row_id).limit(limit + 1))
+    ).all()
+
+    changes = sorted(
+        [
+            {"op": "upsert", "id": row.id, "changed_at": row.updated_at, "data": dict(row._mapping)}
+            for row in rows
+        ] + [
+            {"op": "delete", "id": row.row_id, "changed_at": row.deleted_at, "data": None}
+            for row in tombstones
+        ],
+        key=lambda change: (change["changed_at"], change["id"]),
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    if changes:
+        last = changes[-1]
+        next_token = encode_cursor(resource.value, SortOrder.asc, last["changed_at"], last["id"])
+    else:
+        # Nothing up to the horizon: move the token there, so a quiet feed's token never ages into a 410
+        next_token = encode_cursor(resource.value, SortOrder.asc, horizon, UUID(int=0))
+    return {"resource": resource.value, "changes": changes, "next_token": next_token, "has_more": has_more}
+
+
+async def purge_tombstones(db: AsyncSession) -> int:
+    # Measured on the database's clock, the one deleted_at is stamped with
+    now = (await db.execute(select(db_utcnow()))).scalar_one()
+    cutoff = now - timedelta(days=settings.CHANGES_TOMBSTONE_RETENTION_DAYS)
+    result = await db.execute(delete(Tombstone).where(Tombstone.deleted_at < cutoff))
+    await db.commit()
+    return result.rowcount
+
+
+async def _purge() -> None:
+    async with AsyncSessionLocal() as session:
+        count = await purge_tombstones(session)
+    logger.info(f"Purged {count} tombstones")
+
+
+def start_tombstone_purge():
+    """Start the purge loop if enabled (and tombstones expire); returns the task (or None)"""
+    if settings.CHANGES_TOMBSTONE_RETENTION_DAYS <= 0:
+        return None
+    return start_periodic("Tombstone purge", settings.CHANGES_PURGE_INTERVAL, _purge)
@@ -0,0 +1,129 @@
+"""
+Idempotency keys for create endpoints
+
+A request carrying an ``Idempotency-Key`` header first claims the key with
+``INSERT ... ON CONFLICT`` in the same transaction that creates the row, and
+the encoded response is stored on the key before that transaction commits.
+A concurrent duplicate's insert blocks on the unique index until the first
+transaction finishes, then finds the stored response and replays it; if the
+first transaction rolled back, the duplicate claims the key and runs the
+create itself. Only successful responses are stored.
+"""
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Type
+
+from fastapi import HTTPException, status
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.periodic import start_periodic
+from app.db.repository import Repository
+from app.db.session import AsyncSessionLocal
+from app.models.idempotency_key import IdempotencyKey
+
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def request_hash(data: BaseModel) -> str:
+    return hashlib.sha256(data.model_dump_json().encode()).hexdigest()
+
+
+async def claim_key(db: AsyncSession, scope: str, key: str, body_hash: str) -> bool:
+    """
+    Claim ``key`` for this transaction; False if another request already holds it.
+
+    Keys older than ``IDEMPOTENCY_KEY_TTL_HOURS`` are reclaimed in the same
+    statement.
+    """
+    now = datetime.utcnow()
+    insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(IdempotencyKey).values(scope=scope, key=key, request_hash=body_hash, created_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.scope, IdempotencyKey.key],
+        set_={
+            "request_hash": stmt.excluded.request_hash,
+            "created_at": stmt.excluded.created_at,
+            "response_code": None,
+            "response_body": None,
+        },
+        where=IdempotencyKey.created_at < now - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+    ).returning(IdempotencyKey.key)
+    return (await db.execute(stmt)).scalar_one_or_none() is not None
+
+
+async def _replay(db: AsyncSession, scope: str, key: str, body_hash: str) -> Response:
+    await db.rollback()
+    record = await db.scalar(
+        select(IdempotencyKey).where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+    )
+    if record is None or record.response_body is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress"
+        )
+    if record.request_hash != body_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request body"
+        )
+    return Response(
+        content=record.response_body,
+        status_code=record.response_code,
+        media_type="application/json",
+        headers={REPLAYED_HEADER: "true"},
+    )
+
+
+async def create_once(
+    db: AsyncSession,
+    scope: str,
+    key: str,
+    data: BaseModel,
+    repository: Repository,
+    response_schema: Type[BaseModel],
+    status_code: int = status.HTTP_201_CREATED,
+) -> Response:
+    """Create a row from ``data`` through ``repository`` at most once per (scope, key)"""
+    body_hash = request_hash(data)
+    if not await claim_key(db, scope, key, body_hash):
+        return await _replay(db, scope, key, body_hash)
+
+    instance = await repository.create(db, data.model_dump())
+    body = response_schema.model_validate(instance).model_dump_json().encode()
+    await db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+        .values(response_code=status_code, response_body=body)
+    )
+    await db.commit()
+    await repository.after_commit("create", [instance])
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+async def purge_expired_keys(db: AsyncSession) -> int:
+    cutoff = datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < cutoff))
+    await db.commit()
+    return result.rowcount
+
+
+async def _purge() -> None:
+    async with AsyncSessionLocal() as session:
+        count = await purge_expired_keys(session)
+    logger.info(f"Purged {count} expired idempotency keys")
+
+
+def start_purge_scheduler():
+    """Start the purge loop if enabled; returns the task (or None)"""
+    return start_periodic("Idempotency key purge", settings.IDEMPOTENCY_PURGE_INTERVAL, _purge)
@@ -0,0 +1,344 @@
+"""
+Background jobs
+
+Slow work is stored as a row in ``jobs`` and run by a pool of asyncio
+workers inside each app process, so the request that asked for it can
+answer 202 with the job id straight away. ``enqueue`` inserts the row in
+the caller's transaction: the job exists exactly when the request's other
+writes commit.
+
+Workers claim due jobs with one ``UPDATE ... WHERE id IN (SELECT ... FOR
+UPDATE SKIP LOCKED) RETURNING``, so any number of processes share a queue
+without handing a job out twice or blocking on each other's row locks.
+Each queue has its own concurrency limit (``JOB_QUEUES``, per process).
+
+A job that raises is retried with exponential backoff and jitter until
+``max_attempts``; ``PermanentJobError`` fails it at once. While a handler
+runs its worker refreshes ``locked_at`` every third of ``JOB_LOCK_TIMEOUT``,
+so a job whose worker died is claimed again once its lock goes that long
+without a heartbeat, however long the job itself takes. Every state change is fenced on (locked_by, attempts) so a reclaimed
+job's first worker cannot overwrite the second's outcome.
+"""
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from fastapi import status
+from fastapi.responses import Response
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import JOB_DURATION, JOB_RUNS
+from app.core.periodic import run_periodic
+from app.db.repository import Repository
+from app.db.session import AsyncSessionLocal
+from app.models.job import Job
+from app.schemas.job import JobResponse
+
+
+logger = logging.getLogger(__name__)
+
+# Longest last_error kept on a job row
+MAX_ERROR_LENGTH = 2000
+
+# Seconds between purges of finished jobs
+PURGE_INTERVAL = 3600
+
+# Lock refreshes per JOB_LOCK_TIMEOUT while a job runs; a couple may fail before the job is reclaimed
+HEARTBEATS_PER_TIMEOUT = 3
+
+repository = Repository(Job)
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler for failures a retry cannot fix; the job fails without retrying"""
+
+
+@dataclass(frozen=True)
+class JobHandler:
+    func: Callable[[Dict[str, Any]], Awaitable[Any]]
+    queue: str
+
+
+HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job(kind: str, queue: str = "default"):
+    """
+    Register ``async def handler(payload) -> result`` for jobs of ``kind``.
+
+    The payload and result are stored as JSON. Handlers open their own
+    sessions and may run more than once, so they should be idempotent.
+    """
+    def register(func):
+        HANDLERS[kind] = JobHandler(func, queue)
+        return func
+    return register
+
+
+def parse_queues(spec: str) -> Dict[str, int]:
+    """'default:4,imports:1' -> {'default': 4, 'imports': 1}; a bare name gets 1"""
+    queues = {}
+    for item in spec.split(","):
+        name, _, concurrency = item.strip().partition(":")
+        if name:
+            queues[name] = max(1, int(concurrency or 1))
+    return queues
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before the next attempt: base * 2^(attempts-1), capped, with jitter in [half, full]"""
+    delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+async def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: Dict[str, Any],
+    *,
+    max_attempts: Optional[int] = None,
+    delay: float = 0,
+) -> Job:
+    """Add a job in the caller's transaction; call ``notify`` after committing"""
+    handler = HANDLERS.get(kind)
+    if handler is None:
+        raise ValueError(f"No job handler registered for {kind!r}")
+    return await repository.create(db, {
+        "queue": handler.queue,
+        "kind": kind,
+        "payload": payload,
+        "status": "queued",
+        "attempts": 0,
+        "max_attempts": max_attempts or settings.JOB_MAX_ATTEMPTS,
+        "run_at": datetime.utcnow() + timedelta(seconds=delay),
+    })
+
+
+def notify(queue: str) -> None:
+    """Wake this process's workers for ``queue`` instead of waiting for the next poll"""
+    if pool is not None:
+        pool.wake(queue)
+
+
+def accepted_response(job: Job, location: str) -> Response:
+    """202 Accepted with the job's status and where to poll it"""
+    return Response(
+        content=JobResponse.model_validate(job).model_dump_json().encode(),
+        status_code=status.HTTP_202_ACCEPTED,
+        media_type="application/json",
+        headers={"Location": location},
+    )
+
+
+async def claim(db: AsyncSession, queue: str, limit: int, worker_id: str) -> List[Job]:
+    """Lock up to ``limit`` due jobs from ``queue`` for ``worker_id``, oldest first, and commit"""
+    now = datetime.utcnow()
+    due = or_(
+        and_(Job.status == "queued", Job.run_at <= now),
+        # Running for longer than the lock timeout: its worker is gone
+        and_(Job.status == "running", Job.locked_at < now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)),
+    )
+    candidates = (
+        select(Job.id)
+        .where(Job.queue == queue, due)
+        .order_by(Job.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.scalars(
+        update(Job)
+        .where(Job.id.in_(candidates.scalar_subquery()))
+        .values(status="running", attempts=Job.attempts + 1, locked_at=now, locked_by=worker_id)
+        .returning(Job)
+        .execution_options(synchronize_session=False)
+    )
+    jobs = list(result)
+    await db.commit()
+    return jobs
+
+
+async def _settle(job: Job, worker_id: str, **values) -> bool:
+    """Write the outcome of this worker's attempt; False if the job was reclaimed meanwhile"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(Job).where(_fenced(job, worker_id)).values(locked_at=None, locked_by=None, **values)
+        )
+        await db.commit()
+    return result.rowcount == 1
+
+
+def _fenced(job: Job, worker_id: str):
+    """WHERE clause matching ``job`` only while this worker's attempt still holds it"""
+    return and_(
+        Job.id == job.id,
+        Job.status == "running",
+        Job.locked_by == worker_id,
+        Job.attempts == job.attempts,
+    )
+
+
+async def _heartbeat(job: Job, worker_id: str) -> None:
+    """Keep refreshing this attempt's lock until cancelled or the job is reclaimed"""
+    interval = settings.JOB_LOCK_TIMEOUT / HEARTBEATS_PER_TIMEOUT
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    update(Job).where(_fenced(job, worker_id)).values(locked_at=datetime.utcnow())
+                )
+                await db.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Job {job.id} ({job.kind}) heartbeat failed: {e}")
+            continue
+        if result.rowcount != 1:
+            logger.warning(f"Job {job.id} ({job.kind}) lost its lock; it may run twice")
+            return
+
+
+async def run_job(job: Job, worker_id: str) -> None:
+    """Run one claimed job and record success, a scheduled retry or failure"""
+    handler = HANDLERS.get(job.kind)
+    started = time.perf_counter()
+    try:
+        if handler is None:
+            raise PermanentJobError(f"No job handler registered for {job.kind!r}")
+        heartbeat = asyncio.create_task(_heartbeat(job, worker_id))
+        try:
+            result = await handler.func(job.payload)
+        finally:
+            heartbeat.cancel()
+    except asyncio.CancelledError:
+        # Shutting down: hand the job back without spending an attempt
+        await _settle(job, worker_id, status="queued", attempts=job.attempts - 1)
+        raise
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"[:MAX_ERROR_LENGTH]
+        if isinstance(e, PermanentJobError) or job.attempts >= job.max_attempts:
+            outcome = "failed"
+            logger.exception(f"Job {job.id} ({job.kind}) failed after {job.attempts} attempts")
+            await _settle(job, worker_id, status="failed", last_error=error, finished_at=datetime.utcnow())
+        else:
+            outcome = "retried"
+            delay = retry_delay(job.attempts)
+            logger.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed, retrying in {delay:.0f}s: {error}")
+            await _settle(
+                job, worker_id, status="queued", last_error=error,
+                run_at=datetime.utcnow() + timedelta(seconds=delay)
+            )
+    else:
+        outcome = "succeeded"
+        if not await _settle(job, worker_id, status="succeeded", result=result, finished_at=datetime.utcnow()):
+            logger.warning(f"Job {job.id} ({job.kind}) finished after its lock expired; result discarded")
+    JOB_RUNS.inc(job.queue, job.kind, outcome)
+    JOB_DURATION.observe(time.perf_counter() - started, job.queue, job.kind)
+
+
+async def purge_finished_jobs(db: AsyncSession) -> int:
+    cutoff = datetime.utcnow() - timedelta(hours=settings.JOB_RETENTION_HOURS)
+    result = await db.execute(
+        delete(Job).where(Job.status.in_(("succeeded", "failed")), Job.finished_at < cutoff)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+class WorkerPool:
+    """One claim loop per queue, each running at most its queue's concurrency of jobs at once"""
+
+    def __init__(self, queues: Dict[str, int], poll_interval: float):
+        self.queues = queues
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.running: Dict[str, Set[asyncio.Task]] = {queue: set() for queue in queues}
+        self.wakeups = {queue: asyncio.Event() for queue in queues}
+
+    def wake(self, queue: str) -> None:
+        if queue in self.wakeups:
+            self.wakeups[queue].set()
+
+    def stats(self) -> Dict[str, int]:
+        return {f"running_{queue}": len(tasks) for queue, tasks in self.running.items()}
+
+    def _finished(self, queue: str, task: asyncio.Task) -> None:
+        self.running[queue].discard(task)
+        if not task.cancelled() and task.exception():
+            # Recording the outcome failed; the job is reclaimed after JOB_LOCK_TIMEOUT
+            logger.error(f"Job worker on {queue!r} crashed: {task.exception()!r}")
+        self.wake(queue)
+
+    async def _claim_loop(self, queue: str, concurrency: int) -> None:
+        wakeup = self.wakeups[queue]
+        while True:
+            # Cleared before claiming, so a job enqueued meanwhile still wakes us
+            wakeup.clear()
+            free = concurrency - len(self.running[queue])
+            if free > 0:
+                try:
+                    async with AsyncSessionLocal() as db:
+                        claimed = await claim(db, queue, free, self.worker_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Claiming jobs from {queue!r} failed: {e}")
+                    claimed = []
+                for claimed_job in claimed:
+                    task = asyncio.create_task(run_job(claimed_job, self.worker_id))
+                    self.running[queue].add(task)
+                    task.add_done_callback(lambda task, queue=queue: self._finished(queue, task))
+            try:
+                await asyncio.wait_for(wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _purge(self) -> None:
+        async with AsyncSessionLocal() as session:
+            count = await purge_finished_jobs(session)
+        logger.info(f"Purged {count} finished jobs")
+
+    async def run(self) -> None:
+        """Claim and run jobs until cancelled, then drain in-flight jobs for up to JOB_SHUTDOWN_GRACE"""
+        loops = [asyncio.create_task(self._claim_loop(queue, n)) for queue, n in self.queues.items()]
+        loops.append(asyncio.create_task(run_periodic("Job purge", PURGE_INTERVAL, self._purge)))
+        try:
+            await asyncio.gather(*loops)
+        finally:
+            for loop in loops:
+                loop.cancel()
+            in_flight = set().union(*self.running.values())
+            if in_flight:
+                _, pending = await asyncio.wait(in_flight, timeout=settings.JOB_SHUTDOWN_GRACE)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+
+pool: Optional[WorkerPool] = None
+
+
+def job_stats() -> Dict[str, int]:
+    """Jobs running per queue in this process"""
+    return pool.stats() if pool else {}
+
+
+def start_job_workers():
+    """Start this process's worker pool if enabled; returns the task (or None)"""
+    global pool
+    if not settings.JOB_WORKERS_ENABLED:
+        return None
+    queues = parse_queues(settings.JOB_QUEUES)
+    for kind, handler in HANDLERS.items():
+        if handler.queue not in queues:
+            logger.warning(f"Job queue {handler.queue!r} ({kind}) has no workers; add it to JOB_QUEUES")
+    pool = WorkerPool(queues, settings.JOB_POLL_INTERVAL)
+    return asyncio.create_task(pool.run())
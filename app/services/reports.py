@@ -0,0 +1,309 @@
+"""
+Finance reporting
+
+    python -m app.services.reports --full
+
+Aggregates are computed in SQL (``GROUP BY`` over the indexed date columns)
+and cached as encoded JSON for ``REPORT_CACHE_TTL`` seconds. Revenue and
+payment-method reports read ``payment_daily_rollups`` when rollups are
+enabled; a background job re-aggregates only the days of the payments
+written since its last run (found through ``payments.updated_at``), so a
+refresh costs the same however much history there is. Deleted payments leave
+no day behind, so a delete makes the next refresh rebuild everything, as
+does the command above (e.g. after rows were changed with plain SQL).
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Date, and_, cast, delete, func, insert, literal, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.responses import dumps
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.periodic import start_periodic
+from app.db.base import db_utcnow
+from app.db.session import AsyncSessionLocal, engine
+from app.models.invoice import Invoice
+from app.models.order import Order
+from app.models.payment import Payment
+from app.models.payment_daily_rollup import PaymentDailyRollup
+from app.models.tombstone import Tombstone
+from app.models.user import User
+
+
+logger = logging.getLogger(__name__)
+
+# Invoice statuses that are no longer owed
+SETTLED_INVOICE_STATUSES = ("paid", "cancelled")
+
+# Stand-in for NULL method/status, which cannot be part of the rollup key
+UNKNOWN = "unknown"
+
+# Arbitrary but fixed key so only one worker refreshes the rollups at a time
+_ROLLUP_LOCK_KEY = 73190002
+
+# More changed days than this are re-aggregated in one full rebuild instead
+MAX_CHANGED_DAYS = 366
+
+
+def revenue_statuses() -> List[str]:
+    """Payment statuses that count as revenue (``REPORT_REVENUE_STATUSES``)"""
+    return [item.strip() for item in settings.REPORT_REVENUE_STATUSES.split(",") if item.strip()]
+
+
+def date_range(start: Optional[date], end: Optional[date], default_days: int) -> Tuple[date, date]:
+    """Inclusive ``start``/``end`` dates, defaulting to the last ``default_days`` days"""
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=default_days - 1)
+    return start, end
+
+
+def _bounds(start: date, end: date) -> Tuple[datetime, datetime]:
+    return datetime.combine(start, datetime.min.time()), datetime.combine(end + timedelta(days=1), datetime.min.time())
+
+
+def period_start(db: AsyncSession, column, period: str):
+    """First day of the ``period`` ('day' or 'month') containing ``column``"""
+    if db.bind.dialect.name == "postgresql":
+        return cast(func.date_trunc(period, column), Date)
+    return func.strftime("%Y-%m-%d" if period == "day" else "%Y-%m-01", column)
+
+
+async def cached_report(key: str, compute: Callable[[], Awaitable[Any]]) -> bytes:
+    """Encoded report from the cache, computing and caching it on a miss"""
+    cache_key = f"report:{key}"
+    body = await cache.get(cache_key)
+    if body is None:
+        body = dumps(await compute())
+        await cache.set(cache_key, body, settings.REPORT_CACHE_TTL)
+    return body
+
+
+async def rollups_refreshed_at(db: AsyncSession) -> Optional[datetime]:
+    if settings.REPORT_ROLLUP_INTERVAL <= 0:
+        return None
+    return await db.scalar(select(func.max(PaymentDailyRollup.refreshed_at)))
+
+
+async def revenue_by_period(db: AsyncSession, period: str, start: date, end: date, live: bool = False) -> Dict[str, Any]:
+    refreshed_at = None if live else await rollups_refreshed_at(db)
+    if refreshed_at is not None:
+        bucket = period_start(db, PaymentDailyRollup.day, period)
+        query = (
+            select(bucket.label("period"),
+                   func.sum(PaymentDailyRollup.payment_count).label("payment_count"),
+                   func.sum(PaymentDailyRollup.amount).label("amount"))
+            .where(PaymentDailyRollup.day >= start, PaymentDailyRollup.day <= end,
+                   PaymentDailyRollup.status.in_(revenue_statuses()))
+        )
+    else:
+        lower, upper = _bounds(start, end)
+        bucket = period_start(db, Payment.payment_date, period)
+        query = (
+            select(bucket.label("period"),
+                   func.count().label("payment_count"),
+                   func.sum(Payment.amount).label("amount"))
+            .where(Payment.payment_date >= lower, Payment.payment_date < upper,
+                   Payment.status.in_(revenue_statuses()))
+        )
+    result = await db.execute(query.group_by(bucket).order_by(bucket))
+    points = [
+        {"period": row.period, "payment_count": row.payment_count, "amount": Decimal(str(row.amount or 0))}
+        for row in result
+    ]
+    return {
+        "period": period,
+        "start": start,
+        "end": end,
+        "source": "rollup" if refreshed_at is not None else "live",
+        "refreshed_at": refreshed_at,
+        "total": sum((point["amount"] for point in points), Decimal(0)),
+        "points": points,
+    }
+
+
+async def payment_method_breakdown(db: AsyncSession, start: date, end: date, live: bool = False) -> Dict[str, Any]:
+    refreshed_at = None if live else await rollups_refreshed_at(db)
+    if refreshed_at is not None:
+        method, status_ = PaymentDailyRollup.payment_method, PaymentDailyRollup.status
+        payment_count = func.sum(PaymentDailyRollup.payment_count)
+        amount = func.sum(PaymentDailyRollup.amount)
+        where = (PaymentDailyRollup.day >= start, PaymentDailyRollup.day <= end)
+    else:
+        lower, upper = _bounds(start, end)
+        method, status_ = Payment.payment_method, Payment.status
+        payment_count = func.count()
+        amount = func.sum(Payment.amount)
+        where = (Payment.payment_date >= lower, Payment.payment_date < upper)
+    result = await db.execute(
+        select(method.label("payment_method"), status_.label("status"),
+               payment_count.label("payment_count"), amount.label("amount"))
+        .where(*where)
+        .group_by(method, status_)
+        .order_by(amount.desc())
+    )
+    return {
+        "start": start,
+        "end": end,
+        "source": "rollup" if refreshed_at is not None else "live",
+        "refreshed_at": refreshed_at,
+        "methods": [
+            {"payment_method": row.payment_method, "status": row.status,
+             "payment_count": row.payment_count, "amount": Decimal(str(row.amount or 0))}
+            for row in result
+        ],
+    }
+
+
+async def outstanding_invoices(db: AsyncSession) -> Dict[str, Any]:
+    result = await db.execute(
+        select(Invoice.status, func.count().label("invoice_count"), func.sum(Invoice.total_amount).label("total_amount"))
+        .group_by(Invoice.status)
+        .order_by(Invoice.status)
+    )
+    statuses = [
+        {"status": row.status, "invoice_count": row.invoice_count, "total_amount": Decimal(str(row.total_amount or 0))}
+        for row in result
+    ]
+    outstanding = [item for item in statuses if item["status"] not in SETTLED_INVOICE_STATUSES]
+    return {
+        "outstanding_count": sum(item["invoice_count"] for item in outstanding),
+        "outstanding_amount": sum((item["total_amount"] for item in outstanding), Decimal(0)),
+        "statuses": statuses,
+    }
+
+
+async def order_totals_by_user(db: AsyncSession, start: date, end: date, limit: int) -> Dict[str, Any]:
+    lower, upper = _bounds(start, end)
+    totals = (
+        select(Order.user_id,
+               func.count().label("order_count"),
+               func.sum(Order.total_amount).label("total_amount"))
+        .where(Order.order_date >= lower, Order.order_date < upper)
+        .group_by(Order.user_id)
+        .order_by(func.sum(Order.total_amount).desc())
+        .limit(limit)
+        .subquery()
+    )
+    # Join users only for the top rows, after aggregation
+    result = await db.execute(
+        select(totals, User.email)
+        .outerjoin(User, User.id == totals.c.user_id)
+        .order_by(totals.c.total_amount.desc())
+    )
+    return {
+        "start": start,
+        "end": end,
+        "users": [
+            {"user_id": row.user_id, "email": row.email, "order_count": row.order_count,
+             "total_amount": Decimal(str(row.total_amount or 0))}
+            for row in result
+        ],
+    }
+
+
+async def _changed_days(db: AsyncSession, since: datetime) -> Optional[List[date]]:
+    """Days of the payments written after ``since``; None if payments were deleted (their days are gone)"""
+    deleted = await db.scalar(
+        select(Tombstone.id)
+        .where(Tombstone.resource == Payment.__tablename__, Tombstone.deleted_at > since)
+        .limit(1)
+    )
+    if deleted is not None:
+        return None
+    day = func.date(Payment.payment_date, type_=Date)
+    result = await db.scalars(
+        select(day).where(Payment.updated_at > since, Payment.payment_date.isnot(None)).distinct()
+    )
+    return list(result)
+
+
+async def refresh_payment_rollups(db: AsyncSession, full: bool = False) -> int:
+    """
+    Re-aggregate changed days into ``payment_daily_rollups``; returns rows written.
+
+    Only the days of payments created or updated since the last refresh are
+    rebuilt. ``full`` rebuilds everything, as does a refresh that finds
+    deleted payments or more than ``MAX_CHANGED_DAYS`` changed days.
+    """
+    if db.bind.dialect.name == "postgresql":
+        locked = await db.scalar(text(f"SELECT pg_try_advisory_xact_lock({_ROLLUP_LOCK_KEY})"))
+        if not locked:
+            logger.info("Payment rollup refresh already running in another worker")
+            return 0
+
+    # Stamped with the database clock, like payments.updated_at
+    refreshed_at = await db.scalar(select(db_utcnow()))
+    days: Optional[List[date]] = None
+    if not full:
+        last_refresh = await db.scalar(select(func.max(PaymentDailyRollup.refreshed_at)))
+        if last_refresh is not None:
+            # A payment stamped just before the last refresh may have committed after it read
+            since = last_refresh - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS)
+            days = await _changed_days(db, since)
+            if days is not None and len(days) > MAX_CHANGED_DAYS:
+                days = None
+            if days == []:
+                await db.commit()
+                return 0
+
+    day = func.date(Payment.payment_date)
+    method = func.coalesce(Payment.payment_method, UNKNOWN)
+    status_ = func.coalesce(Payment.status, UNKNOWN)
+    source = (
+        select(day.label("day"), method.label("payment_method"), status_.label("status"),
+               func.count().label("payment_count"),
+               func.coalesce(func.sum(Payment.amount), 0).label("amount"),
+               literal(refreshed_at).label("refreshed_at"))
+        .where(Payment.payment_date.isnot(None))
+        .group_by(day, method, status_)
+    )
+    stale = delete(PaymentDailyRollup)
+    if days is not None:
+        # One payment_date range per day, so each is an index range scan
+        ranges = [_bounds(changed, changed) for changed in days]
+        source = source.where(or_(*(
+            and_(Payment.payment_date >= lower, Payment.payment_date < upper) for lower, upper in ranges
+        )))
+        stale = stale.where(PaymentDailyRollup.day.in_(days))
+
+    await db.execute(stale)
+    result = await db.execute(
+        insert(PaymentDailyRollup).from_select(
+            ["day", "payment_method", "status", "payment_count", "amount", "refreshed_at"], source
+        )
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def _refresh() -> None:
+    async with AsyncSessionLocal() as session:
+        count = await refresh_payment_rollups(session)
+    logger.info(f"Refreshed {count} payment rollup rows")
+
+
+def start_rollup_scheduler():
+    """Start the rollup refresh loop if enabled; returns the task (or None)"""
+    return start_periodic("Payment rollup refresh", settings.REPORT_ROLLUP_INTERVAL, _refresh)
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        async with AsyncSessionLocal() as session:
+            count = await refresh_payment_rollups(session, full=args.full)
+    finally:
+        await engine.dispose()
+    print(f"Wrote {count} payment rollup rows")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--full", action="store_true", help="rebuild every day, not just the changed ones")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,76 @@
+"""
+Service-history documents
+
+The file is streamed to storage first and the row is inserted afterwards,
+so the database session never waits on the upload; if the insert fails the
+stored file is removed again. Stored keys follow ``<vin>/<id><ext>``, the
+layout the backfill command indexes.
+"""
+import os
+import re
+import uuid
+from datetime import datetime
+from typing import AsyncIterable, Optional
+
+import anyio
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.storage import StoredFileNotFound, storage
+from app.models.service_history import ServiceHistory
+
+
+VIN_PATTERN = r"^[A-Za-z0-9_-]+$"
+
+_EXTENSION = re.compile(r"^\.[A-Za-z0-9]{1,10}$")
+
+
+def document_key(vin: str, document_id: uuid.UUID, filename: Optional[str]) -> str:
+    """Storage key for a new document; keeps the upload's extension when it looks sane"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if not _EXTENSION.match(extension):
+        extension = ""
+    return f"{vin}/{document_id}{extension}"
+
+
+def download_filename(document: ServiceHistory) -> str:
+    extension = os.path.splitext(document.file_path or "")[1]
+    return f"{document.vin}-{document.id}{extension}"
+
+
+def max_upload_bytes() -> int:
+    return settings.SERVICE_HISTORY_MAX_UPLOAD_MB * 1024 * 1024
+
+
+async def store_document(
+    db: AsyncSession,
+    vin: str,
+    chunks: AsyncIterable[bytes],
+    filename: Optional[str] = None,
+    status_on: Optional[datetime] = None,
+) -> ServiceHistory:
+    """Stream ``chunks`` to storage and record the document"""
+    document_id = uuid.uuid4()
+    key = document_key(vin, document_id, filename)
+    await storage.save(key, chunks, max_bytes=max_upload_bytes())
+
+    document = ServiceHistory(id=document_id, vin=vin, file_path=key, status_on=status_on or datetime.utcnow())
+    try:
+        db.add(document)
+        await db.commit()
+    except BaseException:
+        with anyio.CancelScope(shield=True):
+            await storage.delete(key)
+        raise
+    return document
+
+
+async def delete_document(db: AsyncSession, document: ServiceHistory) -> None:
+    """Delete the row, then its file; a leftover file is harmless, a dangling row is not"""
+    await db.delete(document)
+    await db.commit()
+    if document.file_path:
+        try:
+            await storage.delete(document.file_path)
+        except StoredFileNotFound:
+            pass
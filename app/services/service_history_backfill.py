@@ -0,0 +1,139 @@
+"""
+Index an existing directory tree of service-history documents
+
+    python -m app.services.service_history_backfill
+    python -m app.services.service_history_backfill data/service_history/MH12AB1234 --concurrency 8
+
+Files are expected under ``<SERVICE_HISTORY_DIR>/<vin>/...``, the layout
+uploads use, and ``path`` (default: the storage root) must be inside the
+storage root. Each top-level directory is walked in a worker thread, up to
+``--concurrency`` at once, and its files are inserted in batches with
+``ON CONFLICT (file_path) DO NOTHING``, so the command is safe to re-run,
+even concurrently with another run. ``status_on`` is the
+file's modification time.
+
+The same backfill runs as the ``service_history.backfill`` job behind
+``POST /api/service-history/backfill``.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.storage import PARTIAL_SUFFIX, LocalStorage, storage
+from app.db.session import AsyncSessionLocal, engine
+from app.models.service_history import ServiceHistory
+from app.services import jobs
+
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_JOB = "service_history.backfill"
+
+
+def scan(local: LocalStorage, directory: str, recursive: bool = True) -> List[Tuple[str, datetime]]:
+    """(key, modified time) for every finished file under ``directory``"""
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(directory):
+        for name in filenames:
+            if name.endswith(PARTIAL_SUFFIX) or name.startswith("."):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                modified = os.stat(path).st_mtime
+            except FileNotFoundError:
+                continue
+            entries.append((local.key(path), datetime.utcfromtimestamp(modified)))
+        if not recursive:
+            dirnames.clear()
+    return entries
+
+
+async def index_batch(entries: List[Tuple[str, datetime]]) -> int:
+    """Insert the entries that are not indexed yet; returns rows inserted"""
+    if not entries:
+        return 0
+    rows = [
+        {"id": uuid.uuid4(), "vin": key.split("/", 1)[0], "file_path": key, "status_on": modified}
+        for key, modified in entries
+    ]
+    async with AsyncSessionLocal() as db:
+        insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+        result = await db.execute(
+            insert(ServiceHistory)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["file_path"])
+            .returning(ServiceHistory.id)
+        )
+        inserted = len(result.all())
+        await db.commit()
+    return inserted
+
+
+async def index_directory(
+    local: LocalStorage, directory: str, recursive: bool, semaphore: asyncio.Semaphore, batch_size: int
+) -> Tuple[int, int]:
+    """Scan and index one directory; returns (files found, rows inserted)"""
+    async with semaphore:
+        entries = await asyncio.to_thread(scan, local, directory, recursive)
+        # Files directly under the root have no <vin>/ directory to take the VIN from
+        skipped = [key for key, _ in entries if "/" not in key]
+        if skipped:
+            logger.warning(f"Skipping {len(skipped)} files outside a VIN directory in {directory}")
+        entries = [entry for entry in entries if "/" in entry[0]]
+        inserted = 0
+        for i in range(0, len(entries), batch_size):
+            inserted += await index_batch(entries[i:i + batch_size])
+        return len(entries), inserted
+
+
+async def backfill(path: Optional[str] = None, concurrency: int = 4, batch_size: int = 500) -> Tuple[int, int]:
+    """Index every file under ``path``; returns (files found, rows inserted)"""
+    if not isinstance(storage, LocalStorage):
+        raise RuntimeError("Backfill needs SERVICE_HISTORY_STORAGE=local")
+    root = storage.path(storage.key(path)) if path else storage.root
+
+    # The root itself is scanned without recursing; each subdirectory is its own task
+    directories = [(root, False)]
+    with os.scandir(root) as entries:
+        directories += [(entry.path, True) for entry in entries if entry.is_dir(follow_symlinks=False)]
+
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*(
+        index_directory(storage, directory, recursive, semaphore, batch_size)
+        for directory, recursive in directories
+    ))
+    return sum(found for found, _ in results), sum(inserted for _, inserted in results)
+
+
+@jobs.job(BACKFILL_JOB, queue="imports")
+async def backfill_job(payload: Dict[str, Any]) -> Dict[str, int]:
+    """Job handler: ``{"path": ...}`` -> files found and rows inserted"""
+    try:
+        found, inserted = await backfill(payload.get("path"))
+    except (RuntimeError, FileNotFoundError, NotADirectoryError) as e:
+        raise jobs.PermanentJobError(str(e))
+    return {"found": found, "inserted": inserted}
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        found, inserted = await backfill(args.path, args.concurrency, args.batch_size)
+    finally:
+        await engine.dispose()
+    print(f"Indexed {inserted} new service-history documents ({found} files scanned)")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", help="directory to index (default: SERVICE_HISTORY_DIR)")
+    parser.add_argument("--concurrency", type=int, default=4, help="directories indexed at once")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per INSERT")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,102 @@
+"""
+Order and payment status push
+
+Clients open ``GET /api/events?orders=<id>&payments=<id>`` (server-sent
+events) instead of polling. The order and payment repositories publish each
+committed create, update and delete through ``app.core.events.broker``: an
+order's events go to its subscribers, a payment's to the payment's and its
+order's. Every event carries the row as the resource's GET returns it.
+
+A stream starts with a snapshot of the subscribed rows, read from the
+primary after subscribing, so a change made just before the client
+connected is not missed. It sends the snapshot again whenever the broker
+asks subscribers to resync, and ends after ``EVENTS_MAX_STREAM_SECONDS``;
+EventSource reconnects on its own.
+"""
+import time
+from typing import Any, AsyncIterator, Dict, List, Sequence
+from uuid import UUID
+
+from app.api.responses import dumps, row_to_dict, select_columns
+from app.core.config import settings
+from app.core.events import Subscription, broker
+from app.db.session import AsyncSessionLocal
+from app.models import Order, Payment
+from app.schemas.order import OrderResponse
+from app.schemas.payment import PaymentResponse
+
+
+# Resource -> (model, schema its rows are shaped like)
+RESOURCES = {
+    "orders": (Order, OrderResponse),
+    "payments": (Payment, PaymentResponse),
+}
+
+# Milliseconds EventSource waits before reconnecting
+RETRY_MS = 3000
+
+
+def topic(resource: str, id: Any) -> str:
+    return f"{resource}:{id}"
+
+
+def publish(resource: str, action: str, rows: Sequence[Any]) -> None:
+    """Push committed writes of ``rows``; deletes need ``id`` (and a payment's ``order_id``)"""
+    _, schema = RESOURCES[resource]
+    for row in rows:
+        topics = [topic(resource, row.id)]
+        if resource == "payments":
+            topics.append(topic("orders", row.order_id))
+        data = None if action == "delete" else schema.model_validate(row).model_dump(mode="json")
+        event = {"resource": resource, "action": action, "id": str(row.id), "data": data}
+        broker.publish(topics, topic(resource, row.id), event)
+
+
+def subscribe(ids: Dict[str, List[UUID]]) -> Subscription:
+    return broker.subscribe(topic(resource, id) for resource, resource_ids in ids.items() for id in resource_ids)
+
+
+async def snapshot(ids: Dict[str, List[UUID]]) -> List[Dict[str, Any]]:
+    """Current state of the subscribed rows as events; ids that do not exist come back as deletes"""
+    events = []
+    async with AsyncSessionLocal() as db:
+        for resource, resource_ids in ids.items():
+            if not resource_ids:
+                continue
+            model, schema = RESOURCES[resource]
+            result = await db.execute(select_columns(model, schema).where(model.id.in_(resource_ids)))
+            found = {row.id: row_to_dict(row) for row in result}
+            for id in resource_ids:
+                data = found.get(id)
+                action = "snapshot" if data is not None else "delete"
+                events.append({"resource": resource, "action": action, "id": str(id), "data": data})
+    return events
+
+
+def _sse(event: Dict[str, Any]) -> bytes:
+    return b"event: " + event["resource"].encode() + b"\ndata: " + dumps(event) + b"\n\n"
+
+
+async def stream(ids: Dict[str, List[UUID]]) -> AsyncIterator[bytes]:
+    """Server-sent events for ``ids`` until the client leaves or the stream's time is up"""
+    # Subscribed once the body starts, so a response that never starts leaves nothing behind
+    subscription = subscribe(ids)
+    deadline = time.monotonic() + settings.EVENTS_MAX_STREAM_SECONDS
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        for event in await snapshot(ids):
+            yield _sse(event)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            events = await subscription.next(min(settings.EVENTS_HEARTBEAT_SECONDS, remaining))
+            if subscription.take_resync():
+                # Read after the pending events were taken, so at least as new as they are
+                events = await snapshot(ids)
+            if not events:
+                yield b": keepalive\n\n"
+            for event in events:
+                yield _sse(event)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,334 @@
+"""
+Bulk vehicle ingestion
+
+Rows are validated in batches and written with one multi-row
+``INSERT ... ON CONFLICT DO UPDATE ... RETURNING`` per batch, keyed on the
+unique ``regNo`` or ``chassis`` index, plus one upsert of the batch's
+``vehicle_details`` rows. Each batch is committed on its own so a long import
+makes progress even if a later batch fails.
+
+Large imports can run as a background job (``BULK_UPSERT_JOB`` on the
+``imports`` queue): the request body is streamed to the job spool, capped at
+``VEHICLE_BULK_MAX_ASYNC_MB``, and the job reads it back from there.
+Re-running a batch after a retry upserts the same rows.
+"""
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Tuple
+
+import anyio
+
+from pydantic import ValidationError
+from sqlalchemy import delete, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache, vehicle_cache_key
+from app.core.config import settings
+from app.core.storage import StoredFileNotFound, spool
+from app.db.base import db_utcnow
+from app.db.details import detail_attributes, split_details
+from app.db.dictionary import vehicle_values
+from app.db.session import AsyncSessionLocal
+from app.models.job import Job
+from app.models.vehicle import Vehicle
+from app.models.vehicle_details import VehicleDetails
+from app.schemas.vehicle import VehicleCreate, VehicleBulkResult, VehicleBulkResponse
+from app.services import jobs, vehicle_search
+
+
+# 46 bound parameters per vehicle row (12 per details row); stays well under
+# PostgreSQL's 32767 limit
+BULK_BATCH_SIZE = 500
+
+BULK_UPSERT_JOB = "vehicles.bulk_upsert"
+
+# Schema/attribute name -> table column name ("class_" is stored as "class")
+_COLUMN_NAMES = {
+    attr.key: attr.columns[0].name for attr in Vehicle.__mapper__.column_attrs
+}
+_DETAIL_COLUMN_NAMES = {
+    name: attr.property.columns[0].name for name, attr in detail_attributes(Vehicle).items()
+}
+
+
+def _error_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+@dataclass(frozen=True)
+class MalformedLine:
+    """Stands in for an NDJSON line that is not valid JSON; reported as that row's error"""
+    error: str
+
+
+def _decode_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return MalformedLine(str(e))
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Decode an NDJSON byte stream into objects without buffering the body"""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _decode_line(line)
+    if pending.strip():
+        yield _decode_line(pending)
+
+
+async def batched(items: AsyncIterator[Any], size: int) -> AsyncIterator[List[Any]]:
+    batch = []
+    async for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def aiter_list(items: Iterable[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+def _insert_for(db: AsyncSession):
+    if db.bind.dialect.name == "postgresql":
+        return pg_insert
+    return sqlite_insert
+
+
+def _validate_batch(
+    start: int, raw_rows: List[Any], key: str
+) -> Tuple[Dict[str, Tuple[int, Dict[str, Any]]], List[VehicleBulkResult]]:
+    """Validate rows; returns the rows to write keyed by upsert key plus rejects"""
+    rows: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+    rejected: List[VehicleBulkResult] = []
+
+    for offset, raw in enumerate(raw_rows):
+        index = start + offset
+        if isinstance(raw, MalformedLine):
+            rejected.append(VehicleBulkResult(index=index, status="error", error=f"Malformed NDJSON line: {raw.error}"))
+            continue
+        try:
+            vehicle = VehicleCreate.model_validate(raw)
+        except ValidationError as e:
+            rejected.append(VehicleBulkResult(index=index, status="error", error=_error_message(e)))
+            continue
+
+        data = vehicle.model_dump()
+        key_value = data.get(key)
+        if not key_value:
+            rejected.append(VehicleBulkResult(
+                index=index, status="error", regNo=data.get("regNo"), error=f"{key} is required"
+            ))
+            continue
+
+        # ON CONFLICT cannot touch the same row twice in one statement;
+        # the last occurrence of a key in the batch wins
+        previous = rows.pop(key_value, None)
+        if previous is not None:
+            rejected.append(VehicleBulkResult(
+                index=previous[0], status="skipped", regNo=previous[1].get("regNo"),
+                error=f"duplicate {key} later in the request"
+            ))
+        rows[key_value] = (index, data)
+
+    return rows, rejected
+
+
+async def _write_details(
+    db: AsyncSession,
+    rows: Dict[str, Tuple[int, Dict[str, Any]]],
+    written: List[Any],
+    key_index: int,
+    inserted: Dict[uuid.UUID, bool],
+) -> None:
+    """Replace the written vehicles' detail rows: one upsert, plus one DELETE for cleared ones"""
+    values = []
+    cleared = []
+    for row in written:
+        _, cold = split_details(Vehicle, rows[row[key_index]][1])
+        if any(value is not None for value in cold.values()):
+            detail = {_DETAIL_COLUMN_NAMES[name]: value for name, value in cold.items()}
+            detail["vehicle_id"] = row.id
+            values.append(detail)
+        elif not inserted[row.id]:
+            cleared.append(row.id)
+
+    if values:
+        insert = _insert_for(db)
+        stmt = insert(VehicleDetails.__table__).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["vehicle_id"],
+            set_={name: stmt.excluded[name] for name in _DETAIL_COLUMN_NAMES.values()},
+        )
+        await db.execute(stmt)
+    if cleared:
+        await db.execute(delete(VehicleDetails).where(VehicleDetails.vehicle_id.in_(cleared)))
+
+
+async def _upsert_batch(
+    db: AsyncSession, rows: Dict[str, Tuple[int, Dict[str, Any]]], key: str
+) -> List[VehicleBulkResult]:
+    key_column = getattr(Vehicle, key)
+    is_postgres = db.bind.dialect.name == "postgresql"
+
+    existing = set()
+    if not is_postgres:
+        # No xmax outside PostgreSQL; classify inserts vs updates up front
+        result = await db.execute(select(key_column).where(key_column.in_(list(rows))))
+        existing = set(result.scalars().all())
+
+    # Upserting on chassis can change a vehicle's regNo; the old regNo's cache entry must go too
+    stale_regnos = set()
+    if key == "chassis":
+        result = await db.execute(
+            select(Vehicle.chassis, Vehicle.regNo).where(Vehicle.chassis.in_(list(rows)))
+        )
+        stale_regnos = {
+            regno for chassis, regno in result
+            if regno is not None and regno != rows[chassis][1].get("regNo")
+        }
+
+    # ON CONFLICT DO UPDATE skips onupdate defaults: stamp updated_at for both paths
+    values = []
+    for _, data in rows.values():
+        hot, _ = split_details(Vehicle, data)
+        row = {_COLUMN_NAMES[name]: value for name, value in hot.items()}
+        row["id"] = uuid.uuid4()
+        row["updated_at"] = db_utcnow()
+        values.append(row)
+
+    # New manufacturer/model/RTO/... strings get their dictionary ids in one round trip
+    await vehicle_values.ensure_rows(Vehicle, values)
+
+    insert = _insert_for(db)
+    stmt = insert(Vehicle.__table__).values(values)
+    updatable = [name for name in values[0] if name not in ("id", _COLUMN_NAMES[key])]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_COLUMN_NAMES[key]],
+        set_={name: stmt.excluded[name] for name in updatable},
+    )
+    returning = [Vehicle.id, Vehicle.regNo, Vehicle.chassis, Vehicle.engine]
+    if is_postgres:
+        returning.append(literal_column("(xmax = 0)").label("inserted"))
+    result = await db.execute(stmt.returning(*returning))
+    written = result.all()
+    key_index = 1 if key == "regNo" else 2
+    inserted = {
+        row.id: row.inserted if is_postgres else row[key_index] not in existing
+        for row in written
+    }
+    await _write_details(db, rows, written, key_index, inserted)
+    await db.commit()
+
+    await cache.delete(*(vehicle_cache_key(regno) for regno in stale_regnos.union(row.regNo for row in written)))
+
+    results = []
+    for row in written:
+        vehicle_search.index_vehicle(row)
+        results.append(VehicleBulkResult(
+            index=rows[row[key_index]][0],
+            status="inserted" if inserted[row.id] else "updated",
+            id=row.id,
+            regNo=row.regNo,
+        ))
+    return results
+
+
+async def bulk_upsert_vehicles(
+    db: AsyncSession, raw_rows: AsyncIterator[Any], key: str = "regNo"
+) -> VehicleBulkResponse:
+    """Validate and upsert vehicles batch by batch, reporting a result per input row"""
+    response = VehicleBulkResponse()
+    start = 0
+
+    async for batch in batched(raw_rows, BULK_BATCH_SIZE):
+        rows, results = _validate_batch(start, batch, key)
+        if rows:
+            try:
+                results.extend(await _upsert_batch(db, rows, key))
+            except SQLAlchemyError as e:
+                await db.rollback()
+                message = str(e.orig) if getattr(e, "orig", None) else str(e)
+                results.extend(
+                    VehicleBulkResult(index=index, status="error", regNo=data.get("regNo"), error=message)
+                    for index, data in rows.values()
+                )
+
+        for result in results:
+            if result.status == "inserted":
+                response.inserted += 1
+            elif result.status == "updated":
+                response.updated += 1
+            elif result.status == "skipped":
+                response.skipped += 1
+            else:
+                response.failed += 1
+        response.results.extend(sorted(results, key=lambda r: r.index))
+        start += len(batch)
+
+    return response
+
+
+def max_async_bytes() -> int:
+    return settings.VEHICLE_BULK_MAX_ASYNC_MB * 1024 * 1024
+
+
+async def enqueue_bulk_upsert(
+    db: AsyncSession, chunks: AsyncIterable[bytes], ndjson: bool, key: str
+) -> Job:
+    """Spool the request body and queue the import; raises ``UploadTooLarge``"""
+    file = f"vehicle_bulk/{uuid.uuid4().hex}.{'ndjson' if ndjson else 'json'}"
+    await spool.save(file, chunks, max_bytes=max_async_bytes())
+    try:
+        job = await jobs.enqueue(db, BULK_UPSERT_JOB, {"file": file, "ndjson": ndjson, "key": key})
+        await db.commit()
+    except BaseException:
+        with anyio.CancelScope(shield=True):
+            await spool.delete(file)
+        raise
+    return job
+
+
+async def _spooled_rows(payload: Dict[str, Any]) -> AsyncIterator[Any]:
+    if payload["ndjson"]:
+        return iter_ndjson(spool.read(payload["file"]))
+    body = b"".join([chunk async for chunk in spool.read(payload["file"])])
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        rows = None
+    if not isinstance(rows, list):
+        raise jobs.PermanentJobError("Expected a JSON array of vehicles")
+    return aiter_list(rows)
+
+
+@jobs.job(BULK_UPSERT_JOB, queue="imports")
+async def bulk_upsert_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler: ``{"file": <spool key>, "ndjson": bool, "key": "regNo"}`` -> the VehicleBulkResponse"""
+    try:
+        rows = await _spooled_rows(payload)
+        async with AsyncSessionLocal() as db:
+            response = await bulk_upsert_vehicles(db, rows, key=payload.get("key", "regNo"))
+    except StoredFileNotFound as e:
+        raise jobs.PermanentJobError(f"Spooled upload {e} is gone")
+    except jobs.PermanentJobError:
+        await spool.delete(payload["file"])
+        raise
+    # Kept until the import is done with it so a retry can read it again
+    await spool.delete(payload["file"])
+    return response.model_dump(mode="json")
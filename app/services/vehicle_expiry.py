@@ -0,0 +1,105 @@
+"""
+Vehicle compliance expiry tracking
+
+"Expires in the next N days" lists are range scans over partial indexes on
+the four expiry columns. Dashboards read per-day counts from
+``vehicle_expiry_buckets``, which a background job rebuilds periodically so
+no dashboard load has to scan the vehicles table.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import delete, func, insert, literal, select, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.periodic import start_periodic
+from app.db.session import AsyncSessionLocal
+from app.models.vehicle import Vehicle
+from app.models.vehicle_expiry_bucket import VehicleExpiryBucket
+
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_COLUMNS = {
+    "rc": Vehicle.rcExpiryDate,
+    "insurance": Vehicle.vehicleInsuranceUpto,
+    "pucc": Vehicle.puccUpto,
+    "permit": Vehicle.permitValidUpto,
+}
+
+# Arbitrary but fixed key so only one worker rebuilds the buckets at a time
+_REFRESH_LOCK_KEY = 73190001
+
+
+def expiry_window(within_days: int) -> tuple:
+    start = datetime.utcnow()
+    return start, start + timedelta(days=within_days)
+
+
+async def refresh_expiry_buckets(db: AsyncSession, horizon_days: int) -> int:
+    """Rebuild the daily buckets for the next ``horizon_days``; returns bucket count"""
+    if db.bind.dialect.name == "postgresql":
+        locked = await db.scalar(text(f"SELECT pg_try_advisory_xact_lock({_REFRESH_LOCK_KEY})"))
+        if not locked:
+            logger.info("Expiry bucket refresh already running in another worker")
+            return 0
+
+    start, end = expiry_window(horizon_days)
+    refreshed_at = datetime.utcnow()
+    per_kind = [
+        select(
+            func.date(column).label("day"),
+            literal(kind).label("kind"),
+            func.count().label("vehicle_count"),
+            literal(refreshed_at).label("refreshed_at"),
+        )
+        .where(column >= start, column < end)
+        .group_by(func.date(column))
+        for kind, column in EXPIRY_COLUMNS.items()
+    ]
+
+    await db.execute(delete(VehicleExpiryBucket))
+    result = await db.execute(
+        insert(VehicleExpiryBucket).from_select(
+            ["day", "kind", "vehicle_count", "refreshed_at"], union_all(*per_kind)
+        )
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def expiry_summary(db: AsyncSession, within_days: int) -> Dict[str, object]:
+    """Per-day and per-kind expiry counts from the precomputed buckets"""
+    start, end = expiry_window(within_days)
+    result = await db.execute(
+        select(VehicleExpiryBucket)
+        .where(VehicleExpiryBucket.day >= start.date(), VehicleExpiryBucket.day < end.date())
+        .order_by(VehicleExpiryBucket.day, VehicleExpiryBucket.kind)
+    )
+    buckets: List[VehicleExpiryBucket] = list(result.scalars().all())
+
+    totals = {kind: 0 for kind in EXPIRY_COLUMNS}
+    for bucket in buckets:
+        totals[bucket.kind] = totals.get(bucket.kind, 0) + bucket.vehicle_count
+    return {
+        "within_days": within_days,
+        "refreshed_at": max((bucket.refreshed_at for bucket in buckets), default=None),
+        "totals": totals,
+        "days": [
+            {"day": bucket.day, "kind": bucket.kind, "vehicle_count": bucket.vehicle_count}
+            for bucket in buckets
+        ],
+    }
+
+
+async def _refresh() -> None:
+    async with AsyncSessionLocal() as session:
+        count = await refresh_expiry_buckets(session, settings.EXPIRY_BUCKET_HORIZON_DAYS)
+    logger.info(f"Refreshed {count} vehicle expiry buckets")
+
+
+def start_expiry_scheduler():
+    """Start the refresh loop if enabled; returns the task (or None)"""
+    return start_periodic("Vehicle expiry bucket refresh", settings.EXPIRY_REFRESH_INTERVAL, _refresh)
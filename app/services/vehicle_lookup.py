@@ -0,0 +1,103 @@
+"""
+Batch vehicle lookup by registration or chassis number
+
+Keys already in the vehicle cache are answered from it with one multi-get;
+the rest are resolved with a single ``WHERE key = ANY(:keys)`` query over the
+unique index and cached for the single-vehicle endpoint; that query runs on
+the primary, since a replica's rows may be older than the cache allows. The response is
+produced as a stream of JSON chunks so large batches never build the whole
+body in memory.
+"""
+from contextlib import nullcontext
+from typing import AsyncIterator, Dict, List, Optional
+
+import orjson
+from sqlalchemy import String, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.responses import dumps, row_to_dict, select_columns
+from app.core.cache import cache, vehicle_cache_key
+from app.core.config import settings
+from app.db.session import primary_for
+from app.models.vehicle import Vehicle
+from app.schemas.vehicle import VehicleResponse
+
+
+LOOKUP_CHUNK_ROWS = 500
+
+KEY_COLUMNS = {
+    "regNo": Vehicle.regNo,
+    "chassis": Vehicle.chassis,
+}
+
+
+def unique_keys(keys: List[str]) -> List[str]:
+    """Strip blanks and duplicates, keeping the caller's order"""
+    return list(dict.fromkeys(key.strip() for key in keys if key and key.strip()))
+
+
+def _key_filter(db: AsyncSession, column, keys: List[str]):
+    if db.bind.dialect.name == "postgresql":
+        # One array parameter however many keys; IN (...) would bind one each
+        return column == any_(bindparam("lookup_keys", keys, type_=ARRAY(String)))
+    return column.in_(keys)
+
+
+def _project(body: bytes, fields: Optional[List[str]]) -> bytes:
+    if not fields:
+        return body
+    full = orjson.loads(body)
+    return dumps({name: full.get(name) for name in fields})
+
+
+async def lookup_vehicles(
+    db: AsyncSession, keys: List[str], by: str = "regNo", fields: Optional[List[str]] = None
+) -> AsyncIterator[bytes]:
+    """Yield ``{"found": [...], "missing": [...]}`` as JSON chunks"""
+    column = KEY_COLUMNS[by]
+    remaining = unique_keys(keys)
+    first = True
+
+    def item(body: bytes) -> bytes:
+        nonlocal first
+        prefix = b"" if first else b","
+        first = False
+        return prefix + body
+
+    yield b'{"found":['
+
+    # Cache entries are keyed by regNo, so only regNo lookups can be served from it
+    if by == "regNo" and remaining:
+        cached = await cache.get_many([vehicle_cache_key(key) for key in remaining])
+        if cached:
+            yield b"".join(item(_project(body, fields)) for body in cached.values())
+            remaining = [key for key in remaining if vehicle_cache_key(key) not in cached]
+
+    if remaining:
+        # Read the full row when the result can be cached (from the primary), otherwise only the projection
+        query_fields = None if not fields else list(dict.fromkeys([*fields, by]))
+        async with (primary_for(db) if not fields else nullcontext(db)) as source:
+            result = await source.stream(
+                select_columns(Vehicle, VehicleResponse, query_fields)
+                .where(_key_filter(source, column, remaining))
+                .execution_options(yield_per=LOOKUP_CHUNK_ROWS)
+            )
+            found = set()
+            async for rows in result.partitions(LOOKUP_CHUNK_ROWS):
+                to_cache: Dict[str, bytes] = {}
+                chunk = []
+                for row in rows:
+                    data = row_to_dict(row)
+                    found.add(data[by])
+                    body = dumps(data)
+                    if not fields:
+                        to_cache[vehicle_cache_key(data["regNo"])] = body
+                        chunk.append(item(body))
+                    else:
+                        chunk.append(item(dumps({name: data.get(name) for name in fields})))
+                await cache.set_many(to_cache, settings.VEHICLE_CACHE_TTL)
+                yield b"".join(chunk)
+        remaining = [key for key in remaining if key not in found]
+
+    yield b'],"missing":' + dumps(remaining) + b"}"
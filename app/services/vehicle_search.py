@@ -0,0 +1,261 @@
+"""
+Vehicle search subsystem
+
+Registration, chassis and engine numbers are matched on a normalized search
+key (uppercased, spaces and dashes removed). On PostgreSQL the keys are served
+by pg_trgm GIN expression indexes (see the vehicle search Alembic migration);
+on other dialects (SQLite in local runs) an in-process trigram index is used.
+"""
+import asyncio
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, func, or_, case, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.details import load_details
+from app.models.vehicle import Vehicle
+
+
+SEARCH_FIELDS = ("regNo", "chassis", "engine")
+
+# Spaces and dashes only, exactly what normalized_column() strips in SQL
+_STRIP_RE = re.compile(r"[ \-]+")
+
+
+def normalize_search_key(value: Optional[str]) -> str:
+    """Uppercase a registration/chassis/engine number and strip spaces and dashes"""
+    if not value:
+        return ""
+    return _STRIP_RE.sub("", value).upper()
+
+
+def normalized_column(column):
+    """
+    SQL expression matching normalize_search_key().
+
+    The literals are inlined (not bound) so the expression is identical to the
+    one the trigram indexes are built on and the planner can use them.
+    """
+    stripped = func.replace(
+        func.replace(column, literal_column("' '"), literal_column("''")),
+        literal_column("'-'"),
+        literal_column("''"),
+    )
+    return func.upper(stripped)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _trigrams(key: str) -> Set[str]:
+    """Trigrams of a search key, padded the same way pg_trgm pads words"""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _rank(key: str, term: str, similarity: float) -> float:
+    """Exact matches first, then prefix matches, then by trigram similarity"""
+    if key == term:
+        return 3.0 + similarity
+    if key.startswith(term):
+        return 2.0 + similarity
+    if term in key:
+        return 1.0 + similarity
+    return similarity
+
+
+class InMemoryTrigramIndex:
+    """
+    Process-local trigram index over the vehicle search keys.
+
+    Used as a fallback when the database has no pg_trgm support. The index is
+    loaded lazily on first search and kept current by the vehicle write routes.
+    """
+
+    SIMILARITY_THRESHOLD = 0.3
+
+    def __init__(self):
+        self._keys: Dict[UUID, Dict[str, str]] = {}
+        self._postings: Dict[str, Dict[str, Set[UUID]]] = {
+            field: {} for field in SEARCH_FIELDS
+        }
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Populate the index from the vehicles table on first use"""
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            result = await db.execute(
+                select(Vehicle.id, Vehicle.regNo, Vehicle.chassis, Vehicle.engine)
+            )
+            for vehicle_id, reg_no, chassis, engine in result:
+                self._add(vehicle_id, {"regNo": reg_no, "chassis": chassis, "engine": engine})
+            self._loaded = True
+
+    def _add(self, vehicle_id: UUID, values: Dict[str, Optional[str]]) -> None:
+        keys = {}
+        for field in SEARCH_FIELDS:
+            key = normalize_search_key(values.get(field))
+            if not key:
+                continue
+            keys[field] = key
+            postings = self._postings[field]
+            for gram in _trigrams(key):
+                postings.setdefault(gram, set()).add(vehicle_id)
+        self._keys[vehicle_id] = keys
+
+    def upsert(self, vehicle: Vehicle) -> None:
+        """Add or refresh a vehicle's keys"""
+        if not self._loaded:
+            return
+        self.discard(vehicle.id)
+        self._add(vehicle.id, {field: getattr(vehicle, field) for field in SEARCH_FIELDS})
+
+    def discard(self, vehicle_id: UUID) -> None:
+        """Drop a vehicle from the index"""
+        keys = self._keys.pop(vehicle_id, None)
+        if not keys:
+            return
+        for field, key in keys.items():
+            postings = self._postings[field]
+            for gram in _trigrams(key):
+                ids = postings.get(gram)
+                if ids is not None:
+                    ids.discard(vehicle_id)
+                    if not ids:
+                        del postings[gram]
+
+    def clear(self) -> None:
+        """Forget all entries; the next search reloads from the database"""
+        self._keys.clear()
+        for postings in self._postings.values():
+            postings.clear()
+        self._loaded = False
+
+    def _substring_candidates(self, field: str, term: str) -> Set[UUID]:
+        """Ids whose key may contain ``term`` anywhere, like SQL LIKE '%term%'"""
+        postings = self._postings[field]
+        if len(term) < 3:
+            # Every occurrence of a short term lies inside one of the key's padded trigrams
+            return set().union(*(ids for gram, ids in postings.items() if term in gram))
+        inner = [term[i:i + 3] for i in range(len(term) - 2)]
+        if any(gram not in postings for gram in inner):
+            return set()
+        return set.intersection(*(postings[gram] for gram in inner))
+
+    def search(self, terms: Dict[str, str], limit: int) -> List[Tuple[UUID, float]]:
+        """Return (vehicle_id, score) pairs for the best matches, highest first"""
+        scores: Dict[UUID, float] = {}
+        for field, term in terms.items():
+            term_grams = _trigrams(term)
+            postings = self._postings[field]
+            overlap: Dict[UUID, int] = {}
+            for gram in term_grams:
+                for vehicle_id in postings.get(gram, ()):
+                    overlap[vehicle_id] = overlap.get(vehicle_id, 0) + 1
+            # Substring matches can share no padded trigram with the term ("AB" in "MH12AB1234")
+            for vehicle_id in self._substring_candidates(field, term):
+                overlap.setdefault(vehicle_id, 0)
+
+            for vehicle_id in overlap:
+                key = self._keys[vehicle_id][field]
+                similarity = _similarity(_trigrams(key), term_grams)
+                if term not in key and similarity < self.SIMILARITY_THRESHOLD:
+                    continue
+                scores[vehicle_id] = scores.get(vehicle_id, 0.0) + _rank(key, term, similarity)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+
+fallback_index = InMemoryTrigramIndex()
+
+
+def _uses_trigram_indexes(db: AsyncSession) -> bool:
+    return db.bind.dialect.name == "postgresql"
+
+
+async def _search_postgres(db: AsyncSession, terms: Dict[str, str], limit: int) -> List[Vehicle]:
+    conditions = []
+    score = None
+    for field, term in terms.items():
+        key = normalized_column(getattr(Vehicle, field))
+        pattern = f"%{_escape_like(term)}%"
+        conditions.append(or_(key.like(pattern), key.op("%")(term)))
+        field_score = case(
+            (key == term, 3.0),
+            (key.like(f"{_escape_like(term)}%"), 2.0),
+            (key.like(pattern), 1.0),
+            else_=0.0,
+        ) + func.similarity(key, term)
+        score = field_score if score is None else score + field_score
+
+    query = (
+        select(Vehicle)
+        .options(*load_details(Vehicle))
+        .where(or_(*conditions))
+        .order_by(score.desc(), Vehicle.id)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def _search_fallback(db: AsyncSession, terms: Dict[str, str], limit: int) -> List[Vehicle]:
+    await fallback_index.ensure_loaded(db)
+    ranked = fallback_index.search(terms, limit)
+    if not ranked:
+        return []
+
+    ids = [vehicle_id for vehicle_id, _ in ranked]
+    result = await db.execute(select(Vehicle).options(*load_details(Vehicle)).where(Vehicle.id.in_(ids)))
+    by_id = {vehicle.id: vehicle for vehicle in result.scalars().all()}
+    return [by_id[vehicle_id] for vehicle_id in ids if vehicle_id in by_id]
+
+
+async def search_vehicles(
+    db: AsyncSession,
+    regNo: Optional[str] = None,
+    chassis: Optional[str] = None,
+    engine: Optional[str] = None,
+    limit: int = 20,
+) -> List[Vehicle]:
+    """Ranked fuzzy search over the normalized regNo/chassis/engine keys"""
+    terms = {
+        field: normalize_search_key(value)
+        for field, value in (("regNo", regNo), ("chassis", chassis), ("engine", engine))
+        if normalize_search_key(value)
+    }
+    if not terms:
+        return []
+
+    if _uses_trigram_indexes(db):
+        return await _search_postgres(db, terms, limit)
+    return await _search_fallback(db, terms, limit)
+
+
+def index_vehicle(vehicle: Vehicle) -> None:
+    """Keep the in-process fallback index in sync after a vehicle write"""
+    fallback_index.upsert(vehicle)
+
+
+def unindex_vehicle(vehicle_id: UUID) -> None:
+    """Remove a deleted vehicle from the in-process fallback index"""
+    fallback_index.discard(vehicle_id)
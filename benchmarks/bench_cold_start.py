@@ -0,0 +1,118 @@
+"""
+Cold-start benchmark: time from process spawn to the first 200 on /health
+
+Starts the server the way production does (uvicorn, or gunicorn with N
+workers), polls /health every few milliseconds and kills the server once it
+answers. Also measures how long ``import main`` takes on its own, which is
+the part every worker pays before it can accept connections.
+
+    python -m benchmarks.bench_cold_start --runs 5
+    python -m benchmarks.bench_cold_start --server gunicorn --workers 4 --out cold_start.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POLL_INTERVAL = 0.005
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(server: str, port: int, workers: int) -> List[str]:
+    if server == "gunicorn":
+        return [
+            sys.executable, "-m", "gunicorn", "main:app", "-w", str(workers),
+            "-k", "uvicorn.workers.UvicornWorker", "-b", f"127.0.0.1:{port}", "--log-level", "warning",
+        ]
+    return [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"]
+
+
+def time_to_first_200(command: List[str], port: int, env: Dict[str, str], timeout: float) -> float:
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - started < timeout:
+                if process.poll() is not None:
+                    raise SystemExit(f"Server exited with {process.returncode}:\n{process.stderr.read().decode()}")
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                        return time.perf_counter() - started
+                except httpx.TransportError:
+                    pass
+                time.sleep(POLL_INTERVAL)
+        raise SystemExit(f"No 200 from /health within {timeout}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def import_time(env: Dict[str, str]) -> float:
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    to_ms = lambda seconds: round(seconds * 1000, 1)  # noqa: E731
+    return {
+        "runs": len(samples),
+        "min_ms": to_ms(min(samples)),
+        "median_ms": to_ms(statistics.median(samples)),
+        "max_ms": to_ms(max(samples)),
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    env = dict(os.environ, SCHEMA_SETUP=args.schema_setup, DEBUG="False")
+
+    imports = [import_time(env) for _ in range(args.runs)]
+    starts = []
+    for _ in range(args.runs):
+        port = free_port()
+        starts.append(time_to_first_200(server_command(args.server, port, args.workers), port, env, args.timeout))
+
+    report = {
+        "server": args.server,
+        "workers": args.workers,
+        "schema_setup": args.schema_setup,
+        "import_main": summarize(imports),
+        "first_200": summarize(starts),
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--server", choices=["uvicorn", "gunicorn"], default="uvicorn")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn workers")
+    parser.add_argument(
+        "--schema-setup", choices=["none", "create_all"], default="none",
+        help="SCHEMA_SETUP for the server; 'create_all' reproduces the old per-worker DDL"
+    )
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--out", help="write the JSON report here")
+    main(parser.parse_args())
@@ -0,0 +1,96 @@
+"""
+Bulk vs single-row vehicle ingestion benchmark
+
+Drives the app in-process against the database in DATABASE_URL and compares
+POST /api/vehicles/ (one request per row) with POST /api/vehicles/bulk.
+
+    python -m benchmarks.bench_vehicle_bulk --rows 5000 --concurrency 16
+"""
+import argparse
+import asyncio
+import random
+import string
+import time
+import uuid
+
+import httpx
+from sqlalchemy import delete
+
+from main import app
+from app.db.session import AsyncSessionLocal, engine
+from app.models.vehicle import Vehicle
+
+
+def make_vehicle(run_id: str, n: int) -> dict:
+    return {
+        "regNo": f"BN{run_id}{n:07d}",
+        "chassis": f"CH{run_id}{n:010d}",
+        "engine": "".join(random.choices(string.ascii_uppercase + string.digits, k=12)),
+        "vehicleManufacturerName": random.choice(["MARUTI SUZUKI", "TATA MOTORS", "HYUNDAI", "MAHINDRA"]),
+        "model": random.choice(["SWIFT VXI", "NEXON XZ", "CRETA SX", "XUV500 W8"]),
+        "owner": f"OWNER {n}",
+        "ownerCount": random.randint(1, 4),
+        "regAuthority": "PUNE RTO, MAHARASHTRA",
+        "regDate": "2019-04-01T00:00:00",
+        "vehicleInsuranceUpto": "2027-03-31T00:00:00",
+        "puccUpto": "2026-12-31T00:00:00",
+        "presentAddress": "221B, SOME STREET, PUNE 411001",
+        "permanentAddress": "221B, SOME STREET, PUNE 411001",
+    }
+
+
+async def single_row(client: httpx.AsyncClient, rows: list, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def post(row):
+        async with semaphore:
+            response = await client.post("/api/vehicles/", json=row)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(post(row) for row in rows))
+    return time.perf_counter() - started
+
+
+async def bulk(client: httpx.AsyncClient, rows: list) -> float:
+    started = time.perf_counter()
+    response = await client.post("/api/vehicles/bulk", json=rows, timeout=None)
+    response.raise_for_status()
+    body = response.json()
+    if body["failed"]:
+        raise RuntimeError(f"bulk import reported {body['failed']} failed rows")
+    return time.perf_counter() - started
+
+
+async def cleanup(run_id: str) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(Vehicle).where(Vehicle.regNo.like(f"BN{run_id}%")))
+        await session.commit()
+
+
+async def main(rows: int, concurrency: int) -> None:
+    run_id = uuid.uuid4().hex[:6].upper()
+    single_rows = [make_vehicle(run_id, n) for n in range(rows)]
+    bulk_rows = [make_vehicle(run_id, n) for n in range(rows, 2 * rows)]
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            single_seconds = await single_row(client, single_rows, concurrency)
+            bulk_seconds = await bulk(client, bulk_rows)
+    finally:
+        await cleanup(run_id)
+        await engine.dispose()
+
+    print(f"rows per path:     {rows}")
+    print(f"single-row POST:   {single_seconds:8.2f}s  {rows / single_seconds:10.0f} rows/s")
+    print(f"bulk upsert:       {bulk_seconds:8.2f}s  {rows / bulk_seconds:10.0f} rows/s")
+    print(f"speedup:           {single_seconds / bulk_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.concurrency))
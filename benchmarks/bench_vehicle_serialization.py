@@ -0,0 +1,86 @@
+"""
+Vehicle list serialization benchmark
+
+Compares, for pages of wide vehicle rows, the default response_model path
+(ORM objects -> VehicleResponse validation -> JSON) against the fast path
+(Core row tuples -> orjson). Needs no database; rows are synthesized.
+
+    python -m benchmarks.bench_vehicle_serialization --rows 100 --rounds 200
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy.engine import result_tuple
+
+from app.api.responses import model_columns, rows_to_json
+from app.models.vehicle import Vehicle
+from app.schemas.vehicle import VehicleResponse
+
+
+def make_values(n: int) -> dict:
+    now = datetime(2026, 1, 1) + timedelta(minutes=n)
+    values = {}
+    for name, field in VehicleResponse.model_fields.items():
+        annotation = str(field.annotation)
+        if name == "id":
+            values[name] = uuid.uuid4()
+        elif name == "blacklistDetails":
+            values[name] = {"reason": "none", "since": None}
+        elif "datetime" in annotation:
+            values[name] = now
+        elif "Decimal" in annotation:
+            values[name] = Decimal("1197.00")
+        elif "int" in annotation:
+            values[name] = n % 7
+        elif "bool" in annotation:
+            values[name] = False
+        else:
+            values[name] = f"{name.upper()} VALUE {n}"
+    return values
+
+
+def orm_path(objects: List[Vehicle], adapter: TypeAdapter) -> bytes:
+    validated = adapter.validate_python(objects, from_attributes=True)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+
+def main(rows: int, rounds: int) -> None:
+    values = [make_values(n) for n in range(rows)]
+    objects = [Vehicle(**v) for v in values]
+
+    names = [column.name for column in model_columns(Vehicle, VehicleResponse)]
+    make_row = result_tuple(names)
+    tuples = [make_row([v[name] for name in names]) for v in values]
+
+    adapter = TypeAdapter(List[VehicleResponse])
+    assert json.loads(orm_path(objects, adapter)) == json.loads(rows_to_json(tuples))
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        orm_path(objects, adapter)
+    orm_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        rows_to_json(tuples)
+    fast_seconds = time.perf_counter() - started
+
+    total = rows * rounds
+    print(f"rows serialized:   {total}")
+    print(f"response_model:    {total / orm_seconds:12.0f} rows/s")
+    print(f"fast path:         {total / fast_seconds:12.0f} rows/s")
+    print(f"speedup:           {orm_seconds / fast_seconds:12.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    main(args.rows, args.rounds)
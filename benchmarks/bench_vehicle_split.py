@@ -0,0 +1,150 @@
+"""
+Vehicle table split benchmark: one wide table vs hot vehicles + vehicle_details
+
+Copies the seeded vehicles (with their details joined back in) into a wide
+table laid out like vehicles before the split, and copies vehicles and
+vehicle_details as they are now, so both layouts are freshly written. Then
+runs the same reads against each with EXPLAIN (ANALYZE, BUFFERS) and reports
+heap size, rows per page, shared buffers touched and execution time.
+PostgreSQL only; seed first with ``python -m benchmarks.seed``.
+
+    python -m benchmarks.bench_vehicle_split --lookups 1000 --runs 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+
+from app.db.details import detail_attributes
+from app.db.session import engine
+from app.models import Vehicle
+
+
+WIDE = "bench_vehicles_wide"
+HOT = "bench_vehicles_hot"
+DETAILS = "bench_vehicle_details"
+
+# name -> (query on the wide table, the same read on the split tables)
+QUERIES = {
+    "scan, hot filter": (
+        f'SELECT count(*) FROM {WIDE} WHERE "ownerCount" > 2 AND financed',
+        f'SELECT count(*) FROM {HOT} WHERE "ownerCount" > 2 AND financed',
+    ),
+    "scan, expiry window": (
+        f'SELECT id, "regNo", owner, "vehicleInsuranceUpto" FROM {WIDE} '
+        "WHERE \"vehicleInsuranceUpto\" BETWEEN now() AND now() + interval '30 days'",
+        f'SELECT id, "regNo", owner, "vehicleInsuranceUpto" FROM {HOT} '
+        "WHERE \"vehicleInsuranceUpto\" BETWEEN now() AND now() + interval '30 days'",
+    ),
+    "regNo lookups, hot fields": (
+        f'SELECT id, "regNo", model_id, owner, "mobileNumber" FROM {WIDE} WHERE "regNo" = ANY(:keys)',
+        f'SELECT id, "regNo", model_id, owner, "mobileNumber" FROM {HOT} WHERE "regNo" = ANY(:keys)',
+    ),
+    "regNo lookups, all fields": (
+        f'SELECT * FROM {WIDE} WHERE "regNo" = ANY(:keys)',
+        f'SELECT v.*, d.* FROM {HOT} v LEFT JOIN {DETAILS} d ON d.vehicle_id = v.id WHERE v."regNo" = ANY(:keys)',
+    ),
+}
+
+
+async def build_tables(conn) -> None:
+    cold = ", ".join(f'd."{attr.property.columns[0].name}"' for attr in detail_attributes(Vehicle).values())
+    for table in (WIDE, HOT, DETAILS):
+        await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    await conn.execute(text(
+        f"CREATE TABLE {WIDE} AS SELECT v.*, {cold} FROM vehicles v "
+        "LEFT JOIN vehicle_details d ON d.vehicle_id = v.id"
+    ))
+    await conn.execute(text(f"CREATE TABLE {HOT} AS SELECT * FROM vehicles"))
+    await conn.execute(text(f"CREATE TABLE {DETAILS} AS SELECT * FROM vehicle_details"))
+    for table in (WIDE, HOT):
+        await conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id)"))
+        await conn.execute(text(f'CREATE UNIQUE INDEX ON {table} ("regNo")'))
+    await conn.execute(text(f"ALTER TABLE {DETAILS} ADD PRIMARY KEY (vehicle_id)"))
+    for table in (WIDE, HOT, DETAILS):
+        await conn.execute(text(f"VACUUM ANALYZE {table}"))
+
+
+async def table_stats(conn, table: str) -> Dict[str, Any]:
+    size, pages, tuples = (await conn.execute(text(
+        "SELECT pg_relation_size(oid), relpages, reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"
+    ), {"table": table})).one()
+    return {
+        "heap_mb": round(size / 2 ** 20, 1),
+        "pages": pages,
+        "rows_per_page": round(tuples / pages, 1) if pages else 0,
+    }
+
+
+async def explain(conn, sql: str, params: Dict[str, Any], runs: int) -> Dict[str, Any]:
+    """Median execution time and the shared buffers the last run touched (after one warm-up)"""
+    times = []
+    for _ in range(runs + 1):
+        value = (await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params)).scalar()
+        plan = value if isinstance(value, list) else json.loads(value)
+        times.append(plan[0]["Execution Time"])
+    root = plan[0]["Plan"]
+    return {
+        "buffers": root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0),
+        "ms": round(statistics.median(times[1:]), 2),
+    }
+
+
+async def main(lookups: int, runs: int, keep: bool, out: str) -> None:
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("EXPLAIN (BUFFERS) needs PostgreSQL; point DATABASE_URL at a seeded PostgreSQL database")
+
+    report: Dict[str, Any] = {"lookups": lookups, "runs": runs, "tables": {}, "queries": {}}
+    try:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            count = (await conn.execute(text("SELECT count(*) FROM vehicles"))).scalar()
+            if not count:
+                raise SystemExit("No seeded vehicles; run python -m benchmarks.seed first")
+            await build_tables(conn)
+
+            for table in (WIDE, HOT, DETAILS):
+                report["tables"][table] = await table_stats(conn, table)
+            report["shared_buffers"] = (await conn.execute(text("SHOW shared_buffers"))).scalar()
+
+            keys: List[str] = list((await conn.execute(
+                text(f'SELECT "regNo" FROM {HOT} ORDER BY random() LIMIT :n'), {"n": lookups}
+            )).scalars())
+            for name, (wide_sql, split_sql) in QUERIES.items():
+                params = {"keys": keys} if ":keys" in wide_sql else {}
+                report["queries"][name] = {
+                    "wide": await explain(conn, wide_sql, params, runs),
+                    "split": await explain(conn, split_sql, params, runs),
+                }
+
+            if not keep:
+                for table in (WIDE, HOT, DETAILS):
+                    await conn.execute(text(f"DROP TABLE {table}"))
+    finally:
+        await engine.dispose()
+
+    print(f"{count} vehicles, shared_buffers {report['shared_buffers']}")
+    for table, stats in report["tables"].items():
+        print(f"{table:22} {stats['heap_mb']:9.1f} MB  {stats['pages']:9} pages  {stats['rows_per_page']:6.1f} rows/page")
+    for name, by_layout in report["queries"].items():
+        wide, split = by_layout["wide"], by_layout["split"]
+        print(
+            f"{name:26} buffers {wide['buffers']:8} -> {split['buffers']:8}"
+            f"   time {wide['ms']:9.2f} -> {split['ms']:9.2f} ms"
+        )
+    if out:
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=1000, help="registration numbers per lookup query")
+    parser.add_argument("--runs", type=int, default=5, help="timed runs per query, after one warm-up")
+    parser.add_argument("--keep", action="store_true", help="leave the bench_* tables in place")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    asyncio.run(main(args.lookups, args.runs, args.keep, args.out))
@@ -0,0 +1,182 @@
+"""
+Write-path benchmark: SELECT + mutate + COMMIT + refresh vs RETURNING
+
+For each resource runs creates, updates and deletes with ``--concurrency``
+sessions at once, first the way the routes used to (ORM add/setattr/delete,
+commit, refresh), then through ``app.db.repository.Repository``, against the
+database in DATABASE_URL. Reports statements per write and p50/p95 latency.
+
+    python -m benchmarks.bench_write_roundtrips --writes 500 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import delete, event, select
+
+from app.db.dictionary import vehicle_values
+from app.db.repository import Repository
+from app.db.session import AsyncSessionLocal, engine
+from app.models import Invoice, Order, Payment, User, Vehicle
+
+
+def percentile(samples: List[float], q: float) -> float:
+    return statistics.quantiles(samples, n=100)[q - 1] if len(samples) > 1 else samples[0]
+
+
+class StatementCounter:
+    """Counts statements sent to the database, COMMITs included"""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._statement)
+        event.listen(engine.sync_engine, "commit", self._statement)
+
+    def _statement(self, *args, **kwargs) -> None:
+        self.count += 1
+
+
+# Legacy paths, as the routes were written before the repository layer
+
+async def legacy_create(db, model, data):
+    instance = model(**data)
+    db.add(instance)
+    await db.commit()
+    await db.refresh(instance)
+    return instance
+
+
+async def legacy_update(db, model, id, data):
+    instance = (await db.execute(select(model).where(model.id == id))).scalar_one_or_none()
+    for field, value in data.items():
+        setattr(instance, field, value)
+    await db.commit()
+    await db.refresh(instance)
+    return instance
+
+
+async def legacy_delete(db, model, id):
+    instance = (await db.execute(select(model).where(model.id == id))).scalar_one_or_none()
+    await db.delete(instance)
+    await db.commit()
+
+
+async def returning_create(db, model, data):
+    instance = await Repository(model).create(db, data)
+    await db.commit()
+    return instance
+
+
+async def returning_update(db, model, id, data):
+    instance = await Repository(model).update(db, id, data)
+    await db.commit()
+    return instance
+
+
+async def returning_delete(db, model, id):
+    await Repository(model).delete(db, id)
+    await db.commit()
+
+
+async def timed(calls: List[Callable], concurrency: int, counter: StatementCounter) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    results = []
+
+    async def run(call):
+        async with semaphore:
+            async with AsyncSessionLocal() as db:
+                started = time.perf_counter()
+                results.append(await call(db))
+                latencies.append(time.perf_counter() - started)
+
+    statements = counter.count
+    await asyncio.gather(*(run(call) for call in calls))
+    return {
+        "statements_per_write": round((counter.count - statements) / len(calls), 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "results": results,
+    }
+
+
+async def main(writes: int, concurrency: int, out: str) -> None:
+    counter = StatementCounter()
+    run_id = uuid.uuid4().hex[:8]
+
+    async with AsyncSessionLocal() as db:
+        owner = await returning_create(db, User, {"email": f"bench-{run_id}@example.com", "role": "client"})
+        order = await returning_create(
+            db, Order, {"user_id": owner.id, "order_type": "bench", "status": "new", "total_amount": Decimal("10")}
+        )
+
+    resources = {
+        "users": (User, lambda n: {"email": f"bench-{run_id}-{n}@example.com", "role": "client"},
+                  {"role": "dealer"}),
+        "vehicles": (Vehicle, lambda n: {"regNo": f"BW{run_id}{n:06d}", "model": "SWIFT VXI"},
+                     {"model": "SWIFT ZXI"}),
+        "orders": (Order, lambda n: {"user_id": owner.id, "order_type": "bench", "status": "new",
+                                     "total_amount": Decimal("10")}, {"status": "paid"}),
+        "payments": (Payment, lambda n: {"order_id": order.id, "amount": Decimal("10"), "payment_method": "card",
+                                         "status": "pending"}, {"status": "success"}),
+        "invoices": (Invoice, lambda n: {"order_id": order.id, "total_amount": Decimal("10"), "status": "open"},
+                     {"status": "paid"}),
+    }
+    paths = {
+        "legacy": (legacy_create, legacy_update, legacy_delete),
+        "returning": (returning_create, returning_update, returning_delete),
+    }
+
+    report: Dict[str, Any] = {"writes": writes, "concurrency": concurrency, "resources": {}}
+    try:
+        # Vehicle writes only bind dictionary values that already have ids
+        _, make_vehicle, vehicle_changes = resources["vehicles"]
+        await vehicle_values.ensure_rows(Vehicle, [make_vehicle(0), vehicle_changes])
+        for name, (model, make, changes) in resources.items():
+            report["resources"][name] = {}
+            for path, (create, update, remove) in paths.items():
+                created = await timed(
+                    [lambda db, n=n: create(db, model, make(n)) for n in range(writes)], concurrency, counter
+                )
+                ids = [instance.id for instance in created.pop("results")]
+                updated = await timed(
+                    [lambda db, id=id: update(db, model, id, changes) for id in ids], concurrency, counter
+                )
+                deleted = await timed(
+                    [lambda db, id=id: remove(db, model, id) for id in ids], concurrency, counter
+                )
+                updated.pop("results")
+                deleted.pop("results")
+                report["resources"][name][path] = {"create": created, "update": updated, "delete": deleted}
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Order).where(Order.id == order.id))
+            await db.execute(delete(User).where(User.id == owner.id))
+            await db.commit()
+        await engine.dispose()
+
+    for name, by_path in report["resources"].items():
+        for op in ("create", "update", "delete"):
+            legacy, returning = by_path["legacy"][op], by_path["returning"][op]
+            print(
+                f"{name:9} {op:7} statements {legacy['statements_per_write']:5} -> {returning['statements_per_write']:5}"
+                f"   p50 {legacy['p50_ms']:7.2f} -> {returning['p50_ms']:7.2f} ms"
+                f"   p95 {legacy['p95_ms']:7.2f} -> {returning['p95_ms']:7.2f} ms"
+            )
+    if out:
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writes", type=int, default=500, help="writes per resource, operation and path")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+    asyncio.run(main(args.writes, args.concurrency, args.out))
@@ -0,0 +1,301 @@
+"""
+Load test every API router in-process
+
+Drives the app through an ASGI client (no network hop) against the database
+in DATABASE_URL, runs each scenario at the given concurrency, and writes
+p50/p95/p99 latency and throughput per scenario to a JSON report. With
+--baseline, scenarios that got slower than the tolerance are reported and the
+exit status is non-zero so CI can catch regressions.
+
+    python -m benchmarks.seed --vehicles 1000000 --orders 5000000
+    python -m benchmarks.load --requests 2000 --concurrency 32 --out bench.json
+    python -m benchmarks.load --baseline bench.json --tolerance 0.15
+"""
+import argparse
+import asyncio
+import json
+import os
+import pkgutil
+import platform
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+from sqlalchemy import select
+
+from main import app
+from app.api import routes
+from app.api.pagination import SortOrder, encode_cursor
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.models import User, Vehicle, Order, Payment, Invoice, Job, ServiceHistory
+
+
+SAMPLE_SIZE = 500
+
+# Router modules under app.api.routes; each needs at least one scenario
+ROUTERS = sorted(module.name for module in pkgutil.iter_modules(routes.__path__))
+
+Request = Callable[[httpx.AsyncClient, random.Random], Awaitable[httpx.Response]]
+
+
+class Samples:
+    """Existing keys the scenarios pick from"""
+
+    def __init__(self):
+        self.emails: List[str] = []
+        self.reg_nos: List[str] = []
+        self.vehicle_ids: List[str] = []
+        self.user_ids: List[str] = []
+        self.order_ids: List[str] = []
+        self.payment_ids: List[str] = []
+        self.invoice_ids: List[str] = []
+        # The seed creates no documents or jobs; scenarios fall back to ids that 404
+        self.document_ids: List[str] = []
+        self.job_ids: List[str] = []
+
+    async def load(self) -> None:
+        async with AsyncSessionLocal() as session:
+            async def column(col) -> List[str]:
+                result = await session.execute(select(col).where(col.isnot(None)).limit(SAMPLE_SIZE))
+                return [str(value) for value in result.scalars().all()]
+
+            self.emails = await column(User.email)
+            self.user_ids = await column(User.id)
+            self.reg_nos = await column(Vehicle.regNo)
+            self.vehicle_ids = await column(Vehicle.id)
+            self.order_ids = await column(Order.id)
+            self.payment_ids = await column(Payment.id)
+            self.invoice_ids = await column(Invoice.id)
+            self.document_ids = await column(ServiceHistory.id)
+            self.job_ids = await column(Job.id)
+
+        optional = ("document_ids", "job_ids")
+        empty = [name for name, values in vars(self).items() if not values and name not in optional]
+        if empty:
+            raise SystemExit(f"No seeded data for: {', '.join(empty)}; run python -m benchmarks.seed first")
+
+
+def build_scenarios(samples: Samples, include_writes: bool) -> Dict[str, Dict[str, Request]]:
+    """Scenarios grouped by router module; every router must have at least one"""
+    pick = lambda rng, values: values[rng.randrange(len(values))]  # noqa: E731
+    pick_or_new = lambda rng, values: (  # noqa: E731
+        pick(rng, values) if values else str(uuid.UUID(int=rng.getrandbits(128)))
+    )
+    hour_ago = lambda resource: encode_cursor(  # noqa: E731
+        resource, SortOrder.asc, datetime.utcnow() - timedelta(hours=1), uuid.UUID(int=0)
+    )
+
+    scenarios: Dict[str, Dict[str, Request]] = {
+        "users": {
+            "users.list": lambda c, rng: c.get("/api/users/", params={"limit": 100}),
+            "users.get": lambda c, rng: c.get(f"/api/users/{pick(rng, samples.emails)}"),
+        },
+        "vehicles": {
+            "vehicles.list": lambda c, rng: c.get("/api/vehicles/", params={"limit": 100}),
+            "vehicles.list_fast": lambda c, rng: c.get("/api/vehicles/", params={"limit": 100, "fast": "true"}),
+            "vehicles.list_fields": lambda c, rng: c.get(
+                "/api/vehicles/", params={"limit": 100, "fields": "regNo,model,owner,vehicleInsuranceUpto,puccUpto"}
+            ),
+            "vehicles.get": lambda c, rng: c.get(f"/api/vehicles/{pick(rng, samples.reg_nos)}"),
+            "vehicles.lookup": lambda c, rng: c.post(
+                "/api/vehicles/lookup", json={"keys": rng.sample(samples.reg_nos, min(200, len(samples.reg_nos)))}
+            ),
+            "vehicles.search": lambda c, rng: c.get(
+                "/api/vehicles/search", params={"regNo": pick(rng, samples.reg_nos)[:6]}
+            ),
+            "vehicles.expiring": lambda c, rng: c.get(
+                "/api/vehicles/expiring", params={"kind": "insurance", "within_days": 30}
+            ),
+        },
+        "orders": {
+            "orders.list": lambda c, rng: c.get("/api/orders/", params={"limit": 100}),
+            "orders.get": lambda c, rng: c.get(f"/api/orders/{pick(rng, samples.order_ids)}"),
+            "orders.detail": lambda c, rng: c.get(f"/api/orders/{pick(rng, samples.order_ids)}/detail"),
+            "orders.by_user": lambda c, rng: c.get("/api/orders/", params={"user_id": pick(rng, samples.user_ids)}),
+        },
+        "payments": {
+            "payments.list": lambda c, rng: c.get("/api/payments/", params={"limit": 100}),
+            "payments.get": lambda c, rng: c.get(f"/api/payments/{pick(rng, samples.payment_ids)}"),
+            "payments.by_order": lambda c, rng: c.get(
+                "/api/payments/", params={"order_id": pick(rng, samples.order_ids)}
+            ),
+        },
+        "invoices": {
+            "invoices.list": lambda c, rng: c.get("/api/invoices/", params={"limit": 100}),
+            "invoices.get": lambda c, rng: c.get(f"/api/invoices/{pick(rng, samples.invoice_ids)}"),
+        },
+        "reports": {
+            "reports.revenue": lambda c, rng: c.get("/api/reports/revenue", params={"period": "month"}),
+            "reports.revenue_live": lambda c, rng: c.get("/api/reports/revenue", params={"live": "true"}),
+            "reports.outstanding": lambda c, rng: c.get("/api/reports/invoices/outstanding"),
+        },
+        "service_history": {
+            "service_history.list": lambda c, rng: c.get("/api/service-history/", params={"limit": 100}),
+            "service_history.get": lambda c, rng: c.get(
+                f"/api/service-history/{pick_or_new(rng, samples.document_ids)}"
+            ),
+        },
+        "jobs": {
+            "jobs.get": lambda c, rng: c.get(f"/api/jobs/{pick_or_new(rng, samples.job_ids)}"),
+        },
+        "changes": {
+            "changes.initial": lambda c, rng: c.get("/api/changes", params={"resource": "orders"}),
+            "changes.tail": lambda c, rng: c.get(
+                "/api/changes", params={"resource": "orders", "since": hour_ago("orders")}
+            ),
+        },
+        "events": {
+            # The in-process transport buffers whole responses, so main() ends each stream after its snapshot
+            "events.connect": lambda c, rng: c.get(
+                "/api/events",
+                params={"orders": pick(rng, samples.order_ids), "payments": pick(rng, samples.payment_ids)},
+            ),
+        },
+    }
+
+    if include_writes:
+        scenarios["orders"]["orders.update"] = lambda c, rng: c.put(
+            f"/api/orders/{pick(rng, samples.order_ids)}", json={"status": rng.choice(["pending", "paid"])}
+        )
+        scenarios["payments"]["payments.create"] = lambda c, rng: c.post(
+            "/api/payments/",
+            json={"order_id": pick(rng, samples.order_ids), "amount": "99.00",
+                  "payment_method": "upi", "status": "success"},
+        )
+
+    missing = [name for name in ROUTERS if not scenarios.get(name)]
+    if missing:
+        raise SystemExit(f"No load scenario for routers: {', '.join(missing)}")
+    return scenarios
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, request: Request, total: int, concurrency: int, seed: int
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker(worker_id: int) -> None:
+        nonlocal remaining, errors
+        rng = random.Random(seed + worker_id)
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await request(client, rng)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400 and response.status_code != 404:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    to_ms = lambda seconds: round(seconds * 1000, 3)  # noqa: E731
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": to_ms(statistics.fmean(latencies)) if latencies else 0.0,
+        "p50_ms": to_ms(percentile(latencies, 50)),
+        "p95_ms": to_ms(percentile(latencies, 95)),
+        "p99_ms": to_ms(percentile(latencies, 99)),
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Describe scenarios whose p95 or throughput regressed beyond ``tolerance``"""
+    regressions = []
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s"
+            )
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    samples = Samples()
+    await samples.load()
+    scenarios = build_scenarios(samples, args.include_writes)
+    # An event stream otherwise stays open for minutes; measure connect plus snapshot
+    settings.EVENTS_MAX_STREAM_SECONDS = 0
+
+    selected = {
+        name: request
+        for group in scenarios.values()
+        for name, request in group.items()
+        if not args.only or any(name.startswith(prefix) for prefix in args.only)
+    }
+
+    report = {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat(),
+            "database": engine.url.render_as_string(hide_password=True),
+            "python": platform.python_version(),
+            "requests_per_scenario": args.requests,
+            "concurrency": args.concurrency,
+            "git_commit": os.getenv("GIT_COMMIT"),
+        },
+        "scenarios": {},
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name, request in selected.items():
+                await run_scenario(client, request, args.warmup, args.concurrency, args.seed)
+                result = await run_scenario(client, request, args.requests, args.concurrency, args.seed)
+                report["scenarios"][name] = result
+                print(
+                    f"{name:<24} {result['throughput_rps']:>9.1f} req/s  "
+                    f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+                    f"p99 {result['p99_ms']:>8.2f}ms  errors {result['errors']}"
+                )
+    finally:
+        await engine.dispose()
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50, help="unrecorded requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", nargs="*", help="scenario name prefixes to run, e.g. vehicles orders.get")
+    parser.add_argument("--include-writes", action="store_true", help="also run update/create scenarios")
+    parser.add_argument("--out", default="bench_output.json")
+    parser.add_argument("--baseline", help="previous report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown")
+    sys.exit(asyncio.run(main(parser.parse_args())))
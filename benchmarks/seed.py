@@ -0,0 +1,220 @@
+"""
+Seed the database in DATABASE_URL with realistic benchmark data
+
+Works against PostgreSQL (asyncpg) or SQLite (aiosqlite). Ids are derived
+from the row number so children can reference parents without keeping
+millions of ids in memory, and runs are reproducible for a given --seed.
+
+    python -m benchmarks.seed --users 100000 --vehicles 1000000 --orders 5000000
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List
+
+from sqlalchemy import insert
+
+from app.db.base import Base
+from app.db.details import details_of, split_details
+from app.db.dictionary import vehicle_values
+from app.db.session import engine
+from app.models import User, Vehicle, Order, Payment, Invoice
+
+
+BATCH_SIZE = 5000
+
+# High bits tag the table so ids from different tables never collide
+_ID_PREFIX = {"users": 1, "vehicles": 2, "orders": 3, "payments": 4, "invoices": 5}
+
+MANUFACTURERS = {
+    "MARUTI SUZUKI INDIA LTD": ["SWIFT VXI", "BALENO ZETA", "DZIRE LXI", "ERTIGA VXI"],
+    "TATA MOTORS LTD": ["NEXON XZ", "TIAGO XT", "HARRIER XZA", "ACE GOLD"],
+    "HYUNDAI MOTOR INDIA LTD": ["CRETA SX", "I20 ASTA", "VENUE S", "VERNA SX"],
+    "MAHINDRA & MAHINDRA LTD": ["XUV500 W8", "SCORPIO S11", "BOLERO PIK-UP", "THAR LX"],
+    "HONDA MOTORCYCLE & SCOOTER": ["ACTIVA 6G", "SHINE SP", "UNICORN 160"],
+}
+RTO = ["MH12", "MH14", "KA01", "KA05", "DL3C", "TN09", "GJ01", "UP16"]
+INSURERS = ["ICICI LOMBARD", "BAJAJ ALLIANZ", "HDFC ERGO", "NEW INDIA ASSURANCE", "TATA AIG"]
+ORDER_TYPES = ["rc_check", "challan", "insurance_renewal", "service_history"]
+ORDER_STATUSES = ["pending", "paid", "completed", "cancelled"]
+PAYMENT_METHODS = ["upi", "card", "netbanking", "wallet"]
+
+
+def seeded_id(table: str, n: int) -> uuid.UUID:
+    return uuid.UUID(int=(_ID_PREFIX[table] << 120) | n)
+
+
+def reg_no(n: int) -> str:
+    """Unique registration number for the first 6.76M rows"""
+    series = "".join(chr(65 + (n // 10000 // 26 ** i) % 26) for i in range(2))
+    return f"{RTO[n % len(RTO)]}{series}{n % 10000:04d}"
+
+
+def user_row(rng: random.Random, n: int, now: datetime) -> dict:
+    return {
+        "id": seeded_id("users", n),
+        "email": f"user{n}@bench.example.com",
+        "role": rng.choice(["client", "dealer", "owner", "PartnerApp"]),
+        "is_active": rng.random() > 0.05,
+        "created_at": now - timedelta(minutes=n),
+    }
+
+
+def vehicle_row(rng: random.Random, n: int, now: datetime) -> dict:
+    manufacturer = rng.choice(list(MANUFACTURERS))
+    registered = now - timedelta(days=rng.randint(30, 5000))
+    address = f"{rng.randint(1, 999)}, SECTOR {rng.randint(1, 60)}, SOME NAGAR, PUNE {411000 + n % 100}"
+    commercial = rng.random() < 0.1
+    permit_from = registered + timedelta(days=rng.randint(0, 30))
+    return {
+        "id": seeded_id("vehicles", n),
+        "regNo": reg_no(n),
+        "chassis": f"MA3{n:014d}",
+        "engine": f"K12M{n:09d}",
+        "vehicleManufacturerName": manufacturer,
+        "model": rng.choice(MANUFACTURERS[manufacturer]),
+        "vehicleColour": rng.choice(["WHITE", "SILVER", "RED", "GREY", "BLUE"]),
+        "type": rng.choice(["PETROL", "DIESEL", "CNG", "ELECTRIC"]),
+        "normsType": rng.choice(["BHARAT STAGE IV", "BHARAT STAGE VI"]),
+        "bodyType": rng.choice(["SALOON", "HATCHBACK", "SUV", "SOLO"]),
+        "ownerCount": rng.randint(1, 4),
+        "owner": f"OWNER NAME {n}",
+        "ownerFatherName": f"FATHER NAME {n}",
+        "mobileNumber": f"98{n % 100000000:08d}",
+        "status": "ACTIVE",
+        "statusAsOn": now,
+        "regAuthority": f"{RTO[n % len(RTO)]} RTO",
+        "regDate": registered,
+        "vehicleManufacturingMonthYear": registered.strftime("%m/%Y"),
+        "rcExpiryDate": registered + timedelta(days=15 * 365),
+        "vehicleTaxUpto": "LTT",
+        "vehicleInsuranceCompanyName": rng.choice(INSURERS),
+        "vehicleInsuranceUpto": now + timedelta(days=rng.randint(-60, 365)),
+        "vehicleInsurancePolicyNumber": f"POL{n:012d}",
+        "rcFinancer": rng.choice([None, "HDFC BANK LTD", "ICICI BANK LTD"]),
+        "presentAddress": address,
+        "permanentAddress": address,
+        "vehicleCubicCapacity": Decimal(rng.choice(["998", "1197", "1497", "2179"])),
+        "grossVehicleWeight": rng.randint(1200, 2500),
+        "unladenWeight": rng.randint(800, 1800),
+        "vehicleCategory": rng.choice(["LMV", "2WN", "LGV"]),
+        "vehicleCylindersNo": rng.choice([3, 4]),
+        "vehicleSeatCapacity": rng.choice([2, 5, 7]),
+        "vehicleSleeperCapacity": 0,
+        "vehicleStandingCapacity": 0,
+        "wheelbase": rng.randint(2300, 2800),
+        "puccNumber": f"PUC{n:010d}",
+        "puccUpto": now + timedelta(days=rng.randint(-30, 180)),
+        "blacklistStatus": False,
+        "permitIssueDate": permit_from if commercial else None,
+        "permitNumber": f"{RTO[n % len(RTO)]}/CP/{n:08d}" if commercial else None,
+        "permitType": "CONTRACT CARRIAGE PERMIT" if commercial else None,
+        "permitValidFrom": permit_from if commercial else None,
+        "permitValidUpto": permit_from + timedelta(days=5 * 365) if commercial else None,
+        "isCommercial": commercial,
+        "financed": rng.random() < 0.3,
+        "class_": "LMV",
+    }
+
+
+def order_row(rng: random.Random, n: int, now: datetime, users: int, vehicles: int) -> dict:
+    return {
+        "id": seeded_id("orders", n),
+        "user_id": seeded_id("users", rng.randrange(users)),
+        "vehicle_id": seeded_id("vehicles", rng.randrange(vehicles)) if vehicles else None,
+        "order_date": now - timedelta(seconds=n * 7),
+        "order_type": rng.choice(ORDER_TYPES),
+        "status": rng.choice(ORDER_STATUSES),
+        "total_amount": Decimal(rng.randint(49, 2999)),
+    }
+
+
+def payment_row(rng: random.Random, n: int, now: datetime, orders: int) -> dict:
+    order = n % orders
+    return {
+        "id": seeded_id("payments", n),
+        "order_id": seeded_id("orders", order),
+        "payment_date": now - timedelta(seconds=order * 7 - 30),
+        "amount": Decimal(rng.randint(49, 2999)),
+        "payment_method": rng.choice(PAYMENT_METHODS),
+        "status": rng.choice(["success", "success", "success", "failed"]),
+    }
+
+
+def invoice_row(rng: random.Random, n: int, now: datetime, orders: int) -> dict:
+    order = n % orders
+    issued = now - timedelta(seconds=order * 7 - 60)
+    return {
+        "id": seeded_id("invoices", n),
+        "order_id": seeded_id("orders", order),
+        "invoice_date": issued,
+        "total_amount": Decimal(rng.randint(49, 2999)),
+        "status": rng.choice(["paid", "due", "overdue"]),
+        "due_date": issued + timedelta(days=15),
+    }
+
+
+def _column_names(model) -> Dict[str, str]:
+    return {attr.key: attr.columns[0].name for attr in model.__mapper__.column_attrs}
+
+
+async def seed_table(model, count: int, make_row: Callable[[int], dict]) -> None:
+    names = _column_names(model)
+    details = details_of(model)
+    started = time.perf_counter()
+    for start in range(0, count, BATCH_SIZE):
+        batch: List[dict] = []
+        detail_batch: List[dict] = []
+        for n in range(start, min(start + BATCH_SIZE, count)):
+            hot, cold = split_details(model, make_row(n))
+            batch.append({names[key]: value for key, value in hot.items()})
+            if any(value is not None for value in cold.values()):
+                detail_batch.append({"vehicle_id": hot["id"], **cold})
+        await vehicle_values.ensure_rows(model, batch)
+        async with engine.begin() as conn:
+            await conn.execute(insert(model.__table__), batch)
+            if detail_batch:
+                await conn.execute(insert(details.mapper.local_table), detail_batch)
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0
+    print(f"{model.__tablename__:<10} {count:>10} rows  {elapsed:8.1f}s  {rate:10.0f} rows/s")
+
+
+async def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    now = datetime.utcnow().replace(microsecond=0)
+
+    if args.create_schema:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        await seed_table(User, args.users, lambda n: user_row(rng, n, now))
+        await seed_table(Vehicle, args.vehicles, lambda n: vehicle_row(rng, n, now))
+        await seed_table(Order, args.orders, lambda n: order_row(rng, n, now, args.users, args.vehicles))
+        payments = args.orders * args.payments_per_order
+        await seed_table(Payment, payments, lambda n: payment_row(rng, n, now, args.orders))
+        await seed_table(Invoice, args.orders, lambda n: invoice_row(rng, n, now, args.orders))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--vehicles", type=int, default=10000)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--payments-per-order", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--create-schema", action="store_true",
+        help="create missing tables with metadata.create_all (SQLite runs; use Alembic for PostgreSQL)"
+    )
+    main_args = parser.parse_args()
+    if main_args.users < 1 or main_args.orders < 1:
+        parser.error("--users and --orders must be at least 1")
+    asyncio.run(main(main_args))
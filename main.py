@@ -1,30 +1,75 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
+import asyncio
 
 from app.core.config import settings
+from app.core.cache import cache
+from app.core.events import broker, start_event_relay
+from app.core.metrics import MetricsMiddleware, register_gauges, render_metrics
+from app.db.pool import pool_stats, warm_pool
+from app.db.replicas import ReadYourWritesMiddleware, replicas, start_health_checks
 from app.db.session import engine
 from app.db.base import Base
-from app.api.routes import users, vehicles, orders, payments, invoices
+from app.db.dictionary import vehicle_values
+from app.api.routes import users, vehicles, orders, payments, invoices, reports, service_history, jobs, changes, events
+from app.services.vehicle_expiry import start_expiry_scheduler
+from app.services.reports import start_rollup_scheduler
+from app.services.idempotency import start_purge_scheduler
+from app.services.jobs import job_stats, start_job_workers
+from app.services.changes import start_tombstone_purge
+
+
+async def warm_connections():
+    """Pre-open pooled connections on the primary and every replica, and load the vehicle value dictionary"""
+    await asyncio.gather(
+        warm_pool(engine, settings.DB_POOL_WARMUP),
+        *(warm_pool(replica.engine, settings.DB_POOL_WARMUP) for replica in replicas.replicas),
+        vehicle_values.warm(),
+    )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
-    try:
-        # Create tables on startup with timeout handling
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        print("Database tables created successfully")
-    except Exception as e:
-        print(f"Warning: Database setup failed: {e}")
-        # Continue without failing - tables might already exist
+    if settings.SCHEMA_SETUP == "create_all":
+        try:
+            # Local development convenience; production runs migrations in start.py
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            print("Database tables created successfully")
+        except Exception as e:
+            print(f"Warning: Database setup failed: {e}")
+            # Continue without failing - tables might already exist
+    
+    # Open pool connections concurrently in the background: the first requests
+    # skip the connect and /health answers without waiting for the database
+    warmup_task = asyncio.create_task(warm_connections())
+    expiry_task = start_expiry_scheduler()
+    replica_health_task = start_health_checks()
+    rollup_task = start_rollup_scheduler()
+    idempotency_purge_task = start_purge_scheduler()
+    job_workers_task = start_job_workers()
+    tombstone_purge_task = start_tombstone_purge()
+    event_relay_task = start_event_relay()
     
     yield
     
+    # Job workers go first: in-flight jobs get JOB_SHUTDOWN_GRACE to finish
+    for task in (job_workers_task, warmup_task, expiry_task, replica_health_task, rollup_task,
+                 idempotency_purge_task, tombstone_purge_task, event_relay_task):
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    
     # Cleanup on shutdown
     try:
         await engine.dispose()
+        await replicas.dispose()
         print("Database connections closed")
     except Exception as e:
         print(f"Warning: Database cleanup failed: {e}")
@@ -49,6 +94,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Send a client's reads to the primary right after it writes
+if replicas.enabled:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Per-route latency, DB time and Server-Timing headers (outermost middleware)
+app.add_middleware(MetricsMiddleware)
+register_gauges(lambda: {f"cache_{name}": value for name, value in cache.stats().items()
+                         if isinstance(value, (int, float))})
+register_gauges(lambda: {f"db_pool_{name}": value for name, value in pool_stats(engine).items()
+                         if isinstance(value, (int, float))})
+register_gauges(lambda: {f"jobs_{name}": value for name, value in job_stats().items()})
+register_gauges(lambda: {f"events_{name}": value for name, value in broker.stats().items()
+                         if isinstance(value, (int, float))})
+
 
 # Root endpoint
 @app.get("/")
@@ -66,12 +125,41 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Cache hit/miss counters for this worker"""
+    return cache.stats()
+
+
+@app.get("/db/pool/stats")
+async def db_pool_stats():
+    """Connection pool usage and checkout wait for this worker"""
+    return pool_stats(engine)
+
+
+@app.get("/db/replicas")
+async def db_replicas():
+    """Health and replication lag of each read replica"""
+    return replicas.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition for this worker"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # Include routers
 app.include_router(users.router, prefix="/api")
 app.include_router(vehicles.router, prefix="/api")
 app.include_router(orders.router, prefix="/api")
 app.include_router(payments.router, prefix="/api")
 app.include_router(invoices.router, prefix="/api")
+app.include_router(reports.router, prefix="/api")
+app.include_router(service_history.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
+app.include_router(changes.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
 
 
 if __name__ == "__main__":
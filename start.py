@@ -2,9 +2,13 @@
 """
 Startup script for production deployment
 Handles graceful startup with better error handling
+
+Runs the Alembic migrations once, here, before gunicorn forks its workers;
+the workers are started with SCHEMA_SETUP=none so none of them issues DDL.
 """
 import os
 import sys
+import time
 import asyncio
 import logging
 from typing import Optional
@@ -16,19 +20,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-async def check_database_connection():
-    """Check if database is reachable before starting workers"""
+async def check_database_connection() -> Optional[str]:
+    """Try one connection; returns the error message, or None if the database is reachable"""
     try:
         from app.db.session import engine
         from sqlalchemy import text
-        
-        async with engine.begin() as conn:
+    
+        async with engine.connect() as conn:
             await conn.execute(text("SELECT 1"))
-        logger.info("Database connection successful")
-        return True
+        return None
     except Exception as e:
-        logger.error(f"Database connection failed: {e}")
-        return False
+        return str(e) or type(e).__name__
+
+async def wait_for_database(timeout: float) -> bool:
+    """Poll the database with short, growing back-off until it answers or ``timeout`` passes"""
+    from app.db.session import engine
+    
+    deadline = time.monotonic() + timeout
+    delay = 0.1
+    try:
+        while True:
+            error = await check_database_connection()
+            if error is None:
+                logger.info("Database connection successful")
+                return True
+            if time.monotonic() + delay > deadline:
+                logger.error(f"Database connection failed: {error}")
+                return False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 2.0)
+    finally:
+        # Don't hand pooled connections across the exec
+        await engine.dispose()
+
+def run_migrations() -> None:
+    """Bring the schema to the latest Alembic revision"""
+    from alembic import command
+    from alembic.config import Config
+    
+    started = time.perf_counter()
+    command.upgrade(Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")), "head")
+    logger.info(f"Migrations applied in {time.perf_counter() - started:.2f}s")
 
 def get_worker_count() -> int:
     """Determine optimal worker count based on environment"""
@@ -67,19 +99,27 @@ def get_gunicorn_config() -> list:
 
 async def main():
     """Main startup function"""
+    from app.core.config import settings
+    
     logger.info("Starting FastAPI application...")
     
-    # Check database connection with retries
-    max_retries = 3
-    for attempt in range(max_retries):
-        if await check_database_connection():
-            break
-        if attempt < max_retries - 1:
-            logger.warning(f"Database check attempt {attempt + 1} failed, retrying in 5 seconds...")
-            await asyncio.sleep(5)
-        else:
-            logger.error("Database connection failed after all retries")
-            # Continue anyway - the app might still work or DB might come up later
+    database_ready = await wait_for_database(settings.DB_STARTUP_TIMEOUT)
+    if not database_ready:
+        # Continue anyway - the app might still work or DB might come up later
+        logger.warning("Starting without a database connection")
+    
+    if settings.RUN_MIGRATIONS:
+        if not database_ready:
+            logger.error("Cannot run migrations without a database connection")
+            sys.exit(1)
+        try:
+            run_migrations()
+        except Exception as e:
+            logger.error(f"Migrations failed: {e}")
+            sys.exit(1)
+    
+    # Schema is managed here (or externally); workers must not run DDL
+    os.environ["SCHEMA_SETUP"] = "none"
     
     # Build and execute Gunicorn command
     config = get_gunicorn_config()
@@ -92,4 +132,4 @@ async def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
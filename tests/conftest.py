@@ -0,0 +1,73 @@
+"""
+Test fixtures
+
+The suite runs on SQLite files through aiosqlite, so no database server is
+needed. The environment is pointed at a temporary directory before the app
+is imported; the schema is created once and every test starts from empty
+tables and an empty cache.
+"""
+import asyncio
+import os
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix="app-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite+aiosqlite:///{TEST_DIR}/primary.db",
+    "DATABASE_REPLICA_URLS": "",
+    "DEBUG": "False",
+    "SCHEMA_SETUP": "none",
+    "CACHE_BACKEND": "memory",
+    "WORKERS": "1",
+    "JOB_SPOOL_DIR": os.path.join(TEST_DIR, "spool"),
+    "SERVICE_HISTORY_DIR": os.path.join(TEST_DIR, "service_history"),
+})
+
+import httpx
+import pytest
+from sqlalchemy.dialects.sqlite.base import SQLiteTypeCompiler
+
+# SQLite has no UUID type; store the 32-character hex form SQLAlchemy binds,
+# with text affinity so ids compare (and sort) as strings
+SQLiteTypeCompiler.visit_UUID = lambda self, type_, **kw: "CHAR(32)"
+
+import main
+from app.core.cache import cache
+from app.db.base import Base
+from app.db.session import engine
+
+# Values keep their ids for the whole run, like the in-process map of them
+KEPT_TABLES = {"vehicle_attribute_values"}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+    asyncio.run(create())
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+async def clean_database(anyio_backend):
+    async with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            if table.name not in KEPT_TABLES:
+                await conn.execute(table.delete())
+    cache._entries.clear()
+    yield
+    # Each test runs on its own event loop; pooled connections must not outlive it
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
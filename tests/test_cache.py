@@ -0,0 +1,178 @@
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import MemoryCache, NullCache, RedisCache, build_cache, cache, vehicle_cache_key
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeRedis:
+    """The slice of the redis.asyncio client RedisCache uses, kept in a dict"""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value, ex))
+
+    async def execute(self):
+        for key, value, ex in self.commands:
+            await self.client.set(key, value, ex=ex)
+
+
+class BrokenRedis(FakeRedis):
+    async def get(self, key):
+        raise ConnectionError("redis is down")
+
+    async def set(self, key, value, ex=None):
+        raise ConnectionError("redis is down")
+
+
+# Backends
+
+
+async def test_memory_cache_get_set_delete_and_many():
+    memory = MemoryCache()
+
+    await memory.set("a", b"1", 60)
+    await memory.set_many({"b": b"2", "c": b"3"}, 60)
+    await memory.delete("b", None)
+
+    assert await memory.get("a") == b"1"
+    assert await memory.get("b") is None
+    assert await memory.get_many(["a", "b", "c"]) == {"a": b"1", "c": b"3"}
+    assert memory.stats()["hits"] == 3
+    assert memory.stats()["misses"] == 2
+    assert memory.stats()["invalidations"] == 1
+
+
+async def test_memory_cache_expires_and_evicts_least_recent():
+    memory = MemoryCache(max_entries=2)
+
+    await memory.set("expired", b"x", 0)
+    assert await memory.get("expired") is None
+
+    await memory.set("a", b"1", 60)
+    await memory.set("b", b"2", 60)
+    await memory.get("a")
+    await memory.set("c", b"3", 60)
+
+    assert await memory.get_many(["a", "b", "c"]) == {"a": b"1", "c": b"3"}
+
+
+async def test_redis_cache_prefixes_keys_and_sets_ttl():
+    client = FakeRedis()
+    redis = RedisCache(client, prefix="t:")
+
+    await redis.set("a", b"1", 30)
+    await redis.set_many({"b": b"2"}, 45)
+
+    assert client.values == {"t:a": b"1", "t:b": b"2"}
+    assert client.ttls == {"t:a": 30, "t:b": 45}
+    assert await redis.get_many(["a", "b", "c"]) == {"a": b"1", "b": b"2"}
+    await redis.delete("a")
+    assert await redis.get("a") is None
+
+
+async def test_backend_failures_are_misses():
+    redis = RedisCache(BrokenRedis())
+
+    await redis.set("a", b"1", 30)
+
+    assert await redis.get("a") is None
+    assert redis.stats()["errors"] == 2
+
+
+async def test_null_cache_never_hits():
+    null = NullCache()
+
+    await null.set("a", b"1", 60)
+
+    assert await null.get("a") is None
+
+
+@pytest.mark.parametrize("backend, workers, expected", [
+    ("memory", 1, MemoryCache),
+    ("memory", 4, NullCache),
+    ("none", 1, NullCache),
+])
+def test_build_cache(monkeypatch, backend, workers, expected):
+    monkeypatch.setattr(cache_module.settings, "CACHE_BACKEND", backend)
+    monkeypatch.setattr(cache_module.settings, "WORKERS", workers)
+
+    assert type(build_cache()) is expected
+
+
+# Invalidation through the vehicle routes
+
+
+async def test_get_by_regno_is_cached(client):
+    await client.post("/api/vehicles/", json={"regNo": "MH01AB1234", "model": "SWIFT"})
+
+    first = await client.get("/api/vehicles/MH01AB1234")
+    hits = cache.hits
+    second = await client.get("/api/vehicles/MH01AB1234")
+
+    assert first.json() == second.json()
+    assert cache.hits == hits + 1
+    assert await cache.get(vehicle_cache_key("MH01AB1234")) is not None
+
+
+async def test_update_invalidates_cached_vehicle(client):
+    vehicle = (await client.post("/api/vehicles/", json={"regNo": "MH01AB1234", "model": "SWIFT"})).json()
+    await client.get("/api/vehicles/MH01AB1234")
+
+    await client.put(f"/api/vehicles/{vehicle['id']}", json={"model": "BALENO"})
+
+    assert (await client.get("/api/vehicles/MH01AB1234")).json()["model"] == "BALENO"
+
+
+async def test_regno_change_invalidates_old_key(client):
+    vehicle = (await client.post("/api/vehicles/", json={"regNo": "MH01AB1234"})).json()
+    await client.get("/api/vehicles/MH01AB1234")
+
+    await client.post("/api/vehicles/batch/update", json={"items": [{"id": vehicle["id"], "regNo": "MH01AB9999"}]})
+
+    assert (await client.get("/api/vehicles/MH01AB1234")).status_code == 404
+    assert (await client.get("/api/vehicles/MH01AB9999")).status_code == 200
+
+
+async def test_delete_invalidates_cached_vehicle(client):
+    vehicle = (await client.post("/api/vehicles/", json={"regNo": "MH01AB1234"})).json()
+    await client.get("/api/vehicles/MH01AB1234")
+
+    await client.delete(f"/api/vehicles/{vehicle['id']}")
+
+    assert (await client.get("/api/vehicles/MH01AB1234")).status_code == 404
+    assert await cache.get(vehicle_cache_key("MH01AB1234")) is None
@@ -0,0 +1,64 @@
+import pytest
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_vehicle(client, **fields):
+    response = await client.post("/api/vehicles/", json=fields)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+async def test_create_with_taken_regno_is_409(client):
+    await create_vehicle(client, regNo="MH01AB1234", chassis="CH1", model="SWIFT")
+
+    response = await client.post("/api/vehicles/", json={"regNo": "MH01AB1234", "chassis": "CH2"})
+
+    assert response.status_code == 409
+    assert "regNo 'MH01AB1234' already exists" in response.json()["detail"]
+
+
+async def test_update_to_taken_chassis_is_409(client):
+    await create_vehicle(client, regNo="MH01AB1234", chassis="CH1")
+    other = await create_vehicle(client, regNo="MH01AB5678", chassis="CH2")
+
+    response = await client.put(f"/api/vehicles/{other['id']}", json={"chassis": "CH1"})
+    unchanged = await client.put(f"/api/vehicles/{other['id']}", json={"chassis": "CH2", "model": "BALENO"})
+
+    assert response.status_code == 409
+    assert "chassis 'CH1' already exists" in response.json()["detail"]
+    assert unchanged.status_code == 200
+
+
+async def test_batch_create_with_repeated_key_is_409_and_writes_nothing(client):
+    response = await client.post("/api/vehicles/batch/create", json={"items": [
+        {"regNo": "MH01AB0001"}, {"regNo": "MH01AB0002"}, {"regNo": "MH01AB0001"},
+    ]})
+    listed = await client.get("/api/vehicles/")
+
+    assert response.status_code == 409
+    assert "regNo 'MH01AB0001' is given to more than one row" in response.json()["detail"]
+    assert listed.json()["items"] == []
+
+
+async def test_batch_update_onto_existing_key_is_409(client):
+    first = await create_vehicle(client, regNo="MH01AB0001")
+    second = await create_vehicle(client, regNo="MH01AB0002")
+
+    response = await client.post("/api/vehicles/batch/update", json={"items": [
+        {"id": second["id"], "regNo": "MH01AB0001"},
+    ]})
+    kept = await client.post("/api/vehicles/batch/get", json={"ids": [first["id"], second["id"]]})
+
+    assert response.status_code == 409
+    assert [item["regNo"] for item in kept.json()["items"]] == ["MH01AB0001", "MH01AB0002"]
+
+
+async def test_duplicate_user_email_is_409(client):
+    await client.post("/api/users/", json={"email": "a@example.com", "role": "client"})
+
+    response = await client.post("/api/users/", json={"email": "a@example.com", "role": "admin"})
+
+    assert response.status_code == 409
+    assert "email 'a@example.com' already exists" in response.json()["detail"]
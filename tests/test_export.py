@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+
+import pytest
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_orders(client, count):
+    user = (await client.post("/api/users/", json={"email": "buyer@example.com", "role": "client"})).json()
+    orders = []
+    for i in range(count):
+        response = await client.post("/api/orders/", json={
+            "user_id": user["id"], "order_type": "service", "status": "new", "total_amount": f"{i}.50",
+        })
+        assert response.status_code == 201, response.text
+        orders.append(response.json())
+    return orders
+
+
+async def test_ndjson_rows_match_the_api(client):
+    orders = await create_orders(client, 3)
+
+    response = await client.get("/api/orders/export", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    exported = {row["id"]: row for row in map(json.loads, response.text.splitlines())}
+    for order in orders:
+        fetched = (await client.get(f"/api/orders/{order['id']}")).json()
+        row = exported[order["id"]]
+        assert row == {name: fetched[name] for name in row}
+
+
+async def test_fields_and_csv(client):
+    orders = await create_orders(client, 2)
+
+    ndjson = await client.get("/api/orders/export", params={"fields": "id,total_amount"})
+    text = await client.get("/api/orders/export", params={"format": "csv", "fields": "id,total_amount"})
+
+    assert [json.loads(line) for line in ndjson.text.splitlines()] == [
+        {"id": order["id"], "total_amount": order["total_amount"]} for order in orders
+    ]
+    rows = list(csv.reader(io.StringIO(text.text)))
+    assert rows[0] == ["id", "total_amount"]
+    assert len(rows) == 3
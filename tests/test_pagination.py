@@ -0,0 +1,118 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.api.pagination import SortOrder, encode_cursor
+from app.db.session import AsyncSessionLocal
+from app.models import ServiceHistory, User
+
+
+pytestmark = pytest.mark.anyio
+
+DAY = datetime(2026, 1, 1)
+
+
+async def add_documents():
+    """Service-history rows with repeated and NULL ``status_on``; returns (id, status_on) pairs"""
+    dates = [DAY, DAY, DAY + timedelta(days=1), None, DAY, None, DAY + timedelta(days=2), None, DAY + timedelta(days=1)]
+    documents = [
+        ServiceHistory(id=uuid.uuid4(), vin="VIN1", file_path=f"VIN1/{i}.pdf", status_on=status_on)
+        for i, status_on in enumerate(dates)
+    ]
+    async with AsyncSessionLocal() as db:
+        db.add_all(documents)
+        await db.commit()
+    return [(document.id, document.status_on) for document in documents]
+
+
+def expected_order(rows, descending):
+    """Non-NULL keys by (key, id), then NULL keys by id, both in the requested direction"""
+    dated = sorted(((key, id) for id, key in rows if key is not None), reverse=descending)
+    undated = sorted((id for id, key in rows if key is None), reverse=descending)
+    return [id for _, id in dated] + undated
+
+
+async def walk(client, path, **params):
+    ids, cursor = [], None
+    while True:
+        response = await client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        ids += [uuid.UUID(item["id"]) for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("fields", [None, "id,status_on"])
+@pytest.mark.parametrize("limit", [1, 2, 4, 100])
+async def test_pages_walk_null_and_repeated_keys_once(client, order, fields, limit):
+    rows = await add_documents()
+    params = {"sort": "status_on", "order": order, "limit": limit}
+    if fields:
+        params["fields"] = fields
+
+    ids = await walk(client, "/api/service-history/", **params)
+
+    assert ids == expected_order(rows, order == "desc")
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("fast", [False, True])
+async def test_crud_list_breaks_ties_on_id(client, order, fast):
+    created_at = datetime(2026, 1, 1)
+    users = [User(email=f"user{i}@example.com", role="client", created_at=created_at) for i in range(7)]
+    async with AsyncSessionLocal() as db:
+        db.add_all(users)
+        await db.commit()
+
+    ids = await walk(client, "/api/users/", sort="created_at", order=order, limit=3, fast=fast)
+
+    assert ids == sorted((user.id for user in users), reverse=order == "desc")
+
+
+async def test_sort_by_id_walks_every_row(client):
+    rows = await add_documents()
+
+    ids = await walk(client, "/api/service-history/", sort="id", order="asc", limit=2)
+
+    assert ids == sorted(id for id, _ in rows)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "eyJzIjoic3RhdHVzX29uIn0", "e30"])
+async def test_malformed_cursor_is_rejected(client, cursor):
+    response = await client.get("/api/service-history/", params={"sort": "status_on", "cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid cursor")
+
+
+async def test_cursor_for_another_sort_or_order_is_rejected(client):
+    await add_documents()
+    page = (await client.get("/api/service-history/", params={"sort": "status_on", "order": "asc", "limit": 2})).json()
+
+    other_order = await client.get(
+        "/api/service-history/", params={"sort": "status_on", "order": "desc", "cursor": page["next_cursor"]}
+    )
+    other_sort = await client.get(
+        "/api/service-history/", params={"sort": "id", "order": "asc", "cursor": page["next_cursor"]}
+    )
+
+    assert other_order.status_code == 400
+    assert other_sort.status_code == 400
+
+
+async def test_cursor_with_bad_key_is_rejected(client):
+    cursor = encode_cursor("status_on", SortOrder.asc, "yesterday", uuid.uuid4())
+
+    response = await client.get("/api/service-history/", params={"sort": "status_on", "cursor": cursor})
+
+    assert response.status_code == 400
+
+
+async def test_unknown_sort_is_rejected(client):
+    response = await client.get("/api/service-history/", params={"sort": "file_path"})
+
+    assert response.status_code == 400
@@ -0,0 +1,142 @@
+"""
+Read-replica routing against two SQLite files
+
+The "replica" is a separate database that nothing replicates into, so a row
+written through the API exists only on the primary: whether a read finds it
+shows which database served it.
+"""
+import os
+
+import httpx
+import pytest
+
+import main
+from app.db import session as db_session
+from app.db.base import Base
+from app.db.replicas import STICKY_COOKIE, ReadYourWritesMiddleware, ReplicaSet
+from app.models import User
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_schema(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@pytest.fixture
+async def replicas(tmp_path, monkeypatch):
+    replica_set = ReplicaSet([f"sqlite+aiosqlite:///{tmp_path}/replica.db"])
+    await create_schema(replica_set.replicas[0].engine)
+    monkeypatch.setattr(db_session, "replicas", replica_set)
+    monkeypatch.setattr(main, "replicas", replica_set)
+    yield replica_set
+    await replica_set.dispose()
+
+
+@pytest.fixture
+async def broken_replicas(tmp_path, monkeypatch):
+    # The directory does not exist yet, so every connection fails until it does
+    directory = tmp_path / "later"
+    replica_set = ReplicaSet([f"sqlite+aiosqlite:///{directory}/replica.db"])
+    monkeypatch.setattr(db_session, "replicas", replica_set)
+    monkeypatch.setattr(main, "replicas", replica_set)
+    yield replica_set, directory
+    await replica_set.dispose()
+
+
+@pytest.fixture
+async def client():
+    # main.app only adds the middleware when replicas are configured at import
+    app = ReadYourWritesMiddleware(main.app, sticky_seconds=5)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_reads_go_to_the_replica(client, replicas):
+    async with replicas.replicas[0].sessionmaker() as db:
+        db.add(User(email="replica@example.com", role="client"))
+        await db.commit()
+
+    response = await client.get("/api/users/replica@example.com")
+
+    assert response.status_code == 200
+
+
+async def test_write_sets_cookie_and_pins_reads_to_primary(client, replicas):
+    created = await client.post("/api/users/", json={"email": "new@example.com", "role": "client"})
+
+    assert created.status_code == 201
+    assert STICKY_COOKIE in created.cookies
+    assert (await client.get("/api/users/new@example.com")).status_code == 200
+
+    client.cookies.clear()
+    assert (await client.get("/api/users/new@example.com")).status_code == 404
+
+
+async def test_failed_write_sets_no_cookie(client, replicas):
+    response = await client.post("/api/users/", json={"email": "not-an-email", "role": "client"})
+
+    assert response.status_code == 422
+    assert STICKY_COOKIE not in response.cookies
+
+
+async def test_expired_cookie_reads_from_replica(client, replicas):
+    await client.post("/api/users/", json={"email": "new@example.com", "role": "client"})
+    client.cookies.clear()
+    client.cookies.set(STICKY_COOKIE, "1.0")
+
+    assert (await client.get("/api/users/new@example.com")).status_code == 404
+
+
+async def test_cache_fill_reads_the_primary(client, replicas):
+    await client.post("/api/vehicles/", json={"regNo": "MH01AB1234", "model": "SWIFT"})
+    client.cookies.clear()
+
+    projected = await client.get("/api/vehicles/MH01AB1234", params={"fields": "regNo"})
+    full = await client.get("/api/vehicles/MH01AB1234")
+
+    # fields= reads the replica, which lacks the row; the cache-filling read goes to the primary
+    assert projected.status_code == 404
+    assert full.status_code == 200
+    assert full.json()["model"] == "SWIFT"
+
+
+async def test_request_failure_ejects_replica_and_falls_back(client, broken_replicas):
+    replica_set, _ = broken_replicas
+    await client.post("/api/users/", json={"email": "new@example.com", "role": "client"})
+    client.cookies.clear()
+
+    failed = await client.get("/api/users/new@example.com")
+    fallback = await client.get("/api/users/new@example.com")
+
+    assert failed.status_code == 500
+    assert not replica_set.replicas[0].healthy
+    assert fallback.status_code == 200
+    stats = (await client.get("/db/replicas")).json()
+    assert stats[0]["healthy"] is False and stats[0]["last_error"]
+
+
+async def test_streaming_failure_ejects_replica(client, broken_replicas):
+    replica_set, _ = broken_replicas
+
+    await client.get("/api/orders/export")
+
+    assert not replica_set.replicas[0].healthy
+
+
+async def test_health_check_ejects_and_readmits(broken_replicas):
+    replica_set, directory = broken_replicas
+    replica = replica_set.replicas[0]
+
+    await replica_set.check_all()
+    assert not replica.healthy
+    assert replica_set.pick() is None
+
+    os.makedirs(directory)
+    await replica_set.check_all()
+    assert replica.healthy
+    assert replica.last_error is None
+    assert replica_set.pick() is replica